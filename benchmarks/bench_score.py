@@ -0,0 +1,275 @@
+"""Time each phase of building and exporting synthetic scores.
+
+Phases:
+
+    part      Part construction (measure layout and beaming)
+    score     Score construction (validation and padding)
+    convert   _convert_score_parts_to_xml, building the MusicXML tree
+    write     _write_xml_to_file, serializing the tree to disk
+    stream    convert_to_xml(streaming=True), convert and write in one pass
+
+Each size is run in its own process. Times are the best of --repeat runs.
+Peak memory is how far a phase raises the peak resident set size of a
+fresh process that has run only the phases it needs, so memory allocated
+by libxml2 is counted too. Usage:
+
+    python benchmarks/bench_score.py [--sizes small medium ...]
+    python benchmarks/bench_score.py --save-baseline
+    python benchmarks/bench_score.py --compare [--fail-on-regression]
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import SIZES, make_note_lists, make_parts, mark_tuplets
+
+from lejaren.notation import Score
+
+PHASES = ["part", "score", "convert", "write", "stream"]
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+
+# slower than the baseline by more than this is reported as a regression
+REGRESSION_RATIO = 1.25
+
+
+def run_phases(size_name: str, seed: int) -> dict:
+    """Run every phase once, returning seconds per phase and output size"""
+
+    size = SIZES[size_name]
+    note_lists = make_note_lists(size, seed)
+    seconds = {}
+
+    start = time.perf_counter()
+    parts = make_parts(note_lists)
+    seconds["part"] = time.perf_counter() - start
+
+    mark_tuplets(parts)
+
+    start = time.perf_counter()
+    score = Score(parts, title="Synthetic")
+    seconds["score"] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_filepath = Path(tmp_dir) / "bench.musicxml"
+
+        start = time.perf_counter()
+        xml_score = score._convert_score_parts_to_xml()
+        seconds["convert"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        score._write_xml_to_file(output_filepath, xml_score)
+        seconds["write"] = time.perf_counter() - start
+
+        output_bytes = output_filepath.stat().st_size
+        del xml_score
+
+        start = time.perf_counter()
+        score.convert_to_xml(output_filepath, streaming=True)
+        seconds["stream"] = time.perf_counter() - start
+
+    entries = sum(len(entries) for staves in note_lists for entries in staves)
+
+    return {"seconds": seconds, "entries": entries, "output_bytes": output_bytes}
+
+
+def _max_rss_kib() -> int:
+    """Peak resident set size of this process since the last reset, in KiB"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss cannot be reset, and in a spawned process it starts at the
+    # parent's RSS when it forked
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def _reset_max_rss() -> None:
+    """Lower the peak RSS to the current RSS, where the OS allows it
+
+    Linux only. Elsewhere a phase that peaks below what the imports and the
+    phases before it reached reads as 0.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _phase_memory(size_name: str, seed: int, phase: str, queue) -> None:
+    """Run the phases that phase needs, then put how far phase raised peak RSS"""
+
+    size = SIZES[size_name]
+    note_lists = make_note_lists(size, seed)
+
+    def measure(function):
+        _reset_max_rss()
+        before = _max_rss_kib()
+        function()
+        queue.put(_max_rss_kib() - before)
+
+    if phase == "part":
+        measure(lambda: make_parts(note_lists))
+        return
+
+    parts = make_parts(note_lists)
+    mark_tuplets(parts)
+
+    if phase == "score":
+        measure(lambda: Score(parts, title="Synthetic"))
+        return
+
+    score = Score(parts, title="Synthetic")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_filepath = Path(tmp_dir) / "bench.musicxml"
+        if phase == "convert":
+            measure(score._convert_score_parts_to_xml)
+        elif phase == "write":
+            xml_score = score._convert_score_parts_to_xml()
+            measure(lambda: score._write_xml_to_file(output_filepath, xml_score))
+        else:
+            measure(lambda: score.convert_to_xml(output_filepath, streaming=True))
+
+
+def run_memory(size_name: str, seed: int) -> dict:
+    """Peak memory of every phase, in KiB, each phase in a fresh process"""
+
+    context = multiprocessing.get_context("spawn")
+    peaks = {}
+
+    for phase in PHASES:
+        queue = context.Queue()
+        process = context.Process(
+            target=_phase_memory, args=(size_name, seed, phase, queue)
+        )
+        process.start()
+        peaks[phase] = queue.get()
+        process.join()
+
+    return peaks
+
+
+def _bench_size(size_name: str, seed: int, repeat: int, queue) -> None:
+    best = None
+    for _ in range(repeat):
+        result = run_phases(size_name, seed)
+        if best is None:
+            best = result
+        else:
+            for phase in PHASES:
+                best["seconds"][phase] = min(
+                    best["seconds"][phase], result["seconds"][phase]
+                )
+    best["seconds"] = {
+        phase: round(seconds, 6) for phase, seconds in best["seconds"].items()
+    }
+    best["peak_kib"] = run_memory(size_name, seed)
+    queue.put(best)
+
+
+def bench_size(size_name: str, seed: int, repeat: int) -> dict:
+    """Benchmark one size in a fresh process"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=_bench_size, args=(size_name, seed, repeat, queue)
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def report(size_name: str, result: dict, baseline: dict = None) -> bool:
+    """Print one size, returning whether any phase regressed"""
+
+    size = SIZES[size_name]
+    entries = result["entries"]
+    regressed = False
+
+    print(
+        f"\n{size_name}: {size.parts} parts x ~{size.measures} measures x "
+        f"{size.density} notes/measure, {entries} entries, "
+        f"{result['output_bytes'] / 1024:.0f} KiB of MusicXML"
+    )
+    print(f"  {'phase':<8} {'seconds':>9} {'entries/s':>11} {'peak KiB':>9}  baseline")
+
+    for phase in PHASES:
+        seconds = result["seconds"][phase]
+        line = (
+            f"  {phase:<8} {seconds:9.4f} {entries / seconds:11.0f} "
+            f"{result['peak_kib'][phase]:9d}"
+        )
+        if baseline and phase in baseline["seconds"]:
+            ratio = seconds / baseline["seconds"][phase]
+            line += f"  x{ratio:.2f}"
+            if ratio > REGRESSION_RATIO:
+                line += " REGRESSION"
+                regressed = True
+        print(line)
+
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", nargs="+", choices=sorted(SIZES), default=["small", "medium", "dense"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help=f"write results to {BASELINE_PATH.name}"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help=f"compare with {BASELINE_PATH.name}"
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help=f"exit 1 if a phase is more than {REGRESSION_RATIO}x slower than its baseline",
+    )
+    args = parser.parse_args()
+
+    baselines = {}
+    if BASELINE_PATH.exists():
+        baselines = json.loads(BASELINE_PATH.read_text())
+
+    results = {}
+    regressed = False
+
+    for size_name in args.sizes:
+        results[size_name] = bench_size(size_name, args.seed, args.repeat)
+        baseline = baselines.get("sizes", {}).get(size_name) if args.compare else None
+        regressed |= report(size_name, results[size_name], baseline)
+
+    if args.save_baseline:
+        baselines.setdefault("sizes", {}).update(results)
+        baselines["environment"] = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+        }
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved baselines to {BASELINE_PATH}")
+
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
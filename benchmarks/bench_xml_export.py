@@ -0,0 +1,96 @@
+"""Compare the tree, streaming and parallel MusicXML export paths.
+
+Each run happens in a fresh process so peak memory is not shared between
+the two paths. Usage:
+
+    python benchmarks/bench_xml_export.py [--measures N] [--parts N] [--processes N]
+"""
+
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from lejaren.notation import Note, Part, Score
+
+
+def build_score(measure_count: int, part_count: int) -> Score:
+    """Score of part_count parts, each measure_count measures of 4/4 with a
+    mix of quarter and eighth notes"""
+
+    time_signature = [(4, 4)]
+    parts = []
+
+    for part_idx in range(part_count):
+        notes = []
+        for measure_idx in range(measure_count):
+            pc = (measure_idx + part_idx) % 12
+            notes.extend(
+                [
+                    Note(1, 4, pc),
+                    Note(0.5, 4, (pc + 2) % 12),
+                    Note(0.5, 4, (pc + 4) % 12),
+                    Note(2, 4, (pc + 7) % 12),
+                ]
+            )
+        parts.append(Part(notes, time_signature))
+
+    return Score(parts, title="Benchmark")
+
+
+def _run(measure_count: int, part_count: int, export_args: dict, queue) -> None:
+    score = build_score(measure_count, part_count)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_filepath = Path(tmp_dir) / "bench.musicxml"
+
+        start = time.perf_counter()
+        score.convert_to_xml(output_filepath, **export_args)
+        elapsed = time.perf_counter() - start
+
+        size = output_filepath.stat().st_size
+
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, peak, size))
+
+
+def measure(measure_count: int, part_count: int, export_args: dict) -> tuple:
+    """Run one export in a child process and return (seconds, peak KB, bytes)"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=_run, args=(measure_count, part_count, export_args, queue)
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--measures", type=int, default=2000)
+    parser.add_argument("--parts", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    modes = (
+        ("tree", {}),
+        ("streaming", {"streaming": True}),
+        ("parallel", {"processes": args.processes}),
+    )
+
+    print(f"{args.parts} parts x {args.measures} measures")
+    for label, export_args in modes:
+        elapsed, peak, size = measure(args.measures, args.parts, export_args)
+        print(
+            f"{label:>10}: {elapsed:8.3f} s  peak {peak / 1024:8.1f} MiB  "
+            f"{size / 1024:8.1f} KiB written"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Round-trip synthetic scores through MusicXML export and import.
+
+Each score is exported with convert_to_xml, imported again with
+import_musicxml, and checked note for note against the original with
+lejaren.intake.roundtrip. Sizes run smallest first, and both directions are
+timed, best of --repeat runs, as MB/s of MusicXML and sounding notes/s.
+
+Existing documents, such as the ones in tests/output, can be added with
+--files. Each is imported, exported and imported again, and checked
+against its first import. Notes the first import left out, such as a
+second voice on a staff, are reported as differences. Usage:
+
+    python benchmarks/roundtrip.py [--sizes small medium ...] [--files tests/output/*]
+
+Exits with 1 if any score does not round-trip.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import SIZES, make_score
+
+from lejaren.intake.import_musicxml import import_musicxml
+from lejaren.intake.roundtrip import (
+    note_sequences,
+    sequence_differences,
+    skipped_notes,
+)
+
+# smallest output first
+SIZE_ORDER = ["small", "triplets", "dense", "medium", "long", "large"]
+
+DEFAULT_SIZES = ["small", "triplets", "dense", "medium", "long"]
+
+# differences printed per score
+MAX_DIFFERENCES = 5
+
+
+def round_trip(score, output_filepath: Path, repeat: int) -> dict:
+    """Export and re-import a Score, returning the best times, the output
+    size and how the imported notes differ"""
+
+    expected = note_sequences(score)
+    note_count = sum(len(notes) for staves in expected for notes in staves)
+
+    export_seconds, import_seconds = [], []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score.convert_to_xml(output_filepath)
+        export_seconds.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        imported = import_musicxml(str(output_filepath))
+        import_seconds.append(time.perf_counter() - start)
+
+    return {
+        "notes": note_count,
+        "output_bytes": output_filepath.stat().st_size,
+        "export": min(export_seconds),
+        "import": min(import_seconds),
+        "differences": sequence_differences(expected, note_sequences(imported)),
+    }
+
+
+def report(label: str, result: dict) -> bool:
+    """Print one score, returning whether it round-tripped"""
+
+    megabytes = result["output_bytes"] / 1e6
+    print(f"\n{label}: {result['notes']} notes, {megabytes:.2f} MB of MusicXML")
+    print(f"  {'':<8} {'seconds':>9} {'MB/s':>8} {'notes/s':>10}")
+
+    for direction in ("export", "import"):
+        seconds = result[direction]
+        print(
+            f"  {direction:<8} {seconds:9.4f} {megabytes / seconds:8.2f} "
+            f"{result['notes'] / seconds:10.0f}"
+        )
+
+    differences = result["differences"]
+    if not differences:
+        print("  equivalent")
+        return True
+
+    print(f"  {len(differences)} differences:")
+    for difference in differences[:MAX_DIFFERENCES]:
+        print(f"    {difference}")
+    return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", nargs="*", choices=sorted(SIZES), default=DEFAULT_SIZES
+    )
+    parser.add_argument("--files", nargs="*", default=[], type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes, key=SIZE_ORDER.index)
+    all_equivalent = True
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_filepath = Path(tmp_dir) / "roundtrip.musicxml"
+
+        for size_name in sizes:
+            score, _ = make_score(SIZES[size_name], args.seed)
+            result = round_trip(score, output_filepath, args.repeat)
+            all_equivalent &= report(size_name, result)
+
+        for input_filepath in args.files:
+            score = import_musicxml(str(input_filepath))
+            result = round_trip(score, output_filepath, args.repeat)
+            # notes lost by the first import are not in the Score to compare
+            skipped = skipped_notes(str(input_filepath))
+            if skipped:
+                result["differences"].insert(
+                    0, f"{skipped} notes of a second voice were not imported"
+                )
+            all_equivalent &= report(input_filepath.name, result)
+
+    if not all_equivalent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time set-class analysis of the sonorities of synthetic scores.
+
+Each score is sliced with lejaren.analysis.score_sonorities, best of
+--repeat runs, and reported as entries read per second and slices made per
+second, with its most common set classes. Every other part has two staves,
+so --parts 64 gives 96 staves. Usage:
+
+    python benchmarks/sonorities.py [--parts 8 64 ...] [--measures 200]
+"""
+
+import argparse
+import time
+
+from synthetic import ScoreSize, make_score
+
+from lejaren.analysis import score_sonorities
+from lejaren.analysis.set_classes import SET_CLASS_NAMES
+
+# most common set classes printed per score
+TOP_SET_CLASSES = 5
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parts", nargs="*", type=int, default=[8, 64, 128])
+    parser.add_argument("--measures", type=int, default=200)
+    parser.add_argument("--density", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for part_count in args.parts:
+        size = ScoreSize(part_count, args.measures, args.density)
+        score, entry_count = make_score(size, args.seed)
+        staff_count = part_count + part_count // 2
+
+        seconds = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            sonorities, histogram = score_sonorities(score)
+            seconds.append(time.perf_counter() - start)
+        best = min(seconds)
+
+        slice_count = len(sonorities.onset)
+        print(f"\n{staff_count} staves: {entry_count} entries, {slice_count} slices")
+        print(
+            f"  {best:.4f} s, {entry_count / best:.0f} entries/s, "
+            f"{slice_count / best:.0f} slices/s"
+        )
+
+        top = histogram.argsort()[::-1][:TOP_SET_CLASSES]
+        print("  " + ", ".join(f"{SET_CLASS_NAMES[i]} x{histogram[i]}" for i in top))
+
+
+if __name__ == "__main__":
+    main()
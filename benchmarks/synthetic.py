@@ -0,0 +1,129 @@
+"""Seeded synthetic scores for the benchmarks."""
+
+import random
+from typing import List, NamedTuple, Tuple, Union
+
+from lejaren.notation import Chord, Note, Part, Rest, Score
+
+# simple meters only: compound meters are not laid out correctly yet
+METER_CHANGES = [(4, 4), (3, 4), (5, 4), (2, 4)]
+
+# durations in quarters, weighted towards short notes. Notes of 1.5 and
+# longer often cross a barline and get tied.
+DURATIONS = [0.25, 0.5, 0.5, 0.5, 1, 1, 1, 1.5, 2, 3]
+
+
+class ScoreSize(NamedTuple):
+    """
+    How big a synthetic score is.
+
+    parts: number of parts, every other one a two staff part.
+
+    measures: approximate number of measures per staff.
+
+    density: average notes per measure.
+
+    triplets: whether to write groups of three triplet eighths, whose
+    durations are not exact in binary.
+    """
+
+    parts: int
+    measures: int
+    density: int
+    triplets: bool = False
+
+
+SIZES = {
+    "small": ScoreSize(2, 50, 4),
+    "medium": ScoreSize(8, 200, 4),
+    "dense": ScoreSize(4, 200, 12),
+    "long": ScoreSize(1, 5000, 4),
+    "large": ScoreSize(16, 1000, 4),
+    "triplets": ScoreSize(4, 200, 6, triplets=True),
+}
+
+
+def make_note_lists(
+    size: ScoreSize, seed: int = 0
+) -> List[List[List[Union[Note, Rest, Chord]]]]:
+    """Entries for every staff of every part, as a list per part of lists
+    per staff. Roughly 10% rests and 15% three note chords, and a group of
+    triplets in place of one entry in ten if the size asks for them."""
+
+    rng = random.Random(seed)
+
+    # measures average 3.5 beats over METER_CHANGES
+    beats_per_staff = size.measures * 3.5
+    mean_duration = 3.5 / size.density
+    durations = [dur * mean_duration / 1.125 for dur in DURATIONS]
+
+    parts = []
+    for part_idx in range(size.parts):
+        staves = []
+        for _ in range(2 if part_idx % 2 else 1):
+            entries = []
+            total = 0
+            while total < beats_per_staff:
+                dur = round(rng.choice(durations) * 4) / 4 or 0.25
+                roll = rng.random()
+                octave = rng.randrange(2, 6)
+                if size.triplets and rng.random() < 0.1:
+                    entries.extend(
+                        Note(1 / 3, octave, rng.randrange(12)) for _ in range(3)
+                    )
+                    dur = 1
+                elif roll < 0.1:
+                    entries.append(Rest(dur))
+                elif roll < 0.25:
+                    entries.append(
+                        Chord(
+                            [
+                                Note(dur, octave, rng.randrange(12)),
+                                Note(dur, octave, rng.randrange(12)),
+                                Note(dur, octave + 1, rng.randrange(12)),
+                            ]
+                        )
+                    )
+                else:
+                    entries.append(Note(dur, octave, rng.randrange(12)))
+                total += dur
+            staves.append(entries)
+        parts.append(staves)
+
+    return parts
+
+
+def make_parts(note_lists) -> List[Union[Part, List[Part]]]:
+    """Lay out the staves from make_note_lists"""
+    parts = []
+    for staves in note_lists:
+        laid_out = [Part(entries, METER_CHANGES) for entries in staves]
+        parts.append(laid_out[0] if len(laid_out) == 1 else laid_out)
+    return parts
+
+
+def mark_tuplets(parts, every: int = 7) -> None:
+    """Flag every few beats that hold two or three notes as triplets.
+
+    Layout does not detect tuplets, so this exercises the writer's
+    time-modification output on laid out parts.
+    """
+    count = 0
+    for part in parts:
+        for staff in part if isinstance(part, list) else [part]:
+            for measure in staff.measures:
+                for beat in measure.beats:
+                    if len(beat.notes) in (2, 3):
+                        count += 1
+                        if count % every == 0:
+                            beat.tuplet = True
+                            beat.actual_notes = 3
+
+
+def make_score(size: ScoreSize, seed: int = 0) -> Tuple[Score, int]:
+    """A laid out synthetic Score and the number of entries in it"""
+    note_lists = make_note_lists(size, seed)
+    parts = make_parts(note_lists)
+    mark_tuplets(parts)
+    entry_count = sum(len(entries) for staves in note_lists for entries in staves)
+    return Score(parts, title="Synthetic"), entry_count
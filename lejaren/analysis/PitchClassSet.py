@@ -1,160 +1,317 @@
-from __future__ import annotations
-
-from itertools import cycle, compress
-from typing import Iterable
-
-CLOCKFACE = 12
-
-
-class PitchClassSet:
-    def __init__(self, pcs: Iterable[int]) -> None:
-
-        self.ordered_set = [x for x in set(pcs) if x is not None]
-
-        self.ordered_list = list(self.ordered_set)
-
-        self.ordered_list.sort()
-
-        self.cardinality = len(self.ordered_list)
-
-        self.normal_order = self._get_normal_order(self.ordered_list)
-
-    def _get_normal_order(self, pclist: Iterable[int]) -> Iterable[int]:
-
-        cycled_set = cycle(pclist)
-
-        potential_set_orders = []
-
-        for set_start in range(self.cardinality):
+"""
+Pitch-class sets as 12-bit masks.
 
-            current_set = []
+Bit n of a mask is set when pitch class n is in the set, so there are only
+4096 sets. Everything about a set that does not depend on how it was
+spelled (normal order, prime form, Forte name, interval vector) is worked
+out for all 4096 masks when the module is imported, and transposition,
+inversion and complement are bit operations on the mask.
 
-            for current_pc in range(self.cardinality):
+normal order: the rotation of the set with the smallest span from first to
+last pitch class. Ties go to the rotation whose intervals above its first
+pitch class are smallest, compared from the left.
 
-                next_cycled_set = next(cycled_set)
-                current_set.append(next_cycled_set)
+prime form: the normal order of the set or its inversion, transposed to
+start on 0, whichever is smaller by the same rule.
 
-            zeroed_set = self._get_zero_start(current_set)
-            zeroed_set_reversed = self._retrograde_TI(zeroed_set)
+These are Forte's tie-breaks. Rahn's compare the intervals from the right
+instead, and give other prime forms for 5-20, 6-Z29, 6-31 and their
+complements, such as (0, 1, 5, 6, 8) for 5-20.
+"""
 
-            potential_set_orders.append(zeroed_set)
-
-            if zeroed_set != zeroed_set_reversed:
-
-                potential_set_orders.append(zeroed_set_reversed)
-
-            next(cycled_set)
-
-        first_to_last_pc_distance = [
-            (s[-1] - s[0]) % CLOCKFACE for s in potential_set_orders
-        ]
+from __future__ import annotations
 
-        minimum_distance = min(first_to_last_pc_distance)
+from typing import Dict, Iterable, List, Tuple
 
-        compression_mask = [
-            1 if dist == minimum_distance else 0 for dist in first_to_last_pc_distance
-        ]
+CLOCKFACE = 12
 
-        minimum_distance_list = list(
-            compress(first_to_last_pc_distance, compression_mask)
+SET_COUNT = 1 << CLOCKFACE
+
+FULL_MASK = SET_COUNT - 1
+
+# Forte's prime forms, from which every set class is named. Each is its own
+# prime form by the rule above. Classes of 7 to 12 pitch classes share the
+# number of their complement, and 0 to 2 are named here directly.
+FORTE_PRIME_FORMS = {
+    "3-1": (0, 1, 2), "3-2": (0, 1, 3), "3-3": (0, 1, 4), "3-4": (0, 1, 5),
+    "3-5": (0, 1, 6), "3-6": (0, 2, 4), "3-7": (0, 2, 5), "3-8": (0, 2, 6),
+    "3-9": (0, 2, 7), "3-10": (0, 3, 6), "3-11": (0, 3, 7), "3-12": (0, 4, 8),
+    "4-1": (0, 1, 2, 3), "4-2": (0, 1, 2, 4), "4-3": (0, 1, 3, 4),
+    "4-4": (0, 1, 2, 5), "4-5": (0, 1, 2, 6), "4-6": (0, 1, 2, 7),
+    "4-7": (0, 1, 4, 5), "4-8": (0, 1, 5, 6), "4-9": (0, 1, 6, 7),
+    "4-10": (0, 2, 3, 5), "4-11": (0, 1, 3, 5), "4-12": (0, 2, 3, 6),
+    "4-13": (0, 1, 3, 6), "4-14": (0, 2, 3, 7), "4-Z15": (0, 1, 4, 6),
+    "4-16": (0, 1, 5, 7), "4-17": (0, 3, 4, 7), "4-18": (0, 1, 4, 7),
+    "4-19": (0, 1, 4, 8), "4-20": (0, 1, 5, 8), "4-21": (0, 2, 4, 6),
+    "4-22": (0, 2, 4, 7), "4-23": (0, 2, 5, 7), "4-24": (0, 2, 4, 8),
+    "4-25": (0, 2, 6, 8), "4-26": (0, 3, 5, 8), "4-27": (0, 2, 5, 8),
+    "4-28": (0, 3, 6, 9), "4-Z29": (0, 1, 3, 7),
+    "5-1": (0, 1, 2, 3, 4), "5-2": (0, 1, 2, 3, 5), "5-3": (0, 1, 2, 4, 5),
+    "5-4": (0, 1, 2, 3, 6), "5-5": (0, 1, 2, 3, 7), "5-6": (0, 1, 2, 5, 6),
+    "5-7": (0, 1, 2, 6, 7), "5-8": (0, 2, 3, 4, 6), "5-9": (0, 1, 2, 4, 6),
+    "5-10": (0, 1, 3, 4, 6), "5-11": (0, 2, 3, 4, 7), "5-Z12": (0, 1, 3, 5, 6),
+    "5-13": (0, 1, 2, 4, 8), "5-14": (0, 1, 2, 5, 7), "5-15": (0, 1, 2, 6, 8),
+    "5-16": (0, 1, 3, 4, 7), "5-Z17": (0, 1, 3, 4, 8), "5-Z18": (0, 1, 4, 5, 7),
+    "5-19": (0, 1, 3, 6, 7), "5-20": (0, 1, 3, 7, 8), "5-21": (0, 1, 4, 5, 8),
+    "5-22": (0, 1, 4, 7, 8), "5-23": (0, 2, 3, 5, 7), "5-24": (0, 1, 3, 5, 7),
+    "5-25": (0, 2, 3, 5, 8), "5-26": (0, 2, 4, 5, 8), "5-27": (0, 1, 3, 5, 8),
+    "5-28": (0, 2, 3, 6, 8), "5-29": (0, 1, 3, 6, 8), "5-30": (0, 1, 4, 6, 8),
+    "5-31": (0, 1, 3, 6, 9), "5-32": (0, 1, 4, 6, 9), "5-33": (0, 2, 4, 6, 8),
+    "5-34": (0, 2, 4, 6, 9), "5-35": (0, 2, 4, 7, 9), "5-Z36": (0, 1, 2, 4, 7),
+    "5-Z37": (0, 3, 4, 5, 8), "5-Z38": (0, 1, 2, 5, 8),
+    "6-1": (0, 1, 2, 3, 4, 5), "6-2": (0, 1, 2, 3, 4, 6),
+    "6-Z3": (0, 1, 2, 3, 5, 6), "6-Z4": (0, 1, 2, 4, 5, 6),
+    "6-5": (0, 1, 2, 3, 6, 7), "6-Z6": (0, 1, 2, 5, 6, 7),
+    "6-7": (0, 1, 2, 6, 7, 8), "6-8": (0, 2, 3, 4, 5, 7),
+    "6-9": (0, 1, 2, 3, 5, 7), "6-Z10": (0, 1, 3, 4, 5, 7),
+    "6-Z11": (0, 1, 2, 4, 5, 7), "6-Z12": (0, 1, 2, 4, 6, 7),
+    "6-Z13": (0, 1, 3, 4, 6, 7), "6-14": (0, 1, 3, 4, 5, 8),
+    "6-15": (0, 1, 2, 4, 5, 8), "6-16": (0, 1, 4, 5, 6, 8),
+    "6-Z17": (0, 1, 2, 4, 7, 8), "6-18": (0, 1, 2, 5, 7, 8),
+    "6-Z19": (0, 1, 3, 4, 7, 8), "6-20": (0, 1, 4, 5, 8, 9),
+    "6-21": (0, 2, 3, 4, 6, 8), "6-22": (0, 1, 2, 4, 6, 8),
+    "6-Z23": (0, 2, 3, 5, 6, 8), "6-Z24": (0, 1, 3, 4, 6, 8),
+    "6-Z25": (0, 1, 3, 5, 6, 8), "6-Z26": (0, 1, 3, 5, 7, 8),
+    "6-27": (0, 1, 3, 4, 6, 9), "6-Z28": (0, 1, 3, 5, 6, 9),
+    "6-Z29": (0, 1, 3, 6, 8, 9), "6-30": (0, 1, 3, 6, 7, 9),
+    "6-31": (0, 1, 3, 5, 8, 9), "6-32": (0, 2, 4, 5, 7, 9),
+    "6-33": (0, 2, 3, 5, 7, 9), "6-34": (0, 1, 3, 5, 7, 9),
+    "6-35": (0, 2, 4, 6, 8, 10), "6-Z36": (0, 1, 2, 3, 4, 7),
+    "6-Z37": (0, 1, 2, 3, 4, 8), "6-Z38": (0, 1, 2, 3, 7, 8),
+    "6-Z39": (0, 2, 3, 4, 5, 8), "6-Z40": (0, 1, 2, 3, 5, 8),
+    "6-Z41": (0, 1, 2, 3, 6, 8), "6-Z42": (0, 1, 2, 3, 6, 9),
+    "6-Z43": (0, 1, 2, 5, 6, 8), "6-Z44": (0, 1, 2, 5, 6, 9),
+    "6-Z45": (0, 2, 3, 4, 6, 9), "6-Z46": (0, 1, 2, 4, 6, 9),
+    "6-Z47": (0, 1, 2, 4, 7, 9), "6-Z48": (0, 1, 2, 5, 7, 9),
+    "6-Z49": (0, 1, 3, 4, 7, 9), "6-Z50": (0, 1, 4, 6, 7, 9),
+}
+
+
+def pcs_to_mask(pcs: Iterable[int]) -> int:
+    """12-bit mask of some pitch classes. None entries are skipped, and
+    other integers are taken mod 12."""
+
+    mask = 0
+    for pc in pcs:
+        if pc is not None:
+            mask |= 1 << (pc % CLOCKFACE)
+    return mask
+
+
+def mask_to_pcs(mask: int) -> Tuple[int, ...]:
+    """Pitch classes of a mask, in ascending order"""
+    return tuple(pc for pc in range(CLOCKFACE) if mask >> pc & 1)
+
+
+def transpose_mask(mask: int, interval: int) -> int:
+    """Rotate a mask up by interval semitones"""
+    interval %= CLOCKFACE
+    return ((mask << interval) | (mask >> (CLOCKFACE - interval))) & FULL_MASK
+
+
+def _invert_mask(mask: int) -> int:
+    """I0: pitch class n becomes 12 - n"""
+    return pcs_to_mask(-pc for pc in mask_to_pcs(mask))
+
+
+def _order_key(pcs: Tuple[int, ...]) -> tuple:
+    """Sort key of a candidate ordering, intervals above its first pitch
+    class with the span first"""
+    if not pcs:
+        return ()
+    intervals = tuple((pc - pcs[0]) % CLOCKFACE for pc in pcs)
+    return (intervals[-1],) + intervals
+
+
+def _normal_order(mask: int) -> Tuple[int, ...]:
+    pcs = mask_to_pcs(mask)
+    if not pcs:
+        return ()
+    rotations = [pcs[start:] + pcs[:start] for start in range(len(pcs))]
+    return min(rotations, key=_order_key)
+
+
+def _interval_vector(mask: int) -> Tuple[int, ...]:
+    """Count of each interval class 1 to 6 between the set's pitch classes"""
+    vector = [
+        bin(mask & transpose_mask(mask, interval)).count("1")
+        for interval in range(1, 7)
+    ]
+    # a tritone above and below is the same pair
+    vector[5] //= 2
+    return tuple(vector)
+
+
+def _build_catalog() -> tuple:
+    """Per mask tables of every set's normal order, prime form, prime form
+    mask, inversion, interval vector and Forte name"""
+
+    inversions = [_invert_mask(mask) for mask in range(SET_COUNT)]
+    normal_orders = [_normal_order(mask) for mask in range(SET_COUNT)]
+
+    prime_masks = [None] * SET_COUNT
+    prime_forms = [None] * SET_COUNT
+    interval_vectors = [None] * SET_COUNT
+
+    for mask in range(SET_COUNT):
+        if prime_masks[mask] is not None:
+            continue
+
+        # every set of the class, each worked out once
+        members = {
+            transpose_mask(member, interval)
+            for member in (mask, inversions[mask])
+            for interval in range(CLOCKFACE)
+        }
+        prime_form = min(
+            (
+                tuple((pc - normal_orders[member][0]) % CLOCKFACE
+                      for pc in normal_orders[member])
+                for member in members
+            ),
+            key=_order_key,
         )
+        prime_mask = pcs_to_mask(prime_form)
+        interval_vector = _interval_vector(mask)
+
+        for member in members:
+            prime_masks[member] = prime_mask
+            prime_forms[member] = prime_form
+            interval_vectors[member] = interval_vector
+
+    # names of the classes of 3 to 6 pitch classes, then the complements of
+    # 3 to 5, since hexachords are all named in the table
+    names: Dict[int, str] = {}
+    for name, prime_form in FORTE_PRIME_FORMS.items():
+        names[prime_masks[pcs_to_mask(prime_form)]] = name
+    for name, prime_form in FORTE_PRIME_FORMS.items():
+        if len(prime_form) < 6:
+            complement_mask = prime_masks[pcs_to_mask(prime_form) ^ FULL_MASK]
+            names[complement_mask] = f"{CLOCKFACE - len(prime_form)}-{name[2:]}"
+
+    # 0-1, 1-1, 2-1 to 2-6 by interval class, and their complements
+    names[0] = "0-1"
+    names[FULL_MASK] = "12-1"
+    names[prime_masks[1]] = "1-1"
+    names[prime_masks[FULL_MASK ^ 1]] = "11-1"
+    for interval in range(1, 7):
+        prime_mask = prime_masks[1 | 1 << interval]
+        names[prime_mask] = f"2-{interval}"
+        names[prime_masks[prime_mask ^ FULL_MASK]] = f"10-{interval}"
+
+    forte_names = [names[prime_mask] for prime_mask in prime_masks]
+
+    return (
+        normal_orders,
+        prime_forms,
+        prime_masks,
+        inversions,
+        interval_vectors,
+        forte_names,
+    )
+
+
+(
+    NORMAL_ORDERS,
+    PRIME_FORMS,
+    PRIME_MASKS,
+    INVERSIONS,
+    INTERVAL_VECTORS,
+    FORTE_NAMES,
+) = _build_catalog()
+
+CARDINALITIES = [bin(mask).count("1") for mask in range(SET_COUNT)]
+
+ORDERED_PCS = [mask_to_pcs(mask) for mask in range(SET_COUNT)]
 
-        candidates = []
 
-        for idx, value in enumerate(compression_mask):
-            if value == 1:
-                minimum_potential = potential_set_orders[idx]
-                candidates.append(minimum_potential)
+class PitchClassSet:
+    """
+    A set of pitch classes, stored as a 12-bit mask.
 
-        candidates = self._remove_list_dupes(candidates)
+    Attributes:
 
-        smallest_intervals = self._get_smallest_intervals_sorted(candidates)
+    mask: bit n is set when pitch class n is in the set.
 
-        return smallest_intervals
+    ordered_list, ordered_set: the pitch classes in ascending order.
 
-    def _remove_list_dupes(self, candidates: Iterable[int]) -> Iterable[int]:
+    cardinality: number of pitch classes.
 
-        no_duplicates = []
+    normal_order: the prime form, transposed to 0 and with inversions
+    considered, under its original name.
 
-        for candidate in candidates:
-            if candidate not in no_duplicates:
-                no_duplicates.append(candidate)
+    prime_form: the same list as normal_order.
 
-        return no_duplicates
+    normal_form: the pitch classes themselves, in normal order.
 
-    def _get_zero_start(self, pcs: Iterable[int]) -> Iterable[int]:
-        zero_set = [(x - pcs[0]) % CLOCKFACE for x in pcs]
+    forte_name: Forte number such as "3-11" or "4-Z15".
 
-        return zero_set
+    interval_vector: count of interval classes 1 to 6.
 
-    def _get_smallest_intervals_sorted(
-        self, candidates: Iterable[list]
-    ) -> Iterable[int]:
+    Methods:
+    --------
 
-        generators = [self._interval_generator(candidate) for candidate in candidates]
+    transpose(interval), invert(), transpositional_inversion(interval),
+    get_compliment()
+    New sets, made by rotating, reflecting or complementing the mask.
 
-        for idx in range(self.cardinality):
-            current_intervals = [next(g) for g in generators]
-            minimum_interval = min(current_intervals)
-            counter = 0
-            for interval in current_intervals:
-                if interval == minimum_interval:
-                    counter += 1
-            if counter == 1:
-                for interval, candidate in zip(current_intervals, candidates):
-                    if interval == minimum_interval:
+    from_mask(mask)
+    A set straight from its mask.
+    """
 
-                        return candidate
+    __slots__ = ("mask",)
 
-    def _interval_generator(self, candidate: Iterable[int]):
+    def __init__(self, pcs: Iterable[int]) -> None:
+        self.mask = pcs_to_mask(pcs)
 
-        last_pc = 0
+    @classmethod
+    def from_mask(cls, mask: int) -> PitchClassSet:
+        pitch_class_set = cls.__new__(cls)
+        pitch_class_set.mask = mask & FULL_MASK
+        return pitch_class_set
 
-        for pc in candidate:
-            interval = last_pc + pc
-            last_pc = pc
-            yield interval
+    @property
+    def ordered_list(self) -> List[int]:
+        return list(ORDERED_PCS[self.mask])
 
-    def _retrograde(self, reverse_me: Iterable[int]) -> Iterable[int]:
-        reversed_list = reverse_me.reverse()
+    @property
+    def ordered_set(self) -> List[int]:
+        return list(ORDERED_PCS[self.mask])
 
-        return reversed_list
+    @property
+    def cardinality(self) -> int:
+        return CARDINALITIES[self.mask]
 
-    def _retrograde_TI(self, reverse_me: Iterable[int]) -> Iterable[int]:
-        reversed_list = []
+    @property
+    def normal_order(self) -> List[int]:
+        return list(PRIME_FORMS[self.mask])
 
-        for var in reverse_me[::-1]:
-            if var == 0:
-                var = CLOCKFACE
+    @property
+    def prime_form(self) -> List[int]:
+        return list(PRIME_FORMS[self.mask])
 
-            tied = ((CLOCKFACE - var) + reverse_me[-1]) % CLOCKFACE
+    @property
+    def normal_form(self) -> List[int]:
+        return list(NORMAL_ORDERS[self.mask])
 
-            reversed_list.append(tied)
+    @property
+    def forte_name(self) -> str:
+        return FORTE_NAMES[self.mask]
 
-        return reversed_list
+    @property
+    def interval_vector(self) -> Tuple[int, ...]:
+        return INTERVAL_VECTORS[self.mask]
 
     def transpose(self, interval: int) -> PitchClassSet:
-
-        new_pcs = [(pc + interval) % CLOCKFACE for pc in self.ordered_list]
-
-        return PitchClassSet(new_pcs)
+        return PitchClassSet.from_mask(transpose_mask(self.mask, interval))
 
     def invert(self) -> PitchClassSet:
-
-        new_pcs = [(CLOCKFACE - pc) % CLOCKFACE for pc in self.ordered_list]
-
-        return PitchClassSet(new_pcs)
+        return PitchClassSet.from_mask(INVERSIONS[self.mask])
 
     def transpositional_inversion(self, interval: int) -> PitchClassSet:
-
-        new_pcs = [
-            ((CLOCKFACE - pc) + interval) % CLOCKFACE for pc in self.ordered_list
-        ]
-
-        return PitchClassSet(new_pcs)
+        return PitchClassSet.from_mask(
+            transpose_mask(INVERSIONS[self.mask], interval)
+        )
 
     def get_compliment(self) -> PitchClassSet:
-
-        new_pcs = [x for x in range(CLOCKFACE) if x not in self.ordered_list]
-
-        return PitchClassSet(new_pcs)
+        return PitchClassSet.from_mask(self.mask ^ FULL_MASK)
@@ -1,2 +1,4 @@
 from .PitchClassSet import PitchClassSet
+from .set_classes import SetClassArrays, classify_set_classes, pitch_class_masks
+from .sonorities import SonorityArrays, iter_sonorities, score_sonorities
 from .AutoTranscribe import AutoTranscribe
\ No newline at end of file
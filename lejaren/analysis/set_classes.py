@@ -0,0 +1,183 @@
+"""
+Set-class analysis of many pitch-class sets at once.
+
+The per mask tables of lejaren.analysis.PitchClassSet are copied into NumPy
+arrays when the module is imported, so classifying a collection of sets is
+one table lookup per field rather than one PitchClassSet per set.
+
+Set classes are numbered 0 to 223 in Forte order, by cardinality and then
+by Forte number, so SET_CLASS_NAMES[0] is "0-1" and SET_CLASS_NAMES[-1] is
+"12-1". The numbers are small enough for histograms with np.bincount.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from lejaren.analysis.PitchClassSet import (
+    CARDINALITIES,
+    CLOCKFACE,
+    FORTE_NAMES,
+    FULL_MASK,
+    INTERVAL_VECTORS,
+    NORMAL_ORDERS,
+    PRIME_FORMS,
+    PRIME_MASKS,
+    SET_COUNT,
+)
+
+# padding after the pitch classes of a set in normal order and prime form
+# rows
+NO_PITCH_CLASS = -1
+
+BIT_VALUES = 1 << np.arange(CLOCKFACE, dtype=np.uint16)
+
+
+def _forte_order(prime_mask: int) -> tuple:
+    """Sort key of a set class: cardinality, then the number after the
+    hyphen of its Forte name"""
+    number = FORTE_NAMES[prime_mask].split("-")[1].lstrip("Z")
+    return CARDINALITIES[prime_mask], int(number)
+
+
+def _padded_table(rows) -> np.ndarray:
+    """(4096, 12) int8 table of pitch-class tuples, padded with
+    NO_PITCH_CLASS"""
+    table = np.full((SET_COUNT, CLOCKFACE), NO_PITCH_CLASS, dtype=np.int8)
+    for mask, pcs in enumerate(rows):
+        table[mask, : len(pcs)] = pcs
+    return table
+
+
+_CLASS_PRIME_MASKS = sorted(set(PRIME_MASKS), key=_forte_order)
+
+SET_CLASS_COUNT = len(_CLASS_PRIME_MASKS)
+
+SET_CLASS_NAMES = np.array([FORTE_NAMES[mask] for mask in _CLASS_PRIME_MASKS])
+
+SET_CLASS_PRIME_MASKS = np.array(_CLASS_PRIME_MASKS, dtype=np.uint16)
+
+_class_numbers = {mask: number for number, mask in enumerate(_CLASS_PRIME_MASKS)}
+
+SET_CLASS_TABLE = np.array(
+    [_class_numbers[prime_mask] for prime_mask in PRIME_MASKS], dtype=np.uint8
+)
+
+CARDINALITY_TABLE = np.array(CARDINALITIES, dtype=np.uint8)
+
+PRIME_MASK_TABLE = np.array(PRIME_MASKS, dtype=np.uint16)
+
+NORMAL_ORDER_TABLE = _padded_table(NORMAL_ORDERS)
+
+PRIME_FORM_TABLE = _padded_table(PRIME_FORMS)
+
+INTERVAL_VECTOR_TABLE = np.array(INTERVAL_VECTORS, dtype=np.uint8)
+
+for _table in (
+    SET_CLASS_NAMES,
+    SET_CLASS_PRIME_MASKS,
+    SET_CLASS_TABLE,
+    CARDINALITY_TABLE,
+    PRIME_MASK_TABLE,
+    NORMAL_ORDER_TABLE,
+    PRIME_FORM_TABLE,
+    INTERVAL_VECTOR_TABLE,
+):
+    _table.flags.writeable = False
+
+
+class SetClassArrays(NamedTuple):
+    """
+    Set-class analysis of a collection of pitch-class sets, one row per set
+    in the order they were given.
+
+    mask: 12-bit mask of each set, bit n for pitch class n (uint16).
+
+    cardinality: number of pitch classes (uint8).
+
+    normal_order: the pitch classes in normal order, as in
+    PitchClassSet.normal_form, padded with -1 to 12 columns (int8).
+
+    prime_form: the prime form, as in PitchClassSet.prime_form, padded with
+    -1 to 12 columns (int8).
+
+    set_class: number of the set class in Forte order, an index into
+    SET_CLASS_NAMES (uint8).
+
+    forte_name: Forte name such as "4-Z15" (str).
+
+    interval_vector: count of interval classes 1 to 6, 6 columns (uint8).
+    """
+
+    mask: np.ndarray
+    cardinality: np.ndarray
+    normal_order: np.ndarray
+    prime_form: np.ndarray
+    set_class: np.ndarray
+    forte_name: np.ndarray
+    interval_vector: np.ndarray
+
+
+def pitch_class_masks(sets) -> np.ndarray:
+    """
+    12-bit masks of a collection of pitch-class sets.
+
+    Arguments:
+
+    sets: an (n, 12) array whose column m is true, or nonzero, when pitch
+    class m is in the set, or an array of n masks with values 0 to 4095.
+
+    Returns:
+
+    (n,) uint16 array of masks.
+    """
+
+    sets = np.asarray(sets)
+
+    if sets.ndim == 2:
+        if sets.shape[1] != CLOCKFACE:
+            raise ValueError(
+                f"pitch class rows need {CLOCKFACE} columns, not {sets.shape[1]}"
+            )
+        return (sets != 0).astype(np.uint16) @ BIT_VALUES
+
+    if sets.ndim != 1:
+        raise ValueError(f"expected an (n, 12) array or n masks, not {sets.shape}")
+
+    if not sets.size:
+        return np.zeros(0, dtype=np.uint16)
+    if sets.dtype == np.bool_ or not np.issubdtype(sets.dtype, np.integer):
+        raise ValueError(f"masks must be integers, not {sets.dtype}")
+    if sets.min() < 0 or sets.max() > FULL_MASK:
+        raise ValueError(f"masks must be between 0 and {FULL_MASK}")
+
+    return sets.astype(np.uint16)
+
+
+def classify_set_classes(sets) -> SetClassArrays:
+    """
+    Normal orders, prime forms, Forte names and interval vectors of many
+    pitch-class sets, by table lookup.
+
+    Arguments:
+
+    sets: an (n, 12) boolean array, one row per set, or an array of n
+    12-bit masks. See pitch_class_masks.
+
+    Returns:
+
+    SetClassArrays.
+    """
+
+    masks = pitch_class_masks(sets)
+    set_classes = SET_CLASS_TABLE[masks]
+
+    return SetClassArrays(
+        mask=masks,
+        cardinality=CARDINALITY_TABLE[masks],
+        normal_order=NORMAL_ORDER_TABLE[masks],
+        prime_form=PRIME_FORM_TABLE[masks],
+        set_class=set_classes,
+        forte_name=SET_CLASS_NAMES[set_classes],
+        interval_vector=INTERVAL_VECTOR_TABLE[masks],
+    )
@@ -0,0 +1,221 @@
+"""
+Vertical sonorities of a Score.
+
+Every staff of every part is sliced wherever a note starts or stops
+sounding, and each slice holds the pitch classes sounding across all staves
+for its whole duration. Tied notes sound through the beats and barlines
+they cross, so a chord held under a tie is one slice however it is notated.
+Slices where nothing sounds are left out.
+
+The Score is read a measure at a time, on the measures of its longest staff
+as in Score.to_midi. Each measure's notes become NumPy arrays of times and
+12-bit pitch-class masks, and the slices come out as arrays, classified
+with lejaren.analysis.set_classes. No object is made per slice, so scores
+with hundreds of staves cost little more than reading their notes.
+"""
+
+from typing import Iterator, NamedTuple, Tuple
+
+import numpy as np
+
+from lejaren.analysis.set_classes import (
+    BIT_VALUES,
+    SET_CLASS_COUNT,
+    SET_CLASS_TABLE,
+)
+from lejaren.notation import Chord, Note, Score
+from lejaren.notation.midi import DEFAULT_PPQ
+
+PC_BITS = np.arange(12, dtype=np.uint16)
+
+
+class SonorityArrays(NamedTuple):
+    """
+    Slices of a Score, in order, one array entry per slice.
+
+    onset: start from the beginning of the score, in quarter notes
+    (float64).
+
+    duration: in quarter notes (float64).
+
+    mask: 12-bit mask of the sounding pitch classes, bit n for pitch class n
+    (uint16).
+
+    set_class: number of the set class in Forte order, an index into
+    lejaren.analysis.set_classes.SET_CLASS_NAMES (uint8).
+    """
+
+    onset: np.ndarray
+    duration: np.ndarray
+    mask: np.ndarray
+    set_class: np.ndarray
+
+
+def _slice_arrays(onsets, ends, masks, ppq: int) -> SonorityArrays:
+    """SonorityArrays of slices given in ticks, without the silent ones"""
+
+    onsets = np.asarray(onsets, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    masks = np.asarray(masks, dtype=np.uint16)
+
+    sounding = masks != 0
+    onsets, ends, masks = onsets[sounding], ends[sounding], masks[sounding]
+
+    return SonorityArrays(
+        onset=onsets / ppq,
+        duration=(ends - onsets) / ppq,
+        mask=masks,
+        set_class=SET_CLASS_TABLE[masks],
+    )
+
+
+def iter_sonorities(score: Score, ppq: int = DEFAULT_PPQ) -> Iterator[SonorityArrays]:
+    """
+    Slice a Score into sonorities, a measure at a time.
+
+    Arguments:
+
+    score: the Score.
+
+    ppq: ticks per quarter note that note positions are rounded to, as in
+    Score.to_midi.
+
+    Returns:
+
+    An iterator of SonorityArrays, one per measure of the score and one
+    more for the final slice. A slice is yielded once it ends, so one held
+    over a barline comes with the measure it ends in.
+    """
+
+    score._refresh_measure_count()
+
+    staves = [staff for part in score._parts for staff in part["staves"]]
+
+    # whether each staff's last entry is tied into its next one
+    tied_forward = [False] * len(staves)
+
+    # the slice still sounding at the end of the last measure
+    pending_onset, pending_mask = 0, 0
+
+    measure_start = 0
+
+    for measure_index in range(score._measure_count):
+        time_signature = score._staff_measure(
+            score._longest_staff, measure_index
+        ).time_signature
+        measure_end = measure_start + ppq * 4 * time_signature[0] // time_signature[1]
+
+        starts, ends, masks = [], [], []
+
+        # slices can only start at an attack or where a note is released,
+        # not where a note is tied into the next
+        boundaries = [measure_start]
+
+        for staff_idx, staff in enumerate(staves):
+            measure = score._staff_measure(staff, measure_index)
+
+            # laid out durations are scaled by the measure's factor, and a
+            # unit of duration is one 1/ts[1] note
+            ticks_per_unit = ppq * 4 / measure.time_signature[1] / float(
+                measure.measure_factor
+            )
+            position = 0.0
+            tied_from = tied_forward[staff_idx]
+
+            for current_beat in measure.beats:
+                for entry in current_beat.notes:
+
+                    onset = measure_start + round(position * ticks_per_unit)
+                    position += float(entry.dur)
+                    release = measure_start + round(position * ticks_per_unit)
+
+                    if isinstance(entry, Chord):
+                        flagged = [entry] + entry.notes
+                        mask = 0
+                        for note in entry.notes:
+                            mask |= 1 << note.pc
+                    elif isinstance(entry, Note):
+                        flagged = [entry]
+                        mask = 1 << entry.pc
+                    else:
+                        tied_from = False
+                        continue
+
+                    tied_to = any(
+                        getattr(flag, "tie_start", False)
+                        or getattr(flag, "tie_continue", False)
+                        for flag in flagged
+                    )
+
+                    if release > onset:
+                        starts.append(onset)
+                        ends.append(release)
+                        masks.append(mask)
+                        if not tied_from:
+                            boundaries.append(onset)
+                        if not tied_to:
+                            boundaries.append(release)
+
+                    tied_from = tied_to
+
+            tied_forward[staff_idx] = tied_from
+
+        # points where anything starts or ends, and the pitch classes
+        # sounding from each point to the next, counted per pitch class
+        starts = np.clip(np.asarray(starts, dtype=np.int64), measure_start, measure_end)
+        ends = np.clip(np.asarray(ends, dtype=np.int64), measure_start, measure_end)
+        points = np.unique(np.concatenate([starts, ends, [measure_start, measure_end]]))
+
+        bits = (np.asarray(masks, dtype=np.uint16)[:, None] >> PC_BITS) & 1
+        counts = np.zeros((len(points), 12), dtype=np.int32)
+        np.add.at(counts, np.searchsorted(points, starts), bits)
+        np.subtract.at(counts, np.searchsorted(points, ends), bits)
+        segment_masks = (np.cumsum(counts, axis=0)[:-1] > 0).astype(np.uint16) @ BIT_VALUES
+
+        # a segment starts a new slice at a boundary or a change of pitch
+        # classes, otherwise it carries on the slice before it
+        previous_masks = np.concatenate([[pending_mask], segment_masks[:-1]])
+        new_slice = np.isin(points[:-1], boundaries) | (segment_masks != previous_masks)
+        if measure_index == 0:
+            new_slice[0] = True
+
+        slice_starts = np.flatnonzero(new_slice)
+        onsets = np.concatenate([[pending_onset], points[slice_starts]])
+        slice_masks = np.concatenate([[pending_mask], segment_masks[slice_starts]])
+
+        yield _slice_arrays(onsets[:-1], onsets[1:], slice_masks[:-1], ppq)
+
+        pending_onset, pending_mask = onsets[-1], slice_masks[-1]
+        measure_start = measure_end
+
+    yield _slice_arrays([pending_onset], [measure_start], [pending_mask], ppq)
+
+
+def score_sonorities(
+    score: Score, ppq: int = DEFAULT_PPQ
+) -> Tuple[SonorityArrays, np.ndarray]:
+    """
+    The sonorities of a whole Score and how often each set class occurs.
+
+    Arguments:
+
+    score: the Score.
+
+    ppq: ticks per quarter note, see iter_sonorities.
+
+    Returns:
+
+    SonorityArrays of every slice, and an array of the number of slices of
+    each set class, indexed like SET_CLASS_NAMES. For time spent in each
+    set class instead, use np.bincount with the durations as weights.
+    """
+
+    chunks = list(iter_sonorities(score, ppq))
+
+    sonorities = SonorityArrays(
+        *(np.concatenate([getattr(chunk, field) for chunk in chunks])
+          for field in SonorityArrays._fields)
+    )
+    histogram = np.bincount(sonorities.set_class, minlength=SET_CLASS_COUNT)
+
+    return sonorities, histogram
@@ -122,29 +122,21 @@ class Voice:
             checking_range = temp_range
         else:
             checking_range = self.inst_range
-        for note in note_list:
-            if isinstance(note, Note):
-                if note.octave == checking_range[0][0] and note.pc < checking_range[0][1]:
-                    temp_note = Note(note.dur, note.octave + 1, note.pc)
-                    temp_list.append(temp_note)
-
-                elif note.octave == checking_range[0][0] and note.pc >= checking_range[0][1]:
-                    temp_list.append(note)
-
-                elif note.octave < checking_range[0][0]:
-                    temp_note = Note(note.dur, checking_range[0][0], note.pc)
-                    temp_list.append(temp_note)
 
-                elif note.octave == checking_range[1][0] and note.pc > checking_range[1][1]:
-                    temp_note = Note(note.dur, note.octave - 1, note.pc)
-                    temp_list.append(temp_note)
+        lowest = checking_range[0][0] * 12 + checking_range[0][1]
+        highest = checking_range[1][0] * 12 + checking_range[1][1]
 
-                elif note.octave == checking_range[1][0] and note.pc <= checking_range[1][1]:
-                    temp_list.append(note)
-
-                elif note.octave > checking_range[1][0]:
-                    temp_note = Note(note.dur, checking_range[1][0], note.pc)
-                    temp_list.append(temp_note)  
+        for note in note_list:
+            if isinstance(note, Note):
+                pitch = note.pitch_number
+                if pitch < lowest:
+                    # up by as many octaves as it takes to reach the range
+                    octaves = -((pitch - lowest) // 12)
+                    temp_list.append(Note(note.dur, note.octave + octaves, note.pc))
+
+                elif pitch > highest:
+                    octaves = -((highest - pitch) // 12)
+                    temp_list.append(Note(note.dur, note.octave - octaves, note.pc))
 
                 else:
                     temp_list.append(note)
@@ -0,0 +1,197 @@
+"""
+On-disk cache of imported scores.
+
+Imported Scores are stored as snapshots (see lejaren.notation.snapshot) in
+a cache directory, named by the sha256 of the source file together with the
+importer and snapshot versions. A hit loads the snapshot without parsing
+any XML, and a change to the file, the importer or the snapshot format is a
+miss.
+
+The directory is kept under a size limit by evicting the least recently
+used snapshots. Use is recorded in each file's modification time, since
+access times are often not kept.
+"""
+
+import hashlib
+import os
+import pathlib
+import tempfile
+from typing import Optional, Union
+
+from ..notation.score import Score
+from ..notation.snapshot import (
+    SNAPSHOT_READ_ERRORS,
+    SNAPSHOT_VERSION,
+    load_snapshot,
+    save_snapshot,
+)
+from .import_musicxml import IMPORTER_VERSION, import_musicxml
+import lejaren.log as logger
+
+log = logger.get_logger()
+
+DEFAULT_CACHE_BYTES = 1 << 30
+
+CACHE_SUFFIX = ".snap"
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def source_key(input_filepath: Union[str, pathlib.Path]) -> str:
+    """
+    Cache key of a source file.
+
+    Arguments:
+
+    input_filepath: MusicXML or .mxl file.
+
+    Returns:
+
+    hex sha256 of the file's bytes, followed by the importer and snapshot
+    versions.
+    """
+
+    sha256 = hashlib.sha256()
+
+    with open(input_filepath, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(HASH_CHUNK_BYTES), b""):
+            sha256.update(chunk)
+
+    return f"{sha256.hexdigest()}-i{IMPORTER_VERSION}-s{SNAPSHOT_VERSION}"
+
+
+class ImportCache:
+    """
+    A directory of imported Scores, keyed by source content.
+
+    Attributes:
+
+    cache_dir: the directory, created if needed.
+
+    max_bytes: size the directory is trimmed to after each store.
+
+    hits, misses: lookups since the cache was opened.
+
+    Methods:
+    --------
+
+    import_score(input_filepath)
+    The cached Score of a file, importing and storing it on a miss.
+
+    get(key), put(key, score)
+    Look up and store Scores by source_key.
+
+    evict()
+    Remove least recently used entries until under max_bytes.
+
+    clear()
+    Remove every entry.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, pathlib.Path],
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+    ) -> None:
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / (key + CACHE_SUFFIX)
+
+    def get(self, key: str) -> Optional[Score]:
+        """The Score stored under key, or None. An entry that cannot be read
+        is removed and counts as a miss."""
+
+        entry_path = self._entry_path(key)
+
+        try:
+            score = load_snapshot(entry_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except SNAPSHOT_READ_ERRORS as e:
+            # written by another version, truncated or damaged
+            log.warning(
+                f"Dropping cache entry {entry_path.name}: {type(e).__name__}: {e}"
+            )
+            entry_path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # mark as recently used
+        os.utime(entry_path)
+        self.hits += 1
+
+        return score
+
+    def put(self, key: str, score: Score) -> None:
+        """Store a Score under key, then trim the cache"""
+
+        # written next to the entry and renamed, so readers never see part
+        # of a snapshot
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.cache_dir, suffix=".tmp"
+        )
+        os.close(file_descriptor)
+
+        try:
+            save_snapshot(score, temporary_path)
+            os.replace(temporary_path, self._entry_path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        self.evict()
+
+    def import_score(self, input_filepath: Union[str, pathlib.Path]) -> Score:
+        """
+        Import a MusicXML or .mxl file through the cache.
+
+        Arguments:
+
+        input_filepath: the file to import.
+
+        Returns:
+
+        the Score, loaded from its snapshot on a hit.
+        """
+
+        key = source_key(input_filepath)
+        score = self.get(key)
+
+        if score is None:
+            score = import_musicxml(str(input_filepath))
+            self.put(key, score)
+
+        return score
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in
+        max_bytes"""
+
+        entries = []
+        total_bytes = 0
+
+        for entry_path in self.cache_dir.glob("*" + CACHE_SUFFIX):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+            total_bytes += stat.st_size
+
+        entries.sort()
+
+        for _, size, entry_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        for entry_path in self.cache_dir.glob("*" + CACHE_SUFFIX):
+            entry_path.unlink(missing_ok=True)
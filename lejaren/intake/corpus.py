@@ -0,0 +1,288 @@
+"""
+Bulk import of a corpus of MusicXML and .mxl files.
+
+Files are imported in a pool of worker processes. Workers send back a small
+ImportSummary per file rather than the imported Score, whose object graph
+is slow to pickle. With a snapshot directory, each worker also saves its
+Score as a snapshot that the parent can load lazily when it needs the notes.
+
+A file that fails to import is reported in its summary's error, and the
+rest of the batch carries on. So is a file whose worker process dies: the
+files left unfinished by the broken pool are imported again, one at a time
+in a new pool, until the file that kills its worker is found.
+"""
+
+import glob
+import hashlib
+import os
+import pathlib
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, List, NamedTuple, Optional, Union
+
+from ..notation.chord import Chord
+from ..notation.note import Note
+from ..notation.snapshot import save_snapshot
+from .import_musicxml import import_musicxml
+import lejaren.log as logger
+
+log = logger.get_logger()
+
+CORPUS_SUFFIXES = (".musicxml", ".xml", ".mxl")
+
+SNAPSHOT_SUFFIX = ".snap"
+
+
+class ImportSummary(NamedTuple):
+    """
+    What one file of a corpus holds, or why it could not be imported.
+
+    path: the imported file.
+
+    title, composer: from the document, if it has them.
+
+    parts, staves, measures, notes: counts of the imported Score. Notes
+    counts every Note, chord members included.
+
+    seconds: time taken to import the file.
+
+    snapshot: path of the saved snapshot, when a snapshot directory is given.
+
+    error: "ExceptionType: message" when the import failed, otherwise None.
+    """
+
+    path: str
+    title: Optional[str] = None
+    composer: Optional[str] = None
+    parts: int = 0
+    staves: int = 0
+    measures: int = 0
+    notes: int = 0
+    seconds: float = 0.0
+    snapshot: Optional[str] = None
+    error: Optional[str] = None
+
+
+ProgressCallback = Callable[[int, int, ImportSummary], None]
+
+
+def find_corpus_files(source: Union[str, pathlib.Path]) -> List[pathlib.Path]:
+    """
+    Files of a corpus, in sorted order.
+
+    Arguments:
+
+    source: a directory, searched recursively for .musicxml, .xml and .mxl
+    files, or a glob pattern such as "corpus/**/*.mxl".
+
+    Returns:
+
+    list of paths.
+    """
+
+    source_path = pathlib.Path(source)
+
+    if source_path.is_dir():
+        return sorted(
+            path
+            for path in source_path.rglob("*")
+            if path.suffix.lower() in CORPUS_SUFFIXES and path.is_file()
+        )
+
+    return sorted(pathlib.Path(path) for path in glob.glob(str(source), recursive=True))
+
+
+def snapshot_path(snapshot_dir: Union[str, pathlib.Path], path: pathlib.Path) -> pathlib.Path:
+    """Snapshot file for a corpus file. The name carries a hash of the full
+    path, so files with the same name in different folders do not clash."""
+
+    path_hash = hashlib.sha256(str(path).encode("utf-8")).hexdigest()[:12]
+    return pathlib.Path(snapshot_dir) / f"{path.stem}-{path_hash}{SNAPSHOT_SUFFIX}"
+
+
+def import_summary(
+    path: Union[str, pathlib.Path], snapshot_dir: Optional[str] = None
+) -> ImportSummary:
+    """
+    Import one file and summarize it, catching any error.
+
+    Arguments:
+
+    path: MusicXML or .mxl file.
+
+    snapshot_dir: if given, save the Score there, see snapshot_path.
+
+    Returns:
+
+    ImportSummary of the file.
+    """
+
+    path = pathlib.Path(path)
+    start = time.perf_counter()
+
+    try:
+        score = import_musicxml(str(path))
+
+        staves = [staff for part in score._parts for staff in part["staves"]]
+        notes = 0
+        for staff in staves:
+            for measure in staff.measures:
+                for beat in measure.beats:
+                    for entry in beat.notes:
+                        if isinstance(entry, Chord):
+                            notes += len(entry.notes)
+                        elif isinstance(entry, Note):
+                            notes += 1
+
+        saved_snapshot = None
+        if snapshot_dir is not None:
+            saved_snapshot = snapshot_path(snapshot_dir, path)
+            save_snapshot(score, saved_snapshot)
+            saved_snapshot = str(saved_snapshot)
+
+        return ImportSummary(
+            str(path),
+            title=score.title,
+            composer=score.composer,
+            parts=len(score._parts),
+            staves=len(staves),
+            measures=score._measure_count,
+            notes=notes,
+            seconds=time.perf_counter() - start,
+            snapshot=saved_snapshot,
+        )
+
+    except Exception as e:
+        return ImportSummary(
+            str(path),
+            seconds=time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+
+def load_corpus(
+    source: Union[str, pathlib.Path, Iterable[Union[str, pathlib.Path]]],
+    processes: Optional[int] = None,
+    snapshot_dir: Optional[Union[str, pathlib.Path]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> List[ImportSummary]:
+    """
+    Import every file of a corpus in a process pool.
+
+    Arguments:
+
+    source: a directory or glob pattern (see find_corpus_files), or an
+    iterable of file paths.
+
+    processes: worker processes, os.cpu_count() by default. With 1, files
+    are imported in this process.
+
+    snapshot_dir: if given, each Score is saved there as a snapshot, and
+    its path is in the summary.
+
+    progress: called as progress(done, total, summary) as each file
+    finishes, in completion order.
+
+    Returns:
+
+    an ImportSummary per file, in the order of the files. Failed files
+    have their error set.
+    """
+
+    if isinstance(source, (str, pathlib.Path)):
+        paths = find_corpus_files(source)
+    else:
+        paths = [pathlib.Path(path) for path in source]
+
+    if snapshot_dir is not None:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        snapshot_dir = str(snapshot_dir)
+
+    total = len(paths)
+    summaries: List[Optional[ImportSummary]] = [None] * total
+    done = 0
+
+    def finish(index: int, summary: ImportSummary) -> None:
+        nonlocal done
+        summaries[index] = summary
+        done += 1
+        if summary.error:
+            log.warning(f"Could not import {summary.path}: {summary.error}")
+        if progress is not None:
+            progress(done, total, summary)
+
+    if processes == 1 or total <= 1:
+        for index, path in enumerate(paths):
+            finish(index, import_summary(path, snapshot_dir))
+        return summaries
+
+    remaining = list(range(total))
+    workers = processes
+
+    while remaining:
+        remaining = _run_pool(paths, remaining, workers, snapshot_dir, finish)
+
+        if not remaining:
+            break
+        elif workers == 1:
+            # files run one at a time in submission order, so the first one
+            # that did not finish is the one that killed the worker. The
+            # rest go back to a full-size pool.
+            index = remaining.pop(0)
+            finish(
+                index,
+                ImportSummary(
+                    str(paths[index]),
+                    error="BrokenProcessPool: the worker importing this file died",
+                ),
+            )
+            workers = processes
+        else:
+            log.warning(
+                f"A worker process died, retrying {len(remaining)} files one at a time "
+                f"until the file that killed it is found"
+            )
+            workers = 1
+
+    return summaries
+
+
+def _run_pool(
+    paths: List[pathlib.Path],
+    indices: List[int],
+    processes: Optional[int],
+    snapshot_dir: Optional[str],
+    finish: Callable[[int, ImportSummary], None],
+) -> List[int]:
+    """
+    Import the files at indices in a new process pool.
+
+    Returns:
+
+    the indices, in order, of the files left unfinished because a worker
+    died and took the pool with it.
+    """
+
+    unfinished = []
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {
+            executor.submit(import_summary, paths[index], snapshot_dir): index
+            for index in indices
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                summary = future.result()
+            except BrokenExecutor:
+                unfinished.append(index)
+                continue
+            except Exception as e:
+                # import_summary catches import errors, so this is a summary
+                # that could not be sent back
+                summary = ImportSummary(
+                    str(paths[index]), error=f"{type(e).__name__}: {e}"
+                )
+            finish(index, summary)
+
+    return sorted(unfinished)
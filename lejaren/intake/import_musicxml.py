@@ -1,25 +1,784 @@
+"""
+Import of partwise MusicXML into Score objects.
+
+Documents are read with lxml's iterparse one <measure> at a time. Each
+measure is converted to Notes, Rests and Chords as soon as it is complete,
+then cleared along with everything before it, so memory use is bounded by
+the Score being built rather than by the size of the document.
+
+Compressed .mxl files are read in place: the score document named by
+META-INF/container.xml is streamed out of the ZIP archive into the same
+reader, without extracting it to disk.
+
+Documents are validated before they are parsed: only the prolog up to the
+root element, and the end of the file, are read, so files that are not
+MusicXML scores or were cut short are rejected at once. score-timewise
+documents are read as they stream, each <part> of a timewise <measure>
+going to that part's reader, so they are never converted to a partwise
+tree first.
+
+Each staff of a part becomes a Part. Durations are converted to Part units
+(one 1/beat-type note), tied notes are merged into one entry for the Part
+to lay out again, and time signature changes are kept per measure. A pickup
+measure is filled out with a rest before its notes, so every later note
+keeps its place in its measure.
+"""
+
+import io
+import zipfile
+from contextlib import contextmanager
+from decimal import Decimal
 from re import search
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 from lxml import etree
 
-from ..notation.score import Score
+from ..notation.chord import Chord
+from ..notation.note import Note
+from ..notation.part import Part
+from ..notation.rest import Rest
+from ..notation.score import MXL_CONTAINER_PATH, MXL_ROOTFILE_MEDIA_TYPE, Score
+import lejaren.log as logger
+
+log = logger.get_logger()
+
+STEP_PITCH_CLASSES = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+
+DEFAULT_TIME_SIGNATURE = (4, 4)
+
+# bumped whenever the same document would import differently, so that
+# cached imports are not reused across the change
+IMPORTER_VERSION = 3
+
+MUSICXML_ROOTS = ("score-partwise", "score-timewise")
+
+# the prolog is parsed in chunks of this size until the root start tag
+PROLOG_CHUNK_BYTES = 1 << 14
+
+# bytes at the end of a file searched for the root end tag
+TAIL_BYTES = 1 << 10
+
+# local file header signature, at the start of every ZIP archive
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+# elements iterparse reports; everything inside a <measure> is read from the
+# finished measure
+IMPORT_TAGS = ("score-partwise", "score-timewise", "movement-title", "creator", "part", "measure")
+
+
+class ImportedNote(NamedTuple):
+    """
+    One <note> of a measure, before chords are grouped.
+
+    note: the Note or Rest.
+
+    tied: the note is tied to the next note of the same pitch.
+    """
+
+    note: Union[Note, Rest]
+    tied: bool
+
+
+class _Staff:
+    """Entries of one staff as they are read, with the open tie and the
+    notes of the chord being read"""
+
+    def __init__(self):
+        self.entries = []
+
+        # duration of the staff in the current measure, in divisions
+        self.position = Decimal(0)
+
+        # last entry, while every note in it is tied forward
+        self.tied_entry = None
+
+        self.group = []
+
+        # the last note read was left out, so its chord is too
+        self.skipping = False
+
+    def flush(self) -> None:
+        """Turn the notes read since the last non-chord note into an entry"""
+
+        if not self.group:
+            return
+
+        group, self.group = self.group, []
+        notes = [imported.note for imported in group]
+
+        if isinstance(notes[0], Rest):
+            self.entries.append(notes[0])
+            self.tied_entry = None
+            return
+
+        # a tie start joins the next notes of the same pitches, whether or
+        # not they carry the matching tie stop
+        if self._continues_tie(notes):
+            # the tied entry takes the duration of the new notes
+            extra = notes[0].dur
+            for note in _entry_notes(self.tied_entry):
+                note.change_duration(note.dur + extra)
+            if isinstance(self.tied_entry, Chord):
+                self.tied_entry.dur += extra
+            entry = self.tied_entry
+        else:
+            entry = notes[0] if len(notes) == 1 else Chord(notes)
+            self.entries.append(entry)
+
+        tied_forward = all(imported.tied for imported in group)
+        self.tied_entry = entry if tied_forward else None
+
+    def _continues_tie(self, notes: List[Note]) -> bool:
+        if self.tied_entry is None:
+            return False
+        tied_pitches = sorted(note.pitch_number for note in _entry_notes(self.tied_entry))
+        return tied_pitches == sorted(note.pitch_number for note in notes)
+
+
+def _entry_notes(entry: Union[Note, Chord]) -> List[Note]:
+    return entry.notes if isinstance(entry, Chord) else [entry]
+
+
+class PartReader:
+    """
+    Builds the staves of one <part> from its <measure> elements.
+
+    Attributes:
+    -----------
+
+    divisions: current divisions per quarter note.
+
+    time_signature: current time signature.
+
+    time_signatures: time signature of every measure read so far.
+
+    staff_count: number of staves, from <staves>.
+
+    skipped_notes: number of notes left out because they overlap an earlier
+    note of their staff, as the notes of a second voice do. A Part holds
+    one voice.
+
+    at_score_start: whether the first measure read is the first of the
+    score, and so may be a pickup. False when reading a range of measures
+    from later in the score.
+
+    Methods:
+    --------
+
+    read_measure: convert one <measure> element.
+
+    read_attributes: take the settings of an <attributes> element.
+
+    staff_entries: the entries of each staff, before layout.
+
+    parts: the Parts for the staves read.
+    """
+
+    def __init__(self, at_score_start: bool = True):
+        self.divisions = Decimal(1)
+        self.time_signature = DEFAULT_TIME_SIGNATURE
+        self.time_signatures = []
+        self.staff_count = 1
+        self.skipped_notes = 0
+        self.at_score_start = at_score_start
+        self._staves: Dict[int, _Staff] = {}
+
+    def read_measure(self, xml_measure: etree.Element) -> None:
+        """
+        Convert a <measure> to entries on its staves.
+
+        Arguments:
+
+        xml_measure: a complete <measure> element.
+        """
+
+        cursor = Decimal(0)
+
+        # the furthest point reached in the measure, in divisions
+        measure_end = Decimal(0)
+
+        for staff in self._staves.values():
+            staff.position = Decimal(0)
+
+        for xml_child in xml_measure:
+            tag = xml_child.tag
+
+            if tag == "attributes":
+                divisions = self.divisions
+                self.read_attributes(xml_child)
+
+                # positions so far were counted in the old divisions
+                if self.divisions != divisions:
+                    cursor = cursor * self.divisions / divisions
+                    for staff in self._staves.values():
+                        staff.position = staff.position * self.divisions / divisions
+
+            elif tag == "note":
+                cursor = self._read_note(xml_child, cursor)
+
+            elif tag == "backup":
+                cursor -= _element_decimal(xml_child, "duration")
+                cursor = max(cursor, Decimal(0))
+
+            elif tag == "forward":
+                cursor += _element_decimal(xml_child, "duration")
+
+            measure_end = max(measure_end, cursor)
+
+        is_first_measure = self.at_score_start and not self.time_signatures
+        self.time_signatures.append(self.time_signature)
+
+        measure_length = self._measure_length()
+
+        # a short first measure is a pickup, which ends on the barline. A Part
+        # only holds whole measures, so the rest of it goes in front.
+        lead_in = Decimal(0)
+        if is_first_measure and measure_end < measure_length:
+            lead_in = measure_length - measure_end
+
+        # staves that stop short of the barline are filled with rests
+        for staff_number in range(1, self.staff_count + 1):
+            staff = self._staff(staff_number)
+            staff.flush()
+            if staff.position < measure_length - lead_in:
+                self._append_rest(staff, measure_length - lead_in - staff.position)
+            if lead_in:
+                staff.entries.insert(0, Rest(self._units(lead_in)))
+            staff.position = measure_length
+
+    def staff_entries(self) -> List[List[Union[Note, Rest, Chord]]]:
+        """
+        Entries read so far, before layout.
+
+        Returns:
+
+        a list of Notes, Rests and Chords per staff, in staff order, with
+        durations in Part units.
+        """
+
+        entries = []
+
+        for staff_number in range(1, self.staff_count + 1):
+            staff = self._staff(staff_number)
+            staff.flush()
+            entries.append(staff.entries)
+
+        return entries
+
+    def parts(self) -> List[Part]:
+        """
+        Lay out every staff read. Layout splits and scales the entries in
+        place.
+
+        Returns:
+
+        a Part per staff, in staff order. Staves share the time signature
+        of each measure.
+        """
+
+        if self.skipped_notes:
+            log.warning(
+                f"Left out {self.skipped_notes} notes of a second voice on a staff"
+            )
+
+        time_signatures = self.time_signatures or [self.time_signature]
+        if len(set(time_signatures)) == 1:
+            time_signatures = time_signatures[:1]
+
+        return [
+            Part(entries, list(time_signatures)) for entries in self.staff_entries()
+        ]
+
+    def _staff(self, staff_number: int) -> _Staff:
+        try:
+            return self._staves[staff_number]
+        except KeyError:
+            staff = self._staves[staff_number] = _Staff()
+            return staff
+
+    def read_attributes(self, xml_attributes: etree.Element) -> None:
+        """Take divisions, staves and time signature from <attributes>"""
+
+        divisions = xml_attributes.findtext("divisions")
+        if divisions:
+            self.divisions = Decimal(divisions.strip())
+
+        staves = xml_attributes.findtext("staves")
+        if staves:
+            self.staff_count = max(self.staff_count, int(staves))
+
+        xml_time = xml_attributes.find("time")
+        if xml_time is not None and xml_time.find("beats") is not None:
+            # additive meters such as 3+2 are read as their sum
+            beats = sum(int(beat) for beat in xml_time.findtext("beats").split("+"))
+            beat_type = int(xml_time.findtext("beat-type"))
+            self.time_signature = (beats, beat_type)
+
+    def _read_note(self, xml_note: etree.Element, cursor: Decimal) -> Decimal:
+        """Add a <note> to its staff, returning the cursor after it"""
+
+        # grace notes take no time, and cue notes are not played
+        if xml_note.find("grace") is not None:
+            return cursor
+
+        is_chord = xml_note.find("chord") is not None
+        duration = _element_decimal(xml_note, "duration")
+
+        if xml_note.find("cue") is not None:
+            return cursor if is_chord else cursor + duration
+
+        staff_number = int(xml_note.findtext("staff") or 1)
+        staff = self._staff(staff_number)
+        self.staff_count = max(self.staff_count, staff_number)
+
+        if is_chord:
+            # chord notes start with the previous note
+            cursor -= duration
+
+        if duration <= 0:
+            return cursor + duration
+
+        if not is_chord:
+            staff.skipping = cursor < staff.position
+            if staff.skipping:
+                # a second voice on the staff, which a Part cannot hold
+                self._skip_note(xml_note, cursor)
+                return cursor + duration
+
+            staff.flush()
+            if cursor > staff.position:
+                self._append_rest(staff, cursor - staff.position)
+
+            staff.position = cursor + duration
+
+        elif staff.skipping:
+            self._skip_note(xml_note, cursor)
+            return cursor + duration
+
+        elif not staff.group:
+            return cursor + duration
+
+        tie_types = {xml_tie.get("type") for xml_tie in xml_note.iter("tie", "tied")}
+        note = self._convert_note(xml_note, self._units(duration))
+
+        staff.group.append(
+            ImportedNote(note, "start" in tie_types or "continue" in tie_types)
+        )
+
+        return cursor + duration
+
+    def _skip_note(self, xml_note: etree.Element, cursor: Decimal) -> None:
+        log.debug(f"Skipping overlapping note at {cursor} divisions")
+        if xml_note.find("rest") is None:
+            self.skipped_notes += 1
+
+    def _convert_note(self, xml_note: etree.Element, duration: Decimal) -> Union[Note, Rest]:
+
+        if xml_note.find("rest") is not None:
+            return Rest(duration)
+
+        xml_pitch = xml_note.find("pitch")
+        xml_unpitched = xml_note.find("unpitched")
+
+        if xml_pitch is not None:
+            step = xml_pitch.findtext("step")
+            octave = xml_pitch.findtext("octave")
+            # microtonal alterations are rounded to the nearest semitone
+            alter = round(float(xml_pitch.findtext("alter") or 0))
+        elif xml_unpitched is not None:
+            # unpitched notes are placed at their display position
+            step = xml_unpitched.findtext("display-step")
+            octave = xml_unpitched.findtext("display-octave")
+            alter = 0
+        else:
+            step, octave, alter = None, None, 0
+
+        if step not in STEP_PITCH_CLASSES or octave is None:
+            raise ValueError(f"Note without a pitch or rest: {etree.tostring(xml_note)!r}")
+
+        return Note(duration, int(octave), STEP_PITCH_CLASSES[step] + alter)
+
+    def _append_rest(self, staff: _Staff, duration: Decimal) -> None:
+        staff.flush()
+        staff.entries.append(Rest(self._units(duration)))
+        staff.tied_entry = None
+
+    def _units(self, duration: Decimal) -> Decimal:
+        """Divisions to Part units, 1/beat-type notes of the current meter"""
+        return duration * self.time_signature[1] / (self.divisions * 4)
+
+    def _measure_length(self) -> Decimal:
+        """Length of a full measure of the current meter, in divisions"""
+        beats, beat_type = self.time_signature
+        return beats * self.divisions * 4 / beat_type
+
+
+def _element_decimal(xml_element: etree.Element, tag: str) -> Decimal:
+    text = xml_element.findtext(tag)
+    return Decimal(text.strip()) if text else Decimal(0)
+
+
+def _release(xml_element: etree.Element) -> None:
+    """Free a processed element and the siblings read before it"""
+    xml_element.clear(keep_tail=True)
+    while xml_element.getprevious() is not None:
+        del xml_element.getparent()[0]
+
+
+def _staves_to_part(parts: List[Part]) -> Union[Part, List[Part]]:
+    return parts[0] if len(parts) == 1 else parts
+
+
+def is_mxl(source) -> bool:
+    """Whether a path or binary file object holds a ZIP archive rather than
+    an XML document. File objects are left where they were: streams that
+    cannot seek, such as pipes, are peeked at if they are buffered, and are
+    taken to be XML otherwise."""
+
+    if hasattr(source, "read"):
+        if not source.seekable():
+            peek = getattr(source, "peek", None)
+            return peek is not None and peek(len(ZIP_SIGNATURE)).startswith(
+                ZIP_SIGNATURE
+            )
+
+        position = source.tell()
+        try:
+            return zipfile.is_zipfile(source)
+        finally:
+            source.seek(position)
+
+    return zipfile.is_zipfile(source)
+
+
+def mxl_rootfile_name(mxl: zipfile.ZipFile) -> str:
+    """
+    Name of the score document in an .mxl archive.
+
+    Arguments:
+
+    mxl: the open archive.
+
+    Returns:
+
+    the first MusicXML rootfile of META-INF/container.xml. Archives without
+    a container fall back to the first .xml or .musicxml file at the top
+    level.
+    """
+
+    try:
+        container = mxl.read(MXL_CONTAINER_PATH)
+    except KeyError:
+        container = None
+
+    if container is not None:
+        parser = etree.XMLParser(resolve_entities=False, no_network=True)
+        for xml_rootfile in etree.fromstring(container, parser).iterfind(
+            "rootfiles/rootfile"
+        ):
+            # other rootfiles are renderings such as PDFs
+            if xml_rootfile.get("media-type") in (None, MXL_ROOTFILE_MEDIA_TYPE):
+                return xml_rootfile.get("full-path")
+
+    for name in mxl.namelist():
+        if "/" not in name and name.endswith((".xml", ".musicxml")):
+            return name
+
+    raise ValueError("No MusicXML document in the .mxl archive")
+
+
+def _read_root_tag(document) -> str:
+    """Tag of the root element, parsing no further than its start tag"""
+
+    parser = etree.XMLPullParser(
+        events=("start",), resolve_entities=False, no_network=True
+    )
+
+    while True:
+        chunk = document.read(PROLOG_CHUNK_BYTES)
+        if not chunk:
+            raise ValueError("Document has no root element")
+        try:
+            parser.feed(chunk)
+            for _, xml_element in parser.read_events():
+                return xml_element.tag
+        except etree.XMLSyntaxError as e:
+            raise ValueError(f"Not an XML document: {e}") from e
+
+
+def _check_root_tag(root_tag: str) -> str:
+    if root_tag not in MUSICXML_ROOTS:
+        raise ValueError(f"<{root_tag}> documents are not MusicXML scores")
+    return root_tag
+
+
+def _check_tail(document, root_tag: str) -> None:
+    """Make sure a seekable document ends with the root end tag"""
+
+    document.seek(0, 2)
+    document.seek(max(0, document.tell() - TAIL_BYTES))
+    tail = document.read().rstrip()
+
+    # comments and processing instructions may follow the root element
+    if not tail.endswith((b"</" + root_tag.encode("ascii") + b">", b"-->", b"?>")):
+        raise ValueError(f"Document is truncated: it does not end with </{root_tag}>")
+
+
+def validate_musicxml(source) -> str:
+    """
+    Cheaply check that a document is a MusicXML score, before parsing it.
+
+    Only the prolog up to the root start tag is parsed. Plain files are also
+    checked for the root end tag at their end, which catches truncated
+    files. Members of .mxl archives are checked against their CRC by the
+    ZIP reader instead.
+
+    Arguments:
+
+    source: path or seekable binary file object of a MusicXML document or
+    .mxl archive. File objects are left where they were.
+
+    Returns:
+
+    the root tag, "score-partwise" or "score-timewise".
+
+    Raises ValueError for anything else.
+    """
+
+    if is_mxl(source):
+        with zipfile.ZipFile(source) as mxl:
+            with mxl.open(mxl_rootfile_name(mxl)) as rootfile:
+                return _check_root_tag(_read_root_tag(rootfile))
+
+    if hasattr(source, "read"):
+        position = source.tell()
+        try:
+            root_tag = _check_root_tag(_read_root_tag(source))
+            _check_tail(source, root_tag)
+        finally:
+            source.seek(position)
+        return root_tag
+
+    with open(source, "rb") as document:
+        root_tag = _check_root_tag(_read_root_tag(document))
+        _check_tail(document, root_tag)
+
+    return root_tag
+
+
+@contextmanager
+def open_musicxml(source) -> Iterator:
+    """The XML document of a path or binary file object. For an .mxl
+    archive, the rootfile is opened inside the archive. An archive read
+    from a stream that cannot seek is read into memory first."""
+
+    if is_mxl(source):
+        if hasattr(source, "read") and not source.seekable():
+            # the ZIP directory is at the end of the archive
+            source = io.BytesIO(source.read())
+        with zipfile.ZipFile(source) as mxl:
+            with mxl.open(mxl_rootfile_name(mxl)) as rootfile:
+                yield rootfile
+    else:
+        yield source
+
+
+def iter_musicxml(source) -> Tuple[Optional[str], Optional[str], List[Union[Part, List[Part]]]]:
+    """
+    Read a MusicXML document one measure at a time.
+
+    Arguments:
+
+    source: path or binary file object of a partwise or timewise MusicXML
+    document, or of a compressed .mxl archive holding one. Paths and
+    seekable file objects are validated first, see validate_musicxml.
+
+    Returns:
+
+    (title, composer, parts), where parts holds a Part per single staff
+    part and a list of Parts per multi-staff part, ready for Score.
+    """
+
+    if not hasattr(source, "read") or source.seekable():
+        validate_musicxml(source)
+
+    with open_musicxml(source) as document:
+        title, composer, readers = _iterparse_score(document)
+
+    return title, composer, [_staves_to_part(reader.parts()) for reader in readers]
+
+
+def _read_timewise_measure(readers: Dict[str, PartReader], xml_measure: etree.Element) -> None:
+    """Hand each <part> of a timewise <measure> to its part's reader. A
+    timewise <part> holds what a partwise <measure> would."""
+
+    read = set()
+
+    for xml_part in xml_measure.iterchildren("part"):
+        part_id = xml_part.get("id")
+        if part_id not in readers:
+            readers[part_id] = PartReader()
+        readers[part_id].read_measure(xml_part)
+        read.add(part_id)
+
+    # parts missing from the measure rest through it
+    for part_id, reader in readers.items():
+        if part_id not in read:
+            reader.read_measure(etree.Element("part"))
+
+
+def _iterparse_score(source) -> Tuple[Optional[str], Optional[str], List[PartReader]]:
+    """(title, composer, readers) of a document, with a PartReader per part
+    that has read all of its measures"""
+
+    title, composer = None, None
+    partwise_readers = []
+    reader = None
+    timewise = False
+
+    # timewise readers, by part id in order of appearance
+    readers = {}
+
+    context = etree.iterparse(
+        source,
+        events=("start", "end"),
+        tag=IMPORT_TAGS,
+        huge_tree=True,
+        resolve_entities=False,
+        no_network=True,
+    )
+
+    for event, xml_element in context:
+        tag = xml_element.tag
+
+        if event == "start":
+            if tag == "score-timewise":
+                timewise = True
+            elif tag == "part" and not timewise:
+                reader = PartReader()
+            continue
+
+        if timewise and tag == "measure":
+            _read_timewise_measure(readers, xml_element)
+            _release(xml_element)
+
+        elif timewise and tag == "part":
+            # read with its measure
+            continue
+
+        elif tag == "measure" and reader is not None:
+            reader.read_measure(xml_element)
+            _release(xml_element)
+
+        elif tag == "part" and reader is not None:
+            partwise_readers.append(reader)
+            reader = None
+            _release(xml_element)
+
+        elif tag == "movement-title":
+            title = xml_element.text
+
+        elif tag == "creator" and xml_element.get("type") == "composer":
+            composer = xml_element.text
+
+    if timewise:
+        return title, composer, list(readers.values())
+
+    return title, composer, partwise_readers
+
+
+def read_score_tree(
+    tree: etree.ElementTree,
+) -> Tuple[Optional[str], Optional[str], List[Union[Part, List[Part]]]]:
+    """
+    Read an already parsed partwise or timewise MusicXML document.
+
+    Arguments:
+
+    tree: the parsed document.
+
+    Returns:
+
+    (title, composer, parts), as iter_musicxml.
+    """
+
+    root = tree.getroot()
+    _check_root_tag(root.tag)
+
+    parts = []
+
+    if root.tag == "score-timewise":
+        readers = {}
+        for xml_measure in root.iterfind("measure"):
+            _read_timewise_measure(readers, xml_measure)
+        parts = [_staves_to_part(reader.parts()) for reader in readers.values()]
+
+    for xml_part in root.iterfind("part"):
+        reader = PartReader()
+        for xml_measure in xml_part.iterfind("measure"):
+            reader.read_measure(xml_measure)
+        parts.append(_staves_to_part(reader.parts()))
+
+    composer = None
+    for xml_creator in root.iterfind("identification/creator"):
+        if xml_creator.get("type") == "composer":
+            composer = xml_creator.text
+
+    return root.findtext("movement-title"), composer, parts
+
+
+def import_musicxml(source) -> Score:
+    """
+    Import a MusicXML document as a Score.
+
+    Arguments:
+
+    source: path or binary file object of a MusicXML document or .mxl
+    archive.
+
+    Returns:
+
+    a Score with the document's title, composer and parts.
+    """
+
+    title, composer, parts = iter_musicxml(source)
+
+    if not parts:
+        raise ValueError("MusicXML document has no parts")
+
+    return Score(parts, title=title, composer=composer)
+
 
 class inputParser:
 
-    def __init__(self, input: str) -> inputParser:
+    def __init__(self, input: str, cache=None) -> inputParser:
         if not isinstance(input, str):
             raise TypeError(f'File must me string, is: {input}', input)
         self._clean_input(input)
         self.input = input
+        # an ImportCache, see lejaren.intake.cache
+        self.cache = cache
 
     def _clean_input(self, input):
-        # TODO: Verify an xml input file is actaully MusicXML
+        # only the name is checked here, the contents are checked by validate()
+        # and on import
         cleaned_input = search(r'.*\.musicxml$|\.mxl$|\.xml$', input)
         if not cleaned_input:
             raise ValueError(f'File must be music xml, but is {input}', input)
         else:
             return input
 
-    def create_tree():
-        tree = etree.parse(input)
-        return Score(tree)
\ No newline at end of file
+    def validate(self) -> str:
+        """Check the input is a MusicXML score, see validate_musicxml"""
+        return validate_musicxml(self.input)
+
+    def create_tree(self) -> Score:
+        if self.cache is not None:
+            return self.cache.import_score(self.input)
+        return import_musicxml(self.input)
+
+    def create_lazy_score(self):
+        """An indexed LazyScore of the input, see lejaren.intake.lazy_score"""
+        from .lazy_score import LazyScore
+
+        return LazyScore(self.input)
@@ -1,15 +1,317 @@
-from lejaren.notation import Note
+"""
+Note-only extraction from MusicXML for analysis.
+
+extract_note_arrays streams a document into NumPy arrays of onsets,
+durations and MIDI pitches without creating Note objects or laying out
+measures, so it runs at close to the speed of the parser.
+"""
+
+from array import array
+from typing import NamedTuple
+
+import numpy as np
+from lxml import etree
+
+from lejaren.notation.midi import MIDI_PITCH_OFFSET
+
+from lejaren.intake.import_musicxml import (
+    STEP_PITCH_CLASSES,
+    _release,
+    inputParser,
+    open_musicxml,
+    validate_musicxml,
+)
+
+# two tied notes meet when the second starts this close to the end of the
+# first, in quarter notes
+TIE_TOLERANCE = 1e-9
+
+
+class NoteArrays(NamedTuple):
+    """
+    Every sounding note of a document, in document order, one array entry
+    per note.
+
+    onset: start from the beginning of the score, in quarter notes
+    (float64). <backup>, <forward> and <chord/> are followed, and each
+    measure ends at the furthest point reached in it.
+
+    duration: in quarter notes (float64). Durations in divisions are
+    converted as they are read, since divisions can change between
+    measures.
+
+    pitch: MIDI note number (int16), with Note(dur, 4, 0) at 60 as in
+    Score.to_midi.
+
+    part: index of the <part> (int16).
+
+    staff: staff number within the part, from 1 (int16).
+
+    measure: index of the measure within its part (int32).
+    """
+
+    onset: np.ndarray
+    duration: np.ndarray
+    pitch: np.ndarray
+    part: np.ndarray
+    staff: np.ndarray
+    measure: np.ndarray
+
+
+class _NoteArrayReader:
+    """Reads the measures of one part into the shared note arrays, keeping
+    the part's divisions, position and open ties between measures."""
+
+    def __init__(self, arrays, part_idx: int, merge_ties: bool):
+        self.arrays = arrays
+        self.part_idx = part_idx
+        self.merge_ties = merge_ties
+        self.measure_idx = 0
+        self.divisions = 1.0
+        self.measure_start = 0.0
+
+        # length of the last measure read, in quarter notes
+        self.measure_length = 0.0
+
+        # (staff, pitch) of notes tied forward, to the index of their entry
+        self.open_ties = {}
+
+    def read_measure(self, xml_measure: etree.Element) -> None:
+        """Read a partwise <measure>, or a <part> of a timewise one"""
+
+        onsets, durations, pitches, parts, staves, measures = self.arrays
+        open_ties = self.open_ties
+        divisions = self.divisions
+        measure_start = self.measure_start
+
+        # positions are in quarter notes from the start of the measure
+        cursor = 0.0
+        measure_end = 0.0
+        chord_onset = 0.0
+
+        for xml_child in xml_measure:
+            child_tag = xml_child.tag
+
+            if child_tag == "note":
+                duration = 0.0
+                is_chord = False
+                is_sounding = True
+                step, alter, octave = None, 0.0, None
+                staff = 1
+                tie_types = ()
+
+                for xml_field in xml_child:
+                    field_tag = xml_field.tag
+
+                    if field_tag == "duration":
+                        duration = float(xml_field.text) / divisions
+                    elif field_tag == "chord":
+                        is_chord = True
+                    elif field_tag == "pitch":
+                        step = xml_field.findtext("step")
+                        alter = float(xml_field.findtext("alter") or 0)
+                        octave = xml_field.findtext("octave")
+                    elif field_tag == "unpitched":
+                        step = xml_field.findtext("display-step")
+                        octave = xml_field.findtext("display-octave")
+                    elif field_tag == "staff":
+                        staff = int(xml_field.text)
+                    elif field_tag == "tie":
+                        tie_types += (xml_field.get("type"),)
+                    elif field_tag in ("rest", "cue"):
+                        is_sounding = False
+                    elif field_tag == "grace":
+                        is_sounding = False
+                        duration = 0.0
+
+                if is_chord:
+                    onset = chord_onset
+                else:
+                    onset = chord_onset = cursor
+                    cursor += duration
+                    measure_end = max(measure_end, cursor)
+
+                if not is_sounding or duration <= 0 or step is None:
+                    continue
+
+                onset += measure_start
+                pitch = (
+                    int(octave) * 12
+                    + STEP_PITCH_CLASSES[step]
+                    + round(alter)
+                    + MIDI_PITCH_OFFSET
+                )
+
+                if self.merge_ties:
+                    tie_key = (staff, pitch)
+                    tied_from = open_ties.get(tie_key)
+
+                    # as in the importer, a tie start is enough to join the
+                    # next note of the pitch that starts on time
+                    if (
+                        tied_from is not None
+                        and abs(onsets[tied_from] + durations[tied_from] - onset)
+                        < TIE_TOLERANCE
+                    ):
+                        durations[tied_from] += duration
+                        if "start" not in tie_types:
+                            del open_ties[tie_key]
+                        continue
+
+                    if "start" in tie_types:
+                        open_ties[tie_key] = len(onsets)
+
+                onsets.append(onset)
+                durations.append(duration)
+                pitches.append(pitch)
+                parts.append(self.part_idx)
+                staves.append(staff)
+                measures.append(self.measure_idx)
+
+            elif child_tag == "backup":
+                cursor -= float(xml_child.findtext("duration")) / divisions
+
+            elif child_tag == "forward":
+                cursor += float(xml_child.findtext("duration")) / divisions
+                measure_end = max(measure_end, cursor)
+
+            elif child_tag == "attributes":
+                measure_divisions = xml_child.findtext("divisions")
+                if measure_divisions:
+                    divisions = float(measure_divisions)
+
+        self.divisions = divisions
+        self.skip_measure(measure_end)
+
+    def skip_measure(self, length: float) -> None:
+        """Move past a measure without notes, length quarter notes long"""
+
+        self.measure_length = length
+        self.measure_start += length
+        self.measure_idx += 1
+
+
+def extract_note_arrays(source, merge_ties: bool = False) -> NoteArrays:
+    """
+    Read the notes of a partwise or timewise MusicXML document into arrays.
+
+    Rests, grace notes and cue notes are left out. Parts of a timewise
+    document are numbered in the order they first appear. A part missing
+    from a timewise measure rests through it, for as long as the longest
+    part that is there.
+
+    Arguments:
+
+    source: path or binary file object of a MusicXML document or .mxl
+    archive. Paths and seekable file objects are validated first, see
+    validate_musicxml.
+
+    merge_ties: add the duration of a note to the note tied to it, so each
+    tied group is one entry.
+
+    Returns:
+
+    NoteArrays.
+    """
+
+    if not hasattr(source, "read") or source.seekable():
+        validate_musicxml(source)
+
+    arrays = (
+        array("d"), array("d"), array("h"), array("h"), array("h"), array("i")
+    )
+
+    reader = None
+    timewise = False
+
+    # timewise readers, by part id in order of appearance
+    readers = {}
+
+    # start of the next timewise measure, and how many have been read
+    timewise_start, timewise_measures = 0.0, 0
+
+    with open_musicxml(source) as document:
+        context = etree.iterparse(
+            document,
+            events=("start", "end"),
+            tag=("part", "measure", "score-timewise"),
+            huge_tree=True,
+            resolve_entities=False,
+            no_network=True,
+        )
+
+        part_count = 0
+
+        for event, xml_element in context:
+            tag = xml_element.tag
+
+            if event == "start":
+                if tag == "score-timewise":
+                    timewise = True
+                elif tag == "part" and not timewise:
+                    reader = _NoteArrayReader(arrays, part_count, merge_ties)
+                    part_count += 1
+                continue
+
+            if timewise and tag == "measure":
+                read = set()
+                for xml_part in xml_element.iterchildren("part"):
+                    part_id = xml_part.get("id")
+                    if part_id not in readers:
+                        # a part that starts late starts where the others are
+                        part_reader = readers[part_id] = _NoteArrayReader(
+                            arrays, len(readers), merge_ties
+                        )
+                        part_reader.measure_start = timewise_start
+                        part_reader.measure_idx = timewise_measures
+                    readers[part_id].read_measure(xml_part)
+                    read.add(part_id)
+
+                measure_length = max(
+                    (readers[part_id].measure_length for part_id in read),
+                    default=0.0,
+                )
+                for part_id, part_reader in readers.items():
+                    if part_id not in read:
+                        part_reader.skip_measure(measure_length)
+
+                timewise_start += measure_length
+                timewise_measures += 1
+                _release(xml_element)
+
+            elif timewise and tag == "part":
+                # read with its measure
+                continue
+
+            elif tag == "measure" and reader is not None:
+                reader.read_measure(xml_element)
+                _release(xml_element)
+
+            elif tag == "part":
+                reader = None
+                _release(xml_element)
+
+    onsets, durations, pitches, parts, staves, measures = arrays
+
+    return NoteArrays(
+        np.frombuffer(onsets, dtype=np.float64),
+        np.frombuffer(durations, dtype=np.float64),
+        np.frombuffer(pitches, dtype=np.int16),
+        np.frombuffer(parts, dtype=np.int16),
+        np.frombuffer(staves, dtype=np.int16),
+        np.frombuffer(measures, dtype=np.int32),
+    )
 
-from lejaren.intake.import_musicxml import inputParser
 
 class noteIntake:
 
-    def __init__(self, parser=None, import_file=None):
+    def __init__(self, parser=None, import_file=None, cache=None):
         if not parser:
-            self.parser = inputParser(import_file)
+            self.parser = inputParser(import_file, cache=cache)
         else:
             self.parser = parser
-        self.Note = None # define now; must create note later
 
-    def _convert_to_note(self):
-        pass
\ No newline at end of file
+    def extract_notes(self, merge_ties: bool = False) -> NoteArrays:
+        """(onset, duration, pitch) arrays of the input, see
+        extract_note_arrays"""
+        return extract_note_arrays(self.parser.input, merge_ties)
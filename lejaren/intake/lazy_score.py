@@ -0,0 +1,328 @@
+"""
+Lazy import of partwise MusicXML.
+
+Opening a LazyScore memory maps the document and scans it once with a
+regular expression for the byte ranges of every <part>, <measure> and
+<attributes> element, without building any elements. Parts and ranges of
+measures are parsed only when they are asked for: each measure is parsed
+on its own from its byte range and read with the importer's PartReader.
+
+The <attributes> of earlier measures are parsed too, so a range of measures
+starts with the right divisions, staves and time signature. Ties into the
+first measure of a range are not followed, and only a range that starts at
+the first measure can start with a pickup. Tags inside comments, CDATA
+sections and processing instructions are not indexed.
+"""
+
+import mmap
+import re
+import zipfile
+from array import array
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+from lxml import etree
+
+from ..notation.part import Part
+from ..notation.score import Score
+from .import_musicxml import (
+    PartReader,
+    _staves_to_part,
+    is_mxl,
+    mxl_rootfile_name,
+    validate_musicxml,
+)
+import lejaren.log as logger
+
+log = logger.get_logger()
+
+# start and end tags of the indexed elements. <part-list>, <measure-style>
+# and the like are not matched, since the name must end the tag name. The
+# starts of comments, CDATA sections and processing instructions are matched
+# too, so tags inside them can be skipped.
+INDEX_TAG_RE = re.compile(
+    rb"<(?:(!--|!\[CDATA\[|\?)|(/?)(part|measure|attributes|score-timewise)([\s/>]))"
+)
+
+# end of each kind of markup skipped by the index
+SKIPPED_MARKUP_ENDS = {b"!--": b"-->", b"![CDATA[": b"]]>", b"?": b"?>"}
+
+PART_ID_RE = re.compile(rb"""\bid\s*=\s*["']([^"']*)["']""")
+
+HEADER_TAGS = ("movement-title", "identification")
+
+
+class PartIndex(NamedTuple):
+    """
+    Byte ranges of one <part>.
+
+    part_id: the part's id attribute.
+
+    measure_starts, measure_ends: offsets of each <measure> start tag and of
+    the end of the measure.
+
+    attributes: (measure index, start, end) of each <attributes> element.
+    """
+
+    part_id: str
+    measure_starts: array
+    measure_ends: array
+    attributes: list
+
+
+def _tag_end(buffer, position: int) -> int:
+    """Offset just past the tag that starts before position"""
+    return buffer.find(b">", position) + 1
+
+
+def index_musicxml(buffer) -> tuple:
+    """
+    Find the byte ranges of the parts, measures and attributes of a partwise
+    document.
+
+    Arguments:
+
+    buffer: bytes or mmap of the document.
+
+    Returns:
+
+    (header_end, part_indices), where header_end is the offset of the first
+    <part> and part_indices a PartIndex per part.
+    """
+
+    part_indices = []
+    header_end = None
+    current = None
+    measure_start = None
+    attributes_start = None
+
+    position = 0
+
+    while True:
+        match = INDEX_TAG_RE.search(buffer, position)
+        if match is None:
+            break
+        position = match.end()
+
+        skipped = match.group(1)
+        if skipped:
+            skipped_end = buffer.find(SKIPPED_MARKUP_ENDS[skipped], position)
+            if skipped_end == -1:
+                break
+            position = skipped_end + len(SKIPPED_MARKUP_ENDS[skipped])
+            continue
+
+        is_end_tag = match.group(2) == b"/"
+        tag = match.group(3)
+
+        if tag == b"score-timewise":
+            raise ValueError("Only partwise MusicXML can be imported")
+
+        if is_end_tag:
+            end = _tag_end(buffer, match.end() - 1)
+            if tag == b"measure" and measure_start is not None:
+                current.measure_starts.append(measure_start)
+                current.measure_ends.append(end)
+                measure_start = None
+            elif tag == b"attributes" and attributes_start is not None:
+                current.attributes.append(
+                    (len(current.measure_starts), attributes_start, end)
+                )
+                attributes_start = None
+            elif tag == b"part":
+                current = None
+            continue
+
+        start = match.start()
+        end = _tag_end(buffer, match.end() - 1)
+        self_closing = buffer[end - 2 : end] == b"/>"
+
+        if tag == b"part":
+            if header_end is None:
+                header_end = start
+            part_id = PART_ID_RE.search(buffer[start:end])
+            current = PartIndex(
+                part_id.group(1).decode("utf-8") if part_id else "",
+                array("Q"),
+                array("Q"),
+                [],
+            )
+            part_indices.append(current)
+
+        elif current is None:
+            continue
+
+        elif tag == b"measure":
+            if self_closing:
+                current.measure_starts.append(start)
+                current.measure_ends.append(end)
+            else:
+                measure_start = start
+
+        elif tag == b"attributes" and not self_closing:
+            attributes_start = start
+
+    return header_end, part_indices
+
+
+class LazyScore:
+    """
+    A MusicXML document indexed on open, with parts and measures parsed on
+    access.
+
+    Attributes:
+
+    title, composer : str or None
+
+    part_ids : list of the parts' ids
+
+    part_count : int
+
+    Methods:
+    --------
+
+    measure_count(part_idx)
+    Number of measures in a part.
+
+    load_part(part_idx, start=0, stop=None)
+    The part's staves as laid out Parts, optionally only some measures.
+
+    to_score(part_indices=None, start=0, stop=None)
+    A Score of some or all parts and measures.
+
+    close()
+    Unmaps the file. Also done when used as a context manager.
+    """
+
+    def __init__(self, input_filepath: str) -> None:
+
+        if validate_musicxml(input_filepath) != "score-partwise":
+            raise ValueError("Only partwise MusicXML can be opened lazily")
+
+        if is_mxl(input_filepath):
+            # compressed documents have to be inflated, but not parsed
+            with zipfile.ZipFile(input_filepath) as mxl:
+                self._buffer = mxl.read(mxl_rootfile_name(mxl))
+        else:
+            with open(input_filepath, "rb") as input_file:
+                self._buffer = mmap.mmap(
+                    input_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+
+        try:
+            header_end, self._part_indices = index_musicxml(self._buffer)
+        except Exception:
+            self.close()
+            raise
+
+        self.part_ids = [part_index.part_id for part_index in self._part_indices]
+        self.part_count = len(self._part_indices)
+        self.title, self.composer = self._read_header(header_end or 0)
+
+    def __enter__(self) -> "LazyScore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def _parse(self, start: int, end: int) -> etree.Element:
+        parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+        return etree.fromstring(bytes(self._buffer[start:end]), parser)
+
+    def _read_header(self, header_end: int) -> tuple:
+        """Title and composer, from the elements before the first part"""
+
+        title, composer = None, None
+
+        for tag in HEADER_TAGS:
+            start = self._buffer.find(b"<" + tag.encode("ascii"), 0, header_end)
+            if start == -1:
+                continue
+            end = self._buffer.find(b"</" + tag.encode("ascii") + b">", start, header_end)
+            if end == -1:
+                continue
+            xml_element = self._parse(start, _tag_end(self._buffer, end))
+
+            if tag == "movement-title":
+                title = xml_element.text
+            else:
+                for xml_creator in xml_element.iterfind("creator"):
+                    if xml_creator.get("type") == "composer":
+                        composer = xml_creator.text
+
+        return title, composer
+
+    def measure_count(self, part_idx: int) -> int:
+        return len(self._part_indices[part_idx].measure_starts)
+
+    def load_part(
+        self, part_idx: int, start: int = 0, stop: Optional[int] = None
+    ) -> Union[Part, List[Part]]:
+        """
+        Parse one part, or a range of its measures.
+
+        Arguments:
+
+        part_idx (int): index of the part in the score.
+
+        start, stop: measure indices, as in a slice. Every measure by default.
+
+        Returns:
+
+        A Part, or a list of Parts for a part with several staves. Each call
+        parses the measures again and returns new Parts.
+        """
+
+        part_index = self._part_indices[part_idx]
+        start, stop, _ = slice(start, stop).indices(len(part_index.measure_starts))
+
+        # a short measure later in the score is not a pickup
+        reader = PartReader(at_score_start=start == 0)
+
+        # divisions, staves and time signature in force at the first measure
+        for measure_index, attributes_start, attributes_end in part_index.attributes:
+            if measure_index >= start:
+                break
+            reader.read_attributes(self._parse(attributes_start, attributes_end))
+
+        for measure_index in range(start, stop):
+            reader.read_measure(
+                self._parse(
+                    part_index.measure_starts[measure_index],
+                    part_index.measure_ends[measure_index],
+                )
+            )
+
+        return _staves_to_part(reader.parts())
+
+    def to_score(
+        self,
+        part_indices: Optional[Sequence[int]] = None,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> Score:
+        """
+        Parse some or all of the document as a Score.
+
+        Arguments:
+
+        part_indices: indices of the parts to include, every part by default.
+
+        start, stop: measure range of every included part, see load_part.
+
+        Returns:
+
+        A Score with the document's title and composer.
+        """
+
+        if part_indices is None:
+            part_indices = range(self.part_count)
+
+        return Score(
+            [self.load_part(part_idx, start, stop) for part_idx in part_indices],
+            title=self.title,
+            composer=self.composer,
+        )
@@ -0,0 +1,176 @@
+"""
+Round-trip checks between export and import.
+
+A Score survives a round trip through MusicXML when every staff of every
+part sounds the same notes at the same times. Layout is free to change
+along the way: notes may be split at different barlines or beamed
+differently, and short measures come back filled with rests. So the
+sequences compared here hold only sounding notes, with tied pieces joined
+into one note.
+
+Documents read from elsewhere can hold what a Score cannot, such as a
+second voice on a staff. skipped_notes counts the notes their import leaves
+out, which a round trip of the imported Score cannot notice.
+"""
+
+import math
+from collections import defaultdict
+from typing import List, NamedTuple
+
+from ..notation.chord import Chord
+from ..notation.note import Note
+from ..notation.score import Score
+from .import_musicxml import _iterparse_score, open_musicxml
+
+
+class SoundingNote(NamedTuple):
+    """
+    One note of a staff, with any notes tied to it joined in.
+
+    onset: start from the beginning of the part, in the units of the Part.
+
+    duration: in the units of the Part.
+
+    pitch: Note.pitch_number.
+    """
+
+    onset: float
+    duration: float
+    pitch: int
+
+
+def note_sequences(score: Score) -> List[List[List[SoundingNote]]]:
+    """
+    The sounding notes of a Score.
+
+    Arguments:
+
+    score: the Score.
+
+    Returns:
+
+    A list per part, holding a list of SoundingNotes per staff, sorted by
+    onset and then pitch. Chord members are separate notes.
+    """
+
+    return [
+        [_staff_notes(events) for events in staves]
+        for staves in score.events_between(0, math.inf)
+    ]
+
+
+def _staff_notes(events) -> List[SoundingNote]:
+
+    notes = []
+
+    # pitch of the notes tied forward, to their indices in notes. A chord
+    # can hold a pitch more than once.
+    open_ties = defaultdict(list)
+
+    for event in events:
+        if isinstance(event.entry, Chord):
+            members = event.entry.notes
+        elif isinstance(event.entry, Note):
+            members = [event.entry]
+        else:
+            members = []
+
+        next_ties = defaultdict(list)
+
+        for note in members:
+            pitch = note.pitch_number
+            tied_from = open_ties[pitch].pop(0) if open_ties[pitch] else None
+
+            if tied_from is not None and sum(notes[tied_from][:2]) == event.offset:
+                notes[tied_from][1] += event.dur
+                index = tied_from
+            else:
+                index = len(notes)
+                notes.append([event.offset, event.dur, pitch])
+
+            if note.tie_start or note.tie_continue:
+                next_ties[pitch].append(index)
+
+        # ties only reach the next entry
+        open_ties = next_ties
+
+    return sorted(SoundingNote(*note) for note in notes)
+
+
+def sequence_differences(
+    expected: List[List[List[SoundingNote]]],
+    actual: List[List[List[SoundingNote]]],
+) -> List[str]:
+    """
+    Where two note_sequences results differ.
+
+    Arguments:
+
+    expected: sequences of the original Score.
+
+    actual: sequences of the Score read back.
+
+    Returns:
+
+    A message per differing staff, naming its first differing note, or
+    per part whose staves do not match up. Empty when the Scores are
+    equivalent.
+    """
+
+    differences = []
+
+    if len(expected) != len(actual):
+        differences.append(f"{len(expected)} parts became {len(actual)}")
+
+    for part_idx, (expected_staves, actual_staves) in enumerate(zip(expected, actual)):
+        if len(expected_staves) != len(actual_staves):
+            differences.append(
+                f"part {part_idx + 1}: {len(expected_staves)} staves became "
+                f"{len(actual_staves)}"
+            )
+            continue
+
+        for staff_idx, (expected_notes, actual_notes) in enumerate(
+            zip(expected_staves, actual_staves)
+        ):
+            if expected_notes == actual_notes:
+                continue
+
+            location = f"part {part_idx + 1} staff {staff_idx + 1}"
+            for note_idx, (expected_note, actual_note) in enumerate(
+                zip(expected_notes, actual_notes)
+            ):
+                if expected_note != actual_note:
+                    differences.append(
+                        f"{location}: note {note_idx} was {tuple(expected_note)}, "
+                        f"read back as {tuple(actual_note)}"
+                    )
+                    break
+            else:
+                differences.append(
+                    f"{location}: {len(expected_notes)} notes became "
+                    f"{len(actual_notes)}"
+                )
+
+    return differences
+
+
+def skipped_notes(source) -> int:
+    """
+    Notes of a MusicXML document that import leaves out, see
+    PartReader.skipped_notes.
+
+    Arguments:
+
+    source: path or binary file object of a MusicXML document or .mxl
+    archive.
+
+    Returns:
+
+    the number of notes left out, over all parts.
+    """
+
+    with open_musicxml(source) as document:
+        _, _, readers = _iterparse_score(document)
+
+    return sum(reader.skipped_notes for reader in readers)
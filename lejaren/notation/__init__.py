@@ -5,4 +5,5 @@ from .part import Part
 from .rest import Rest
 from .score import Score
 from .chord import Chord
-from .tempo import Tempo
\ No newline at end of file
+from .tempo import Tempo
+from .snapshot import ScoreSnapshot, save_snapshot, load_snapshot
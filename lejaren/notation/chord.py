@@ -1,6 +1,9 @@
 import copy
+from operator import attrgetter
 from typing import Iterable, Tuple, List
 
+import numpy as np
+
 from lejaren.notation import Note
 import lejaren.log as logger
 
@@ -35,6 +38,8 @@ class Chord:
         self: A Chord object
 
         """
+        note_list = list(note_list)
+
         if all(isinstance(note, Note) for note in note_list):
             if all(note.dur == note_list[0].dur for note in note_list):
                 unsorted_notes = note_list
@@ -46,7 +51,12 @@ class Chord:
         for idx, note in enumerate(note_list):
             log.debug(f"Note list, idx: {idx}, note {note}")
 
-        self.notes = self._sort_notes(note_list)
+        self._set_notes(self._sort_notes(unsorted_notes))
+
+    def _set_notes(self, sorted_notes: List[Note]) -> None:
+        """Store notes sorted lowest to highest and flag the chord members."""
+
+        self.notes = sorted_notes
         self.dur = self.notes[0].dur
 
         for note in self.notes[1:]:
@@ -54,42 +64,67 @@ class Chord:
 
     def _sort_notes(self, note_list: Iterable[Note]) -> List[Note]:
 
-        """Wrapper Function for Insertion sorting the notes by
-        pitch."""
+        """Sorts the notes by pitch, lowest first, into a new list.
 
-        for idx, note in enumerate(note_list):
-            note_list = self._insert_notes(note_list, idx, note)
+        Notes are keyed on Note.pitch_number (octave * 12 + pc), which each
+        note caches until its octave or pitch class changes. The sort is
+        stable, so notes with the same pitch keep their order."""
+
+        return sorted(note_list, key=attrgetter("pitch_number"))
 
-        return note_list
+    @classmethod
+    def from_pitch_array(
+        cls, pitches: Iterable[Iterable[int]], durations: Iterable[float]
+    ) -> List["Chord"]:
+        """Build many chords at once from a 2-D array of pitches.
 
-    def _insert_notes(
-        self, note_list: Iterable[Note], idx: int, note: Note
-    ) -> Iterable[Note]:
-        """Insert helper function for insertion sort
+        Pitches are integers (octave * 12 + pc). Each row is sorted with
+        NumPy and split into octave and pitch class in one pass, so the
+        chords skip the per-chord validation and sort.
 
         Args:
-        ------
+        --------
+
+        pitches: 2-D array-like, one row of pitches per chord.
 
-        note_list: Iterable[Note], list of note objects
+        durations: 1-D array-like, one duration per chord.
 
-        idx: int, current index
+        Returns:
+        ---------
 
-        note: Note, note to do insertion with
+        List of Chord objects, in row order.
 
         """
-        idx_shift = idx - 1
-        while (idx_shift >= 0) and (note_list[idx_shift] > note):
-            note_list.insert(idx_shift + 1, note_list.pop(idx_shift))
-            idx_shift -= 1
-        note_list.insert(idx_shift + 1, note_list.pop(note_list.index(note)))
-        return note_list
+        pitch_array = np.asarray(pitches, dtype=np.int64)
+        duration_array = np.asarray(durations)
+
+        if pitch_array.ndim != 2 or pitch_array.shape[1] == 0:
+            raise ValueError("Pitches for Chord.from_pitch_array() must be a 2-D array")
+        if duration_array.shape != (pitch_array.shape[0],):
+            raise ValueError("Chord.from_pitch_array() needs one duration per chord")
+        if np.any(duration_array <= 0):
+            raise ValueError("Chord durations must be positive")
+
+        octaves, pcs = np.divmod(np.sort(pitch_array, axis=1), 12)
+
+        chords = []
+        for dur, octave_row, pc_row in zip(
+            duration_array.tolist(), octaves.tolist(), pcs.tolist()
+        ):
+            chord = cls.__new__(cls)
+            chord._set_notes(
+                [Note(dur, octave, pc) for octave, pc in zip(octave_row, pc_row)]
+            )
+            chords.append(chord)
+
+        return chords
 
     def change_duration(self, new_duration) -> None:
         try:
             if new_duration > 0:
                 self.dur = new_duration
                 for note in self.notes:
-                    note.dur = new_duration
+                    note.change_duration(new_duration)
         except ValueError as e:
             log.error(e)
             raise
@@ -129,12 +164,10 @@ class Chord:
                 note.tie_start = True
         elif tie_type == "tie_continue":
             for note in self.notes:
-                self.tie_continue = True
-                self.articulation = None
+                note.set_as_tie(tie_type)
         elif tie_type == "tie_end":
             for note in self.notes:
-                self.tie_end = True
-                self.articulation = None
+                note.set_as_tie(tie_type)
         else:
             raise Exception(
                 f"Wrong Tie Type: tie_start, tie_continue, tie_end accepted, not {tie_type}"
@@ -6,7 +6,10 @@ track of metric structure.
 """
 
 import copy
-from itertools import accumulate
+import fractions
+import functools
+import math
+from decimal import Decimal
 
 from typing import Iterable, List, Optional, Tuple, Union, List
 
@@ -21,6 +24,44 @@ log = logger.get_logger()
 METER_DIVISION_TYPES = {2: "Duple", 3: "Triple", 4: "Quadruple"}
 TimeSignature = Tuple[int, int]
 
+# durations are snapped to fractions with at most this denominator while
+# laying out, so triplets and other durations that are not exact in binary
+# still add up to whole beats
+MAX_DURATION_DENOMINATOR = 128
+
+
+@functools.lru_cache(maxsize=1024)
+def exact_duration(dur) -> fractions.Fraction:
+    """A Note, Rest or Chord duration as an exact fraction. Cached, since a
+    score uses only a few distinct durations."""
+    return fractions.Fraction(dur).limit_denominator(MAX_DURATION_DENOMINATOR)
+
+
+def duration_units(durations: Iterable) -> Tuple[List[int], int]:
+    """
+    Durations as whole numbers of one common unit.
+
+    Arguments:
+
+    durations: Note, Rest or Chord durations.
+
+    Returns:
+
+    The durations in units, and the number of units in one unit of the
+    durations. The smallest such unit is used.
+    """
+
+    exact = [exact_duration(dur) for dur in durations]
+    scale = math.lcm(*(dur.denominator for dur in exact))
+    return [dur.numerator * (scale // dur.denominator) for dur in exact], scale
+
+
+def decimal_duration(dur: fractions.Fraction) -> Decimal:
+    """An exact duration as a Decimal, exact itself when it is whole"""
+    if dur.denominator == 1:
+        return Decimal(dur.numerator)
+    return Decimal(dur.numerator) / Decimal(dur.denominator)
+
 
 class Measure:
 
@@ -57,6 +98,10 @@ class Measure:
     total_cumulative_beats : int
     Total addtitive beat count.
 
+    version : int
+    Bumped whenever the measure changes, so cached renderings of it can be
+    thrown away.
+
     Methods:
     --------
 
@@ -67,6 +112,9 @@ class Measure:
     Appends beat to the end of self.beats. You should append Notes to a
     Beat object, then append the Beat object.
 
+    touch()
+    Marks the measure as changed. Call after editing its notes in place.
+
     """
 
     def __init__(self, time_signature: Tuple, factor: int):
@@ -113,18 +161,43 @@ class Measure:
         self.cumulative_beats = list((x for x in self._cumulative_beat_generator()))
         self.total_cumulative_beats = self.cumulative_beats[-1]
 
+        self.version = 0
+
+    def touch(self) -> None:
+        """Mark the measure as changed.
+
+        Methods that change the measure do this themselves. Call it after
+        editing the measure's notes in place, eg. adding an articulation.
+
+        Arguments:
+
+        None.
+
+        Returns:
+
+        None.
+
+        """
+        self.version += 1
+
     def _factorize_notes(self):
 
-        note_durs = [note.dur for beat in self.beats for note in beat.notes]
+        notes = [note for beat in self.beats for note in beat.notes]
 
-        min_dur = min(note_durs)
+        # the smallest factor that makes every duration whole, so divisions
+        # and durations are written as integers. 1 / min_dur is not enough
+        # for durations such as 0.75, and a triplet's Decimal is not exactly
+        # a third, so durations are snapped to fractions first.
+        units, factor = duration_units(note.dur for note in notes)
 
-        if min_dur < 1:
-            self.measure_factor = 1 / min_dur
+        self.touch()
+
+        if factor > 1:
+            self.measure_factor = factor
             for beat in self.beats:
                 beat.subdivisions *= self.measure_factor
-                for note in beat.notes:
-                    note.change_duration(note.dur * self.measure_factor)
+            for note, note_units in zip(notes, units):
+                note.change_duration(Decimal(note_units))
         else:
             pass
 
@@ -180,9 +253,11 @@ class Measure:
         """
         log.debug(f"Adding note to measure: {note}")
         self.notes.append(note)
+        self.touch()
 
     def extend_measure(self, note_list: Iterable[Union[Note, Rest, Chord]]):
         self.notes.extend(note_list)
+        self.touch()
 
     def add_beat(self, beat: Beat) -> None:
 
@@ -200,6 +275,7 @@ class Measure:
 
         """
         self.beats.append(beat)
+        self.touch()
         log.debug(f"Appending beat and len: {beat} {len(beat.notes)}")
 
     def set_time_signature(self, time_signature: TimeSignature) -> None:
@@ -213,6 +289,7 @@ class Measure:
 
         self.time_signature = time_signature
         self._create_measure_map(1)
+        self.touch()
 
     def _create_measure_map(self, factor: int) -> Tuple[Optional[str], str, List[int]]:
         """
@@ -349,10 +426,13 @@ class Measure:
 
         # import pdb; pdb.set_trace()
 
-        tot_durs = list(accumulate([note.dur for note in note_list]))[-1]
+        units, scale = duration_units(note.dur for note in note_list)
+        missing = fractions.Fraction(total_cumulative_beats) - fractions.Fraction(
+            sum(units), scale
+        )
 
-        if tot_durs < total_cumulative_beats:
-            note_list.append(Rest(total_cumulative_beats - tot_durs))
+        if missing > 0:
+            note_list.append(Rest(decimal_duration(missing)))
 
         return note_list
 
@@ -385,6 +465,8 @@ class Measure:
 
         # Verify the measure is full
 
+        self.touch()
+
         if note_list is None:
             note_list = self.notes
         if total_cumulative_beats is None:
@@ -401,9 +483,12 @@ class Measure:
         beat_divisions = self.measure_map
         current_beat_divisions = beat_divisions.pop()
 
-        # cumulative beat count
-        cumulative_beats = self.cumulative_beats
-        cumulative_beats.reverse()
+        # durations are counted as whole numbers of a unit that divides all of
+        # them, so triplets add up to whole beats
+        units, scale = duration_units(note.dur for note in notes)
+
+        # cumulative beat count, in the same units
+        cumulative_beats = [beat * scale for beat in reversed(self.cumulative_beats)]
         beat_breakpoint = cumulative_beats.pop()
 
         log.debug(
@@ -417,7 +502,7 @@ class Measure:
 
             # get initial states
 
-            current_count += note.dur
+            current_count += units[idx]
             log.debug(
                 f"Top: idx {idx}, note {note}, current count: {current_count}, current_beats: {self.beats}"
             )
@@ -475,23 +560,34 @@ class Measure:
                     f"current count > beat_breakpoint, {current_count}, {beat_breakpoint}"
                 )
 
-                overflow = current_count - beat_breakpoint
+                overflow = fractions.Fraction(current_count - beat_breakpoint) / scale
                 log.debug(f"overflow, {overflow}, {current_count}, {beat_breakpoint}")
-                remainder = note.dur - overflow
+                remainder = fractions.Fraction(units[idx], scale) - overflow
                 if remainder > 0:
                     log.debug(f"remainder, {remainder}, {note.dur}")
                     old_beat_note = copy.deepcopy(note)
-                    old_beat_note.change_duration(remainder)
-                    old_beat_note.tie_start = True
+                    old_beat_note.change_duration(decimal_duration(remainder))
+                    # through set_as_tie and change_duration, so the notes
+                    # of a Chord are tied and resized too
+                    if type(old_beat_note) is not Rest:
+                        old_beat_note.set_as_tie("tie_start")
                     current_beat.add_note(old_beat_note)
                     self.add_beat(current_beat)
                     if beat_divisions and cumulative_beats:
                         current_beat_divisions = beat_divisions.pop()
                         beat_breakpoint = cumulative_beats.pop()
                         current_beat = Beat(current_beat_divisions)
+                    # the rest of the note ends the tie, and keeps any tie
+                    # the whole note had into the next measure
                     note_for_next_beat = copy.deepcopy(note)
-                    note_for_next_beat.dur = overflow
+                    note_for_next_beat.change_duration(decimal_duration(overflow))
+                    if type(note_for_next_beat) is not Rest:
+                        note_for_next_beat.set_as_tie("tie_end")
                     current_beat.add_note(note_for_next_beat)
+                else:
+                    # an earlier tied note already carried this beat past
+                    # its breakpoint, so the note belongs to it whole
+                    current_beat.add_note(note)
 
         self._factorize_notes()
         [beat.make_beams() for beat in self.beats]
@@ -0,0 +1,130 @@
+"""
+Low level Standard MIDI File encoding used by Score.to_midi.
+
+Events are (tick, bytes) pairs with absolute ticks. Tracks are encoded with
+delta times and written as format 1 files.
+"""
+
+import struct
+from typing import BinaryIO, Iterable, List, Tuple
+
+DEFAULT_PPQ = 480
+DEFAULT_VELOCITY = 80
+
+# MIDI note number of the Note with octave 0, pitch class 0
+MIDI_PITCH_OFFSET = 12
+
+# channel 10 is reserved for percussion in General MIDI
+PERCUSSION_CHANNEL = 9
+
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+
+META_EVENT = 0xFF
+META_TEMPO = 0x51
+META_TIME_SIGNATURE = 0x58
+META_END_OF_TRACK = 0x2F
+
+MidiEvent = Tuple[int, bytes]
+
+
+def encode_variable_length(value: int) -> bytes:
+    """
+    Encode an int as a MIDI variable length quantity.
+
+    Arguments:
+
+    value (int): a non negative int below 2**28.
+
+    Returns:
+
+    bytes, seven bits per byte, most significant first.
+    """
+    if value < 0 or value >= 1 << 28:
+        raise ValueError(f"{value} cannot be a MIDI variable length quantity")
+
+    encoded = bytearray([value & 0x7F])
+    value >>= 7
+
+    while value:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    encoded.reverse()
+    return bytes(encoded)
+
+
+def tempo_event(tick: int, microseconds_per_quarter: int) -> MidiEvent:
+    return (
+        tick,
+        bytes([META_EVENT, META_TEMPO, 3])
+        + microseconds_per_quarter.to_bytes(3, "big"),
+    )
+
+
+def time_signature_event(tick: int, time_signature: Tuple[int, int]) -> MidiEvent:
+    """Time signature meta event. The denominator is stored as a power of
+    two, with a click every quarter and 8 32nds per quarter."""
+
+    numerator, denominator = time_signature
+    return (
+        tick,
+        bytes(
+            [
+                META_EVENT,
+                META_TIME_SIGNATURE,
+                4,
+                numerator,
+                denominator.bit_length() - 1,
+                24,
+                8,
+            ]
+        ),
+    )
+
+
+def note_events(
+    onset: int, release: int, channel: int, pitch: int, velocity: int
+) -> Tuple[MidiEvent, MidiEvent]:
+    return (
+        (onset, bytes([NOTE_ON | channel, pitch, velocity])),
+        (release, bytes([NOTE_OFF | channel, pitch, 0])),
+    )
+
+
+def encode_track(events: Iterable[MidiEvent]) -> bytes:
+    """
+    Encode events as an MTrk chunk.
+
+    Arguments:
+
+    events: (tick, bytes) pairs, with absolute ticks. Events are sorted by tick,
+    and note offs go before other events on the same tick so that repeated
+    notes are not cut short.
+
+    Returns:
+
+    bytes of the whole chunk, end of track included.
+    """
+    ordered = sorted(events, key=lambda event: (event[0], event[1][0] & 0xF0 != NOTE_OFF))
+
+    data = bytearray()
+    previous_tick = 0
+
+    for tick, message in ordered:
+        data += encode_variable_length(tick - previous_tick)
+        data += message
+        previous_tick = tick
+
+    data += b"\x00" + bytes([META_EVENT, META_END_OF_TRACK, 0])
+
+    return b"MTrk" + struct.pack(">I", len(data)) + bytes(data)
+
+
+def write_midi_file(output_file: BinaryIO, tracks: List[bytes], ppq: int) -> None:
+    """Write a format 1 file from encoded tracks"""
+
+    output_file.write(b"MThd" + struct.pack(">IHHH", 6, 1, len(tracks), ppq))
+
+    for track in tracks:
+        output_file.write(track)
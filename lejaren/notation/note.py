@@ -14,9 +14,8 @@ math operators. To create a note, simply create the object:
 >>> middle_C_whole_note = Note(4,4,0)
 
 The Note object overloads operators to allow for comparison of note objects.
-There is an attempt to be intutitive. Equality tests for pitches, greater
-than/less than test for pitch relationships, and greater than or equal/less
-than or equal test for duration relationships. As follows:
+There is an attempt to be intutitive. Equality tests for pitch and duration,
+and the other comparisons order notes by pitch, then by duration. As follows:
 
 note_1 = Note(4,4,0) # Whole note middle C
 note_2 = Note(2,4,1) # Half note middle C#
@@ -25,9 +24,15 @@ note_2 = Note(2,4,1) # Half note middle C#
 False
 >>> note_1 > note_2 # Middle C is lower than Middle C-sharp
 False
->>> note_1 >= note_2 # A whole note is longer than a half note
+>>> note_1 <= Note(4,4,0) # The same note
 True
 
+Notes hash on the same pitch and duration that equality tests, so they can
+be deduplicated with a set or used as dict keys. Both work on an integer
+pitch number (octave * 12 + pitch class) and the exact ratio of the
+duration, which are stored on the note. Change a note's pitch and duration
+with change_pitch and change_duration, so they stay up to date.
+
 """
 
 import copy
@@ -39,6 +44,24 @@ import lejaren.notation as ljn #only for returning a rest
 
 log = logger.get_logger()
 
+ARTICULATIONS = [
+    "accent",
+    "breath-mark",
+    "caesura",
+    "detached-legato",
+    "doit",
+    "falloff",
+    "plop",
+    "scoop",
+    "spiccato",
+    "staccatissimo",
+    "staccato",
+    "stress",
+    "strong-accent",
+    "tenuto",
+    "unstress",
+]
+
 # The Life of a Note
 
 # in a tuplet, we change the subdivision of the beat
@@ -88,6 +111,13 @@ class Note:
     is_chord_member : bool
     flag for chord membership
 
+    pitch_number : int
+    integer pitch, octave * 12 + pc. Kept up to date by change_pitch.
+
+    dur_key : Tuple[int, int]
+    exact integer ratio of dur, for equality and hashing. Kept up to date by
+    change_duration.
+
     Methods:
     --------
 
@@ -99,12 +129,14 @@ class Note:
 
     set_as_tie(self, tie_type: str)
 
+    change_pitch(self, octave: int, pitch_class: int)
+
     Overloaded Operators:
     ---------------------
 
     == : absolute equality (dur, pc, octave)
-    >/< : pitch greater than/less than
-    >=/<= : duration greater than/less than
+    >/</>=/<= : order by pitch, then duration
+    hash : consistent with ==
 
     """
 
@@ -142,12 +174,14 @@ class Note:
         try:
             if duration > 0:
                 self.dur = Decimal(str(duration))
+                self.dur_key = self.dur.as_integer_ratio()
         except ValueError as e:
             log.error(e)
             raise
 
         # called to correct any errant pitch classes
         self.octave, self.pc = self._fix_pitch_overflow(octave, pitch_class)
+        self.pitch_number = self.octave * 12 + self.pc
 
         # force starting_pitch to be keyless
         self.step_name, self.alter, self.accidental = self._get_step_name(0)
@@ -262,32 +296,14 @@ class Note:
 
     def add_articulation(self, articulation: str) -> None:
 
-        valid_articulations = [
-            "accent",
-            "breath-mark",
-            "caesura",
-            "detached-legato",
-            "doit",
-            "falloff",
-            "plop",
-            "scoop",
-            "spiccato",
-            "staccatissimo",
-            "staccato",
-            "stress",
-            "strong-accent",
-            "tenuto",
-            "unstress",
-        ]
-
-        if articulation in valid_articulations:
+        if articulation in ARTICULATIONS:
 
             self.articulation = articulation
 
         else:
 
             raise ValueError(
-                f"Articulation {articulation} must be a valid articulation: {valid_articulations}"
+                f"Articulation {articulation} must be a valid articulation: {ARTICULATIONS}"
             )
 
     def set_as_tie(self, tie_type: str) -> None:
@@ -325,10 +341,30 @@ class Note:
         try:
             if new_duration > 0:
                 self.dur = Decimal(str(new_duration))
+                self.dur_key = self.dur.as_integer_ratio()
         except ValueError as e:
             log.error(e)
             raise
 
+    def change_pitch(self, octave: int, pitch_class: int) -> None:
+        """Sets the octave and pitch class, correcting pitch class overflow
+        as on init, and respells the note.
+
+        Arguments:
+
+        octave (int): scientific octave of pitch
+
+        pitch_class (int): pitch class of note
+
+        Returns:
+
+        None
+
+        """
+        self.octave, self.pc = self._fix_pitch_overflow(octave, pitch_class)
+        self.pitch_number = self.octave * 12 + self.pc
+        self.step_name, self.alter, self.accidental = self._get_step_name(0)
+
     def split(self, diff: int) -> Tuple["__class__", "__class__"]:
         old_note = copy.copy(self)
         new_note = copy.copy(self)
@@ -359,50 +395,89 @@ class Note:
         bool
         """
 
-        if (
-            (self.dur == other.dur)
-            and (self.octave == other.octave)
-            and (self.pc == other.pc)
-        ):
-            return True
-        else:
-            return False
+        if not isinstance(other, Note):
+            return NotImplemented
+
+        return (
+            self.pitch_number == other.pitch_number and self.dur_key == other.dur_key
+        )
+
+    def __hash__(self) -> int:
+        """
+        Hash on the same pitch and duration that == compares.
 
-    # Evaluate pitch relative to another
+        Changing a note's pitch or duration changes its hash, so don't change
+        notes while they are in a set or used as dict keys.
+        """
+
+        return hash((self.pitch_number, self.dur_key))
+
+    # Order by pitch, then duration. The duration is only looked at when the
+    # pitches are the same.
 
     def __gt__(self, other) -> bool:
         """
-        Tests for pitch inequality.
+        Tests for pitch, then duration, inequality.
 
         Arguments:
 
         other (Note): a Note object.
         """
 
-        if self.octave > other.octave:
-            return True
-        elif self.octave == other.octave:
-            if self.pc > other.pc:
-                return True
-            else:
-                return False
-        else:
-            return False
+        if not isinstance(other, Note):
+            return NotImplemented
+
+        if self.pitch_number != other.pitch_number:
+            return self.pitch_number > other.pitch_number
+        return self.dur > other.dur
+
+    def __lt__(self, other) -> bool:
+        """
+        Tests for pitch, then duration, inequality.
+
+        Arguments:
+
+        other (Note): a Note object.
+        """
+
+        if not isinstance(other, Note):
+            return NotImplemented
 
-    # Evaluate duration equality
+        if self.pitch_number != other.pitch_number:
+            return self.pitch_number < other.pitch_number
+        return self.dur < other.dur
 
     def __ge__(self, other) -> bool:
         """
-        Tests for duration inequality.
+        Tests for pitch, then duration, inequality.
 
         Arguments:
 
         other (Note): a Note object
         """
-        if self.dur > other.dur:
-            return True
-        else:
-            return False
+
+        if not isinstance(other, Note):
+            return NotImplemented
+
+        if self.pitch_number != other.pitch_number:
+            return self.pitch_number > other.pitch_number
+        return self.dur >= other.dur
+
+    def __le__(self, other) -> bool:
+        """
+        Tests for pitch, then duration, inequality.
+
+        Arguments:
+
+        other (Note): a Note object
+        """
+
+        if not isinstance(other, Note):
+            return NotImplemented
+
+        if self.pitch_number != other.pitch_number:
+            return self.pitch_number < other.pitch_number
+        return self.dur <= other.dur
 
     # Pretty printing in output
 
@@ -1,11 +1,14 @@
 import copy
 import fractions, math
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from decimal import Decimal
 from itertools import accumulate, cycle
 
 from lxml import etree
-from typing import Iterable, List, Optional, NamedTuple, Tuple, Union
+from typing import Iterable, Iterator, List, Optional, NamedTuple, Tuple, Union
 
-from .measure import Measure
+from .measure import Measure, decimal_duration, exact_duration
 from .note import Note
 from .beat import Beat
 from .rest import Rest
@@ -56,6 +59,29 @@ class CurrentCountDivisions(NamedTuple):
     measure_mod: int
 
 
+class PartEvent(NamedTuple):
+    """
+    A laid out Note, Rest or Chord with its position in a Part.
+
+    Attributes:
+    -----------
+
+    offset: onset from the start of the part, in the units of the note list.
+
+    dur: sounding duration, in the units of the note list.
+
+    measure_index (int): index of the measure the event is in.
+
+    entry: the Note, Rest or Chord as it appears in the measure's beats.
+
+    """
+
+    offset: float
+    dur: float
+    measure_index: int
+    entry: Union[Note, Rest, Chord]
+
+
 class Part:
 
     """
@@ -91,11 +117,29 @@ class Part:
 
     measure_factor:
 
+    measure_offsets: prefix sums of measure lengths. measure_offsets[i] is the
+    offset at which measure i starts, and the final entry is the end of the
+    last measure.
+
     Methods:
     --------
 
     create_part: create the part with the current Time Signatures.
 
+    insert_notes: insert notes at an offset, re-laying out only the affected measures.
+
+    delete_notes: delete notes at an offset, re-laying out only the affected measures.
+
+    replace_notes: replace notes at an offset, re-laying out only the affected measures.
+
+    events_at: events sounding at an offset.
+
+    events_between: events sounding in a range of offsets.
+
+    measure_at: index of the measure containing an offset.
+
+    measures_between: measures overlapping a range of offsets.
+
     """
 
     def __init__(
@@ -168,12 +212,85 @@ class Part:
         denominator_uniques = self.get_ts_uniques()
         self.measure_factor = self._get_factor(dur_uniques) * max(denominator_uniques)
 
+        # Layout scales durations in place, so keep the source durations and
+        # their onsets around for incremental re-layout.
+        self._source_durs = [entry.dur for entry in self.current_list]
+        self._source_offsets = list(accumulate(self._source_durs, initial=0))
+        self._dur_counts = Counter(self._source_durs)
+
         # self.create_part(self.current_list, self.measure_factor)
 
         self.get_measures(self.current_list, self.time_signatures)
 
         [measure.clean_up_measure() for measure in self.measures]
 
+        self.measure_offsets = self._index_measure_offsets(self.measures)
+
+        # sorted onsets of laid out events, built on first query
+        self._offset_index = None
+
+        # bumped on every edit, so renderers can tell the layout changed
+        self.version = 0
+
+    @classmethod
+    def _from_layout(
+        cls,
+        measures: List[Measure],
+        time_signatures: TimeSignatures,
+        current_list: List[Union[Note, Rest, Chord]],
+        measure_factor,
+        time_signature_index: int = 0,
+    ) -> "Part":
+        """
+        Rebuild a Part from a layout made earlier, without laying it out again.
+
+        Used to load snapshots. The entries in current_list must have their
+        durations before layout scaled them.
+
+        Arguments:
+        ----------
+
+        measures (list[Measure]): the laid out measures.
+
+        time_signatures (list[TimeSignature]): time signatures the part cycles
+        through.
+
+        current_list (list): the part's Note, Rest and Chord entries.
+
+        measure_factor: the part's measure_factor.
+
+        time_signature_index (int): where the part is in time_signatures.
+
+        Returns:
+        --------
+
+        A Part object.
+        """
+        part = cls.__new__(cls)
+
+        part.current_list = current_list
+        part.measures = measures
+
+        part.time_signatures = time_signatures
+        part.time_signature_index = time_signature_index
+
+        part.subdivisions, part.max_subdivisions = None, None
+        part.current_measure = None
+        part.current_count = 0
+        part.current_count_mod, part.current_count_floor = None, None
+
+        part.measure_factor = measure_factor
+
+        part._source_durs = [entry.dur for entry in current_list]
+        part._source_offsets = list(accumulate(part._source_durs, initial=0))
+        part._dur_counts = Counter(part._source_durs)
+
+        part.measure_offsets = part._index_measure_offsets(measures)
+        part._offset_index = None
+        part.version = 0
+
+        return part
+
     """default behavior is to simply clean an input list to 4/4
        it's also an option to feed extra arguments with keywords to 
        modify behavior for optional cleaning methods or user choices
@@ -438,16 +555,12 @@ class Part:
     def _make_new_measure(
         self,
         time_signatures: TimeSignatures,
-        current_measure: Measure,
         current_beat_count: int,
-    ) -> Measure:
+    ) -> Tuple[Measure, int, int]:
 
-        time_sigs = cycle(time_signatures)
-
-        next_ts = next(time_sigs)
+        next_ts = next(time_signatures)
         measure_max = next_ts[0]
         current_beat_count += next_ts[0]
-        self.measures.append(current_measure)
         current_measure = Measure(next_ts, 1)
 
         return current_measure, current_beat_count, measure_max
@@ -456,7 +569,30 @@ class Part:
         self, note_list: Iterable[Union[Note, Rest, Chord]], time_sigs: TimeSignatures
     ):
 
-        accumulated_durs = self._accum_note_durs(iter(note_list))
+        self.measures.extend(self._iter_measures(note_list, time_sigs))
+
+    def _iter_measures(
+        self, note_list: Iterable[Union[Note, Rest, Chord]], time_sigs: TimeSignatures
+    ) -> Iterator[Measure]:
+        """
+        Segment a note list into measures, yielding each measure once it is full.
+
+        Notes that cross a barline are split and tied. Measures are yielded before
+        they are beamed, so callers are expected to call clean_up_measure() on them.
+
+        Arguments:
+        ----------
+
+        note_list (Iterable): Note, Rest and Chord objects starting on a barline.
+
+        time_sigs (TimeSignatures): time signatures to cycle through, starting with
+        the first measure yielded.
+
+        Returns:
+        --------
+
+        Generator of Measure objects.
+        """
 
         time_sigs = cycle(time_sigs)
 
@@ -465,45 +601,462 @@ class Part:
         measure_max = next_ts[0]
         current_measure = Measure(next_ts, 1)
 
-        for current_count, note in zip(accumulated_durs, note_list):
+        current_count = 0
+
+        for note in note_list:
 
-            # import pdb; pdb.set_trace()
+            current_count += exact_duration(note.dur)
 
             if current_beat_count > current_count:
                 current_measure.add_note(note)
             elif current_beat_count == current_count:
                 current_measure.add_note(note)
+                yield current_measure
                 (
                     current_measure,
                     current_beat_count,
                     measure_max,
-                ) = self._make_new_measure(
-                    time_sigs, current_measure, current_beat_count
-                )
+                ) = self._make_new_measure(time_sigs, current_beat_count)
             elif current_beat_count < current_count:
                 diff = current_count - current_beat_count
-                old_note, new_note = note.split(diff)
+                old_note, new_note = note.split(decimal_duration(diff))
                 current_measure.add_note(old_note)
+                yield current_measure
                 (
                     current_measure,
                     current_beat_count,
                     measure_max,
-                ) = self._make_new_measure(
-                    time_sigs, current_measure, current_beat_count
-                )
+                ) = self._make_new_measure(time_sigs, current_beat_count)
                 while diff > measure_max:
                     diff = diff - measure_max
-                    old_note, new_note = new_note.split(diff)
+                    old_note, new_note = new_note.split(decimal_duration(diff))
                     current_measure.add_note(old_note)
+                    yield current_measure
                     (
                         current_measure,
                         current_beat_count,
                         measure_max,
-                    ) = self._make_new_measure(
-                        time_sigs, current_measure, current_beat_count
-                    )
+                    ) = self._make_new_measure(time_sigs, current_beat_count)
                 if type(new_note) is not Rest:
                     new_note.set_as_tie("tie_end")
                 current_measure.add_note(new_note)
+                # the tail of the split note fills the new measure exactly
+                if current_beat_count == current_count:
+                    yield current_measure
+                    (
+                        current_measure,
+                        current_beat_count,
+                        measure_max,
+                    ) = self._make_new_measure(time_sigs, current_beat_count)
         if current_measure.notes:
-            self.measures.append(current_measure)
+            yield current_measure
+
+    def _index_measure_offsets(self, measures: List[Measure]) -> List[int]:
+        """
+        Prefix sums of measure lengths.
+
+        Arguments:
+        ----------
+
+        measures (list[Measure]): measures in part order.
+
+        Returns:
+        --------
+
+        offsets (list): the start offset of every measure, followed by the end
+        offset of the last one.
+        """
+        return list(
+            accumulate((measure.time_signature[0] for measure in measures), initial=0)
+        )
+
+    def _sync_measure_offsets(self) -> List[int]:
+        """Extend measure_offsets over any measures appended outside of the Part
+        (e.g. empty measures padded in by a Score)."""
+
+        indexed = len(self.measure_offsets) - 1
+        if indexed < len(self.measures):
+            for measure in self.measures[indexed:]:
+                self.measure_offsets.append(
+                    self.measure_offsets[-1] + measure.time_signature[0]
+                )
+        return self.measure_offsets
+
+    def _entry_index(self, offset: float) -> int:
+        """
+        Index in current_list of the entry starting at offset.
+
+        Arguments:
+        ----------
+
+        offset: an offset from the start of the part, in note durations.
+
+        Returns:
+        --------
+
+        index (int). The length of current_list is returned for the end of the part.
+        """
+        idx = bisect_left(self._source_offsets, offset)
+        if idx == len(self._source_offsets) or self._source_offsets[idx] != offset:
+            raise ValueError(f"No note starts at offset {offset} in this part")
+        return idx
+
+    def insert_notes(
+        self, offset: float, notes: Iterable[Union[Note, Rest, Chord]]
+    ) -> None:
+        """
+        Insert notes into the part before the note starting at offset.
+
+        Only the measures touched by the insertion are re-segmented and re-beamed.
+
+        Arguments:
+        ----------
+
+        offset: start offset of an existing note, or the end of the part to append.
+
+        notes (Iterable): Note, Rest or Chord objects to insert.
+
+        Returns:
+        --------
+
+        None.
+        """
+        self._splice(self._entry_index(offset), 0, list(notes))
+
+    def delete_notes(self, offset: float, count: int = 1) -> None:
+        """
+        Delete count notes from the part, starting with the note at offset.
+
+        Only the measures touched by the deletion are re-segmented and re-beamed.
+
+        Arguments:
+        ----------
+
+        offset: start offset of the first note to delete.
+
+        count (int): number of notes to delete.
+
+        Returns:
+        --------
+
+        None.
+        """
+        self._splice(self._entry_index(offset), count, [])
+
+    def replace_notes(
+        self,
+        offset: float,
+        notes: Iterable[Union[Note, Rest, Chord]],
+        count: int = 1,
+    ) -> None:
+        """
+        Replace count notes, starting with the note at offset, with new notes.
+
+        Only the measures touched by the replacement are re-segmented and re-beamed.
+
+        Arguments:
+        ----------
+
+        offset: start offset of the first note to replace.
+
+        notes (Iterable): Note, Rest or Chord objects to put in their place.
+
+        count (int): number of notes to replace.
+
+        Returns:
+        --------
+
+        None.
+        """
+        self._splice(self._entry_index(offset), count, list(notes))
+
+    def _splice(
+        self, index: int, count: int, new_entries: List[Union[Note, Rest, Chord]]
+    ) -> None:
+        """
+        Replace current_list[index:index + count] with new_entries and re-layout.
+
+        Arguments:
+        ----------
+
+        index (int): index of the first entry to replace.
+
+        count (int): number of entries to replace.
+
+        new_entries (list): entries to put in their place.
+
+        Returns:
+        --------
+
+        None.
+        """
+        if count < 0 or index + count > len(self.current_list):
+            raise ValueError(
+                f"Cannot remove {count} notes at index {index} of a {len(self.current_list)} note part"
+            )
+
+        new_durs = [entry.dur for entry in new_entries]
+        removed_durs = self._source_durs[index : index + count]
+
+        edit_start = self._source_offsets[index]
+        inserted_length = sum(new_durs)
+        delta = inserted_length - sum(removed_durs)
+
+        self.current_list = (
+            self.current_list[:index]
+            + new_entries
+            + self.current_list[index + count :]
+        )
+        self._source_durs[index : index + count] = new_durs
+        self._source_offsets = (
+            self._source_offsets[: index + 1]
+            + list(accumulate(new_durs, initial=edit_start))[1:]
+            + [offset + delta for offset in self._source_offsets[index + count + 1 :]]
+        )
+
+        self._dur_counts.subtract(removed_durs)
+        self._dur_counts.update(new_durs)
+        self._dur_counts = +self._dur_counts
+        self.measure_factor = self._get_factor(list(self._dur_counts)) * max(
+            self.get_ts_uniques()
+        )
+
+        self._relayout(edit_start, edit_start + inserted_length, delta)
+        self.version += 1
+
+    def _relayout(self, edit_start, edit_end, delta) -> None:
+        """
+        Re-segment and re-beam the measures around an edit.
+
+        Re-layout starts at the closest barline at or before edit_start that a
+        note starts on, and stops at the first barline after edit_end where
+        the old measures line up again: a note starts on it and the old
+        measure there has the same time signature phase. The old measures
+        after that point are kept as they are.
+
+        Arguments:
+        ----------
+
+        edit_start: offset where the edit begins.
+
+        edit_end: offset where the edited notes end, after the edit.
+
+        delta: change in part length caused by the edit.
+
+        Returns:
+        --------
+
+        None.
+        """
+
+        old_measures = self.measures
+        old_offsets = self._sync_measure_offsets()
+        measure_count = len(old_measures)
+        ts_count = len(self.time_signatures)
+
+        # find a barline a note starts on (measure 0 always qualifies)
+        start_measure = min(bisect_right(old_offsets, edit_start) - 1, measure_count)
+        while start_measure > 0 and not self._is_onset(old_offsets[start_measure]):
+            start_measure -= 1
+
+        start_offset = old_offsets[start_measure]
+        start_index = self._entry_index(start_offset)
+
+        ts_phase = start_measure % ts_count
+        time_sigs = self.time_signatures[ts_phase:] + self.time_signatures[:ts_phase]
+
+        entries = (
+            self._detach_entry(self.current_list[idx], self._source_durs[idx])
+            for idx in range(start_index, len(self.current_list))
+        )
+
+        new_measures = []
+        new_offsets = []
+        barline = start_offset
+        resume_measure = measure_count
+
+        for measure in self._iter_measures(entries, time_sigs):
+            measure.clean_up_measure()
+            new_measures.append(measure)
+            new_offsets.append(barline)
+            barline += measure.time_signature[0]
+
+            if barline < edit_end or not self._is_onset(barline):
+                continue
+
+            old_idx = bisect_left(old_offsets, barline - delta, 0, measure_count)
+            if (
+                old_idx < measure_count
+                and old_offsets[old_idx] == barline - delta
+                and (old_idx - (start_measure + len(new_measures))) % ts_count == 0
+            ):
+                resume_measure = old_idx
+                break
+
+        self.measures = (
+            old_measures[:start_measure] + new_measures + old_measures[resume_measure:]
+        )
+        self._offset_index = None
+        if resume_measure < measure_count:
+            tail_offsets = [offset + delta for offset in old_offsets[resume_measure:]]
+        else:
+            tail_offsets = [barline]
+        self.measure_offsets = old_offsets[:start_measure] + new_offsets + tail_offsets
+
+        log.debug(
+            f"Re-laid out measures {start_measure}-{start_measure + len(new_measures)}, "
+            f"kept {measure_count - resume_measure} trailing measures"
+        )
+
+    def _is_onset(self, offset) -> bool:
+        """Tests if a note in current_list starts at offset, or the part ends there.
+        No note crosses a barline at such an offset."""
+        idx = bisect_left(self._source_offsets, offset)
+        return idx < len(self._source_offsets) and self._source_offsets[idx] == offset
+
+    def _detach_entry(
+        self, entry: Union[Note, Rest, Chord], dur
+    ) -> Union[Note, Rest, Chord]:
+        """
+        Copy of a note list entry with its layout state undone.
+
+        Layout scales durations and sets beam flags on the entries it is given,
+        so re-layout works on copies restored to their source duration.
+        """
+        detached = copy.deepcopy(entry)
+        detached.change_duration(dur)
+        detached.beam_start, detached.beam_continue = False, False
+        return detached
+
+    def _build_offset_index(self) -> Tuple[list, list, List[PartEvent]]:
+        """
+        Build sorted onset and end arrays over every laid out event.
+
+        Measures re-scale their durations when they contain notes shorter than a
+        beat (see Measure._factorize_notes), so durations are divided back by the
+        measure factor and every measure is anchored at its measure offset.
+
+        Arguments:
+        ----------
+
+        None.
+
+        Returns:
+        --------
+
+        Tuple of onsets, ends and PartEvents, all in part order.
+        """
+        onsets, ends, events = [], [], []
+
+        measure_offsets = self._sync_measure_offsets()
+
+        for measure_index, measure in enumerate(self.measures):
+            factor = measure.measure_factor
+            measure_start = measure_offsets[measure_index]
+            scaled_count = Decimal(0)
+            for beat in measure.beats:
+                for entry in beat.notes:
+                    onset = measure_start + scaled_count / factor
+                    scaled_count += entry.dur
+                    end = measure_start + scaled_count / factor
+                    onsets.append(onset)
+                    ends.append(end)
+                    events.append(PartEvent(onset, end - onset, measure_index, entry))
+
+        self._offset_index = (onsets, ends, events, len(self.measures))
+        return onsets, ends, events
+
+    def _get_offset_index(self) -> Tuple[list, list, List[PartEvent]]:
+        """Offset index, rebuilt if the measures changed since it was built."""
+        if self._offset_index is None or self._offset_index[3] != len(self.measures):
+            return self._build_offset_index()
+        return self._offset_index[:3]
+
+    def events_at(self, offset: float) -> List[PartEvent]:
+        """
+        Events sounding at an offset.
+
+        Arguments:
+        ----------
+
+        offset: offset from the start of the part.
+
+        Returns:
+        --------
+
+        List of PartEvents whose onset is at or before offset and that end after it.
+        """
+        onsets, ends, events = self._get_offset_index()
+
+        idx = bisect_right(onsets, offset)
+        sounding = []
+        while idx > 0 and ends[idx - 1] > offset:
+            idx -= 1
+            sounding.append(events[idx])
+        sounding.reverse()
+        return sounding
+
+    def events_between(self, start: float, end: float) -> List[PartEvent]:
+        """
+        Events sounding in the range [start, end).
+
+        Arguments:
+        ----------
+
+        start: offset the range starts at.
+
+        end: offset the range ends at (exclusive).
+
+        Returns:
+        --------
+
+        List of PartEvents that overlap the range, in part order.
+        """
+        onsets, ends, events = self._get_offset_index()
+
+        low = bisect_right(onsets, start)
+        while low > 0 and ends[low - 1] > start:
+            low -= 1
+        high = bisect_left(onsets, end, low)
+
+        return events[low:high]
+
+    def measure_at(self, offset: float) -> int:
+        """
+        Index of the measure containing offset.
+
+        Arguments:
+        ----------
+
+        offset: offset from the start of the part.
+
+        Returns:
+        --------
+
+        index (int) into self.measures.
+        """
+        measure_offsets = self._sync_measure_offsets()
+        if offset < 0 or offset >= measure_offsets[-1]:
+            raise IndexError(f"Offset {offset} is outside of the part")
+        return bisect_right(measure_offsets, offset) - 1
+
+    def measures_between(self, start: float, end: float) -> List[Measure]:
+        """
+        Measures overlapping the range [start, end).
+
+        Arguments:
+        ----------
+
+        start: offset the range starts at.
+
+        end: offset the range ends at (exclusive).
+
+        Returns:
+        --------
+
+        List of Measure objects.
+        """
+        measure_offsets = self._sync_measure_offsets()
+        low = max(bisect_right(measure_offsets, start) - 1, 0)
+        high = bisect_left(measure_offsets, end)
+        return self.measures[low:high]
@@ -1,20 +1,155 @@
+import hashlib
 import pathlib
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
 from functools import reduce
 
 from lxml import etree
-from typing import Iterable, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
-from .part import Part
+from .part import Part, PartEvent
 from .rest import Rest
 from .measure import Measure
 from .beat import Beat
 from .chord import Chord
+from .note import ARTICULATIONS
+from .tempo import Tempo
+from .midi import (
+    DEFAULT_PPQ,
+    DEFAULT_VELOCITY,
+    MIDI_PITCH_OFFSET,
+    PERCUSSION_CHANNEL,
+    MidiEvent,
+    encode_track,
+    note_events,
+    tempo_event,
+    time_signature_event,
+    write_midi_file,
+)
 import lejaren.log as logger
 
 log = logger.get_logger()
 
 EMPTY_MEASURE_FACTOR = 1
 
+# quarter = 120 when to_midi is not given a Tempo
+DEFAULT_MIDI_BPM = 120
+
+MIDI_CHANNELS = [channel for channel in range(16) if channel != PERCUSSION_CHANNEL]
+
+MXL_MIMETYPE = "application/vnd.recordare.musicxml"
+
+MXL_ROOTFILE_MEDIA_TYPE = "application/vnd.recordare.musicxml+xml"
+
+MXL_CONTAINER_PATH = "META-INF/container.xml"
+
+# ZIP entries of canonical .mxl files get this date instead of the time of
+# writing, the earliest a ZIP file can hold
+CANONICAL_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+MUSICXML_DOCTYPE = '<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 4.0 Partwise//EN" "http://www.musicxml.org/xsd/musicxml.xsd">'
+
+# Score being exported, set in each worker process of a parallel export
+_worker_score = None
+
+
+def _init_part_worker(score: "Score") -> None:
+    global _worker_score
+    _worker_score = score
+
+
+def _render_part_worker(part_idx: int, pretty_print: bool) -> bytes:
+    return _worker_score._render_part_xml(part_idx, pretty_print)
+
+
+def _as_decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _canonical_number(value) -> str:
+    """Shortest plain decimal text of a number, so that equal values always
+    format the same: 1 for 1.0 and 1.00, 0.5 for 0.50, and no exponents"""
+
+    if isinstance(value, int):
+        return str(value)
+
+    decimal_value = _as_decimal(value)
+
+    if decimal_value == decimal_value.to_integral_value():
+        return str(int(decimal_value))
+
+    return format(decimal_value.normalize(), "f")
+
+
+class _HashingWriter:
+    """Binary file object that hashes everything written to it, passing the
+    bytes on to output_file when one is given"""
+
+    def __init__(self, output_file=None):
+        self.sha256 = hashlib.sha256()
+        self._output_file = output_file
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        if self._output_file is not None:
+            self._output_file.write(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if self._output_file is not None:
+            self._output_file.flush()
+
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+
+def _midi_pitch(pitch_number: int) -> int:
+    midi_pitch = pitch_number + MIDI_PITCH_OFFSET
+    if not 0 <= midi_pitch <= 127:
+        raise ValueError(f"Pitch {pitch_number} is out of the MIDI range")
+    return midi_pitch
+
+
+def _note_fragment_key(current_note, current_beat: Beat, staff_idx: int) -> tuple:
+    """Every field _convert_note_to_xml reads, so that two notes with the same
+    key serialize to the same bytes"""
+
+    note_type = type(current_note)
+
+    if note_type == Rest:
+        return (note_type, str(current_note.dur), current_note.is_measure)
+
+    if note_type == Chord:
+        return (
+            note_type,
+            tuple(
+                _note_fragment_key(note, current_beat, staff_idx)
+                for note in current_note.notes
+            ),
+        )
+
+    return (
+        note_type,
+        str(current_note.dur),
+        current_note.step_name,
+        current_note.alter,
+        current_note.accidental,
+        current_note.octave,
+        current_note.is_chord_member,
+        current_note.tie_start,
+        current_note.tie_continue,
+        current_note.tie_end,
+        current_note.beam_start,
+        current_note.beam_continue,
+        current_note.articulation,
+        staff_idx,
+        current_beat.tuplet,
+        current_beat.actual_notes if current_beat.tuplet else None,
+        current_beat.subdivisions if current_beat.tuplet else None,
+    )
+
+
 class Score:
     """Generates a MusicXML score from a list of parts (NoteLists) and outputs score to file"""
 
@@ -29,18 +164,53 @@ class Score:
         self.composer = composer
 
         if isinstance(parts, list):
-            if len(parts) == reduce(lambda acc, item: acc + 1 if isinstance(item, Part) else acc, parts, 0):
+            valid_parts = reduce(lambda acc, item: acc + 1 if self._is_part(item) else acc, parts, 0)
+            if len(parts) == valid_parts:
                 self._parts = self._parse_parts(parts)
             else:
-                raise ValueError(f"Some parts wrong: {len(parts)} and {reduce(lambda acc, item: acc + 1 if isinstance(item, Part) else acc, parts, 0)}")
+                raise ValueError(f"Some parts wrong: {len(parts)} and {valid_parts}")
         elif isinstance(parts, etree.ElementTree):
             self._parts = self._from_etree(parts)
         else:
             raise TypeError(f"Parts must be Lejaren Parts or an ETree, is {type(parts)}")
+        # shared full-rest measures standing in for the missing measures of
+        # shorter staves, one per time signature
+        self._empty_measures = {}
+        self._longest_staff = None
+
         self._measure_count = self._pad_with_empty_measures()
+        self._staff_versions = self._get_staff_versions()
+
+        # serialized <note> elements, keyed by _note_fragment_key
+        self._note_fragments = {}
+
+        # serialized staff measures from the last incremental export, keyed by
+        # (part index, staff index, id(measure))
+        self._measure_fragments = {}
+
+        # format numbers with _canonical_number, set by each export
+        self._canonical = False
+
+    def _from_etree(self, tree: etree.ElementTree) -> List[dict]:
+        """Parts of a parsed MusicXML document, taking its title and composer
+        unless they were given"""
 
-    def _from_etree(self, parts):
-        return False
+        # the importer builds Scores, so it is imported here
+        from lejaren.intake.import_musicxml import read_score_tree
+
+        title, composer, parts = read_score_tree(tree)
+
+        self.title = self.title or title
+        self.composer = self.composer or composer
+
+        return self._parse_parts(parts)
+
+    @staticmethod
+    def _is_part(item) -> bool:
+        """A Part, or a list of Parts making up the staves of one part."""
+        if isinstance(item, list):
+            return len(item) > 0 and all(isinstance(staff, Part) for staff in item)
+        return isinstance(item, Part)
 
     def _parse_parts(self, parts):
 
@@ -48,7 +218,7 @@ class Score:
 
         # parts is a single Part object.
         if isinstance(parts, Part):
-            parsed_parts = [{"staff_count": 1, "staves": [parts]}]
+            parsed_parts = [{"staff_count": 1, "staves": [parts], "multiple_rests": {}}]
 
         # parts is a list.
         elif isinstance(parts, list):
@@ -56,9 +226,13 @@ class Score:
 
             for p in parts:
                 if isinstance(p, list):
-                    parsed_parts.append({"staff_count": len(p), "staves": p})
+                    parsed_parts.append(
+                        {"staff_count": len(p), "staves": p, "multiple_rests": {}}
+                    )
                 else:
-                    parsed_parts.append({"staff_count": 1, "staves": [p]})
+                    parsed_parts.append(
+                        {"staff_count": 1, "staves": [p], "multiple_rests": {}}
+                    )
 
         else:
             raise Exception("Invalid parts argument supplied to Score.")
@@ -66,7 +240,12 @@ class Score:
         return parsed_parts
 
     def _pad_with_empty_measures(self) -> int:
-        """Returns score measure length (ie. max number of measures)"""
+        """Returns score measure length (ie. max number of measures)
+
+        Shorter staves are not extended. Past their last measure,
+        _staff_measure hands out a shared full-rest measure in the time
+        signature of the longest staff.
+        """
 
         max_len = 0
 
@@ -75,30 +254,548 @@ class Score:
             for staff in part["staves"]:
                 if len(staff.measures) > max_len:
                     max_len = len(staff.measures)
-                    longest_staff = staff
+                    self._longest_staff = staff
 
-        for part in self._parts:
-            for staff in part["staves"]:
-                if len(staff.measures) < max_len:
-                    for idx in range(len(staff.measures), max_len):
-                        ts = longest_staff.measures[idx].time_signature
-                        measure_to_append = Measure(ts, EMPTY_MEASURE_FACTOR)
+        return max_len
 
-                        full_rest = ts[0]
-                        empty_beat = Beat(ts[0])
-                        empty_beat.add_note(Rest(full_rest))
-                        measure_to_append.add_beat(empty_beat)
-                        staff.measures.append(measure_to_append)
+    def _staff_measure(self, staff: Part, measure_index: int) -> Measure:
+        """The staff's measure at measure_index, or a full-rest measure if
+        the staff ends before it"""
 
-        return max_len
+        if measure_index < len(staff.measures):
+            return staff.measures[measure_index]
+
+        ts = self._longest_staff.measures[measure_index].time_signature
+
+        return self._empty_measure(ts)
+
+    def _empty_measure(self, ts: Tuple[int, int]) -> Measure:
+        """Shared measure holding a single full-measure rest"""
+
+        # time signatures are sometimes given as lists
+        key = tuple(ts)
+
+        try:
+            return self._empty_measures[key]
+        except KeyError:
+            pass
+
+        empty_measure = Measure(ts, EMPTY_MEASURE_FACTOR)
+
+        full_rest = Rest(ts[0])
+        full_rest.is_measure = True
+
+        empty_beat = Beat(ts[0])
+        empty_beat.add_note(full_rest)
+        empty_measure.add_beat(empty_beat)
+
+        self._empty_measures[key] = empty_measure
+
+        return empty_measure
+
+    @staticmethod
+    def _is_measure_rest(measure: Measure) -> bool:
+        """Whether a measure is a single full-measure rest"""
+
+        if len(measure.beats) != 1 or len(measure.beats[0].notes) != 1:
+            return False
+
+        rest = measure.beats[0].notes[0]
+
+        return type(rest) == Rest and rest.is_measure
+
+    def _find_multiple_rests(self, part: dict) -> dict:
+        """
+        Runs of measures that are a full-measure rest in every staff of a part.
+
+        Runs never start on the first measure or cross a time signature change,
+        since both need their own attributes.
+
+        Arguments:
+
+        part (dict): a parsed part.
+
+        Returns:
+
+        A dict from the index of each run's first measure to the run's length,
+        for runs of two measures or more.
+        """
+
+        multiple_rests = {}
+        run_start = None
+        run_ts = None
+
+        for measure_index in range(1, self._measure_count + 1):
+
+            is_rest = False
+            ts = None
+
+            if measure_index < self._measure_count:
+                measures = [
+                    self._staff_measure(staff, measure_index)
+                    for staff in part["staves"]
+                ]
+                ts = measures[0].time_signature
+                is_rest = all(self._is_measure_rest(measure) for measure in measures)
+
+            if run_start is not None and (not is_rest or ts != run_ts):
+                if measure_index - run_start > 1:
+                    multiple_rests[run_start] = measure_index - run_start
+                run_start = None
+
+            if is_rest and run_start is None:
+                run_start = measure_index
+                run_ts = ts
 
-    def convert_to_xml(self, output_filepath: str) -> None:
+        return multiple_rests
+
+    def _get_staff_versions(self) -> Tuple[Tuple[int, int], ...]:
+        return tuple(
+            (staff.version, len(staff.measures))
+            for part in self._parts
+            for staff in part["staves"]
+        )
+
+    def _refresh_measure_count(self) -> None:
+        """Recount the score's measures if any Part was edited since the last
+        export"""
+
+        staff_versions = self._get_staff_versions()
+
+        if staff_versions != self._staff_versions:
+            self._measure_count = self._pad_with_empty_measures()
+            self._staff_versions = self._get_staff_versions()
+
+    def events_at(self, offset: float) -> List[List[List[PartEvent]]]:
+        """
+        Events sounding at an offset in every staff of every part.
+
+        Arguments:
+
+        offset: offset from the start of the score.
+
+        Returns:
+
+        A list per part, holding a list of PartEvents per staff.
+        """
+        return [
+            [staff.events_at(offset) for staff in part["staves"]]
+            for part in self._parts
+        ]
+
+    def events_between(self, start: float, end: float) -> List[List[List[PartEvent]]]:
+        """
+        Slice every staff of every part over the range [start, end).
+
+        Arguments:
+
+        start: offset the range starts at.
+
+        end: offset the range ends at (exclusive).
+
+        Returns:
+
+        A list per part, holding a list of PartEvents per staff.
+        """
+        return [
+            [staff.events_between(start, end) for staff in part["staves"]]
+            for part in self._parts
+        ]
+
+    def excerpt(
+        self, first_measure: int, last_measure: int
+    ) -> List[List[List[Measure]]]:
+        """
+        Measures first_measure through last_measure of every staff.
+
+        Measure numbers are 1 indexed and inclusive, as in the MusicXML output.
+
+        Arguments:
+
+        first_measure (int): number of the first measure.
+
+        last_measure (int): number of the last measure.
+
+        Returns:
+
+        A list per part, holding a list of Measures per staff.
+        """
+        if first_measure < 1 or last_measure < first_measure:
+            raise ValueError(
+                f"Invalid measure range: {first_measure} to {last_measure}"
+            )
+        return [
+            [
+                [
+                    self._staff_measure(staff, measure_index)
+                    for measure_index in range(
+                        first_measure - 1, min(last_measure, self._measure_count)
+                    )
+                ]
+                for staff in part["staves"]
+            ]
+            for part in self._parts
+        ]
+
+    def convert_to_xml(
+        self,
+        output_filepath: str,
+        streaming: bool = False,
+        processes: Optional[int] = None,
+        pretty_print: bool = True,
+        incremental: bool = False,
+        multiple_rests: bool = False,
+        canonical: bool = False,
+    ) -> Optional[str]:
         """Entrypoint to Score class
         * converts self.parts (list of NoteLists) to a MusicXML tree
         * writes MusicXML tree to .xml file
+
+        With streaming=True, each measure is written to the file as soon as it
+        is converted instead of building the whole tree first, so memory use
+        does not grow with the length of the score.
+
+        With processes set, each <part> is rendered in a pool of that many
+        worker processes and the parts are written in score order behind the
+        shared header. Implies streaming.
+
+        With pretty_print=False, the document is written without indentation,
+        which is smaller and meant for machine consumers.
+
+        With incremental=True, each staff's serialized measures are kept on
+        the Score, and the next incremental export only re-renders measures
+        that changed since (see Measure.touch). Implies streaming, and parts
+        are rendered in this process. Takes as much memory as the document,
+        so use it for repeated exports of a score that is being edited.
+
+        With multiple_rests=True, runs of measures that are rests in every
+        staff of a part are marked to display as one multi-measure rest.
+
+        With canonical=True, numbers are written in their shortest form, so
+        the same score always produces the same bytes whether its durations
+        were given as 1, 1.0 or Decimal("1.00"). Implies streaming, and
+        returns the sha256 hex digest of the file, which equals
+        content_hash(pretty_print=pretty_print).
+        """
+        self._refresh_measure_count()
+        self._set_multiple_rests(multiple_rests)
+        self._canonical = canonical
+
+        if canonical:
+            with open(output_filepath, "wb") as output_file:
+                hashing_file = _HashingWriter(output_file)
+                self._stream_xml(hashing_file, pretty_print, processes, incremental)
+            return hashing_file.hexdigest()
+
+        if streaming or processes or incremental:
+            self._stream_xml_to_file(
+                output_filepath,
+                pretty_print=pretty_print,
+                processes=processes,
+                incremental=incremental,
+            )
+        else:
+            xml_score = self._convert_score_parts_to_xml()
+            self._write_xml_to_file(output_filepath, xml_score, pretty_print)
+
+        return None
+
+    def content_hash(
+        self, pretty_print: bool = False, multiple_rests: bool = False
+    ) -> str:
+        """
+        Stable hash of the rendered score.
+
+        The score is rendered in canonical form (see convert_to_xml) into the
+        hash without writing a file. Scores that would export the same bytes
+        have the same hash, across runs and machines, so it can be stored
+        next to rendered output to skip re-rendering unchanged scores.
+
+        Arguments:
+
+        pretty_print: hash the indented document instead of the compact one.
+
+        multiple_rests: hash the document with multi-measure rests.
+
+        Returns:
+
+        sha256 hex digest of the canonical MusicXML.
+        """
+        self._refresh_measure_count()
+        self._set_multiple_rests(multiple_rests)
+        self._canonical = True
+
+        hashing_file = _HashingWriter()
+        self._stream_xml(hashing_file, pretty_print, processes=None)
+
+        return hashing_file.hexdigest()
+
+    def convert_to_mxl(
+        self,
+        output_filepath: str,
+        pretty_print: bool = False,
+        processes: Optional[int] = None,
+        multiple_rests: bool = False,
+        canonical: bool = False,
+    ) -> Optional[str]:
+        """
+        Write the score as compressed MusicXML (.mxl).
+
+        The score is streamed into the ZIP container as it is converted, so
+        the uncompressed document is never held in memory.
+
+        Arguments:
+
+        output_filepath: path of the .mxl file.
+
+        pretty_print: indent the score document. Off by default, since the
+        document is only read by machines once compressed.
+
+        processes: render parts in a process pool, see convert_to_xml.
+
+        multiple_rests: collapse runs of empty measures, see convert_to_xml.
+
+        canonical: write canonical numbers, see convert_to_xml, and date
+        every ZIP entry CANONICAL_ZIP_DATE_TIME so that the container is
+        deterministic too.
+
+        Returns:
+
+        with canonical=True, the sha256 hex digest of the score document,
+        which equals content_hash(pretty_print=pretty_print). Otherwise None.
+        """
+        self._refresh_measure_count()
+        self._set_multiple_rests(multiple_rests)
+        self._canonical = canonical
+
+        output_filepath = pathlib.Path(output_filepath)
+        rootfile_name = output_filepath.stem + ".musicxml"
+
+        def zip_entry(name: str, compress_type: int = zipfile.ZIP_DEFLATED):
+            if not canonical:
+                return name
+            zip_info = zipfile.ZipInfo(name, date_time=CANONICAL_ZIP_DATE_TIME)
+            zip_info.compress_type = compress_type
+            return zip_info
+
+        hashing_file = None
+
+        with zipfile.ZipFile(
+            output_filepath, "w", compression=zipfile.ZIP_DEFLATED
+        ) as mxl:
+            # the mimetype entry comes first and is not compressed
+            mxl.writestr(
+                zip_entry("mimetype", zipfile.ZIP_STORED),
+                MXL_MIMETYPE,
+                compress_type=zipfile.ZIP_STORED,
+            )
+            mxl.writestr(
+                zip_entry(MXL_CONTAINER_PATH),
+                self._mxl_container(rootfile_name),
+            )
+            with mxl.open(
+                zip_entry(rootfile_name), "w", force_zip64=True
+            ) as rootfile:
+                if canonical:
+                    hashing_file = _HashingWriter(rootfile)
+                    self._stream_xml(hashing_file, pretty_print, processes)
+                else:
+                    self._stream_xml(rootfile, pretty_print, processes)
+
+        return hashing_file.hexdigest() if hashing_file else None
+
+    def _set_multiple_rests(self, multiple_rests: bool) -> None:
+        for part in self._parts:
+            part["multiple_rests"] = (
+                self._find_multiple_rests(part) if multiple_rests else {}
+            )
+
+    def to_midi(
+        self,
+        output_filepath: str,
+        tempo: Optional[Tempo] = None,
+        ppq: int = DEFAULT_PPQ,
+        velocity: int = DEFAULT_VELOCITY,
+    ) -> None:
+        """
+        Write the score as a format 1 Standard MIDI File.
+
+        The first track holds the tempo and time signatures, then there is one
+        track per part, with all of its staves, on its own channel. Tied notes
+        are written as a single note.
+
+        Arguments:
+
+        output_filepath: path of the .mid file.
+
+        tempo (Tempo): tempo of the score, quarter = 120 if not given.
+
+        ppq (int): ticks per quarter note.
+
+        velocity (int): velocity of every note.
+
+        Returns:
+
+        None
         """
-        xml_score = self._convert_score_parts_to_xml()
-        self._write_xml_to_file(output_filepath, xml_score)
+        self._refresh_measure_count()
+
+        if tempo is None:
+            tempo = Tempo(DEFAULT_MIDI_BPM, 1)
+
+        # Tempo.note_value is the beat's length in quarter notes
+        microseconds_per_quarter = round(60_000_000 / (tempo.tempo * tempo.note_value))
+
+        measure_starts = [0]
+        conductor_events = [tempo_event(0, microseconds_per_quarter)]
+        previous_time_signature = None
+
+        for measure_index in range(self._measure_count):
+            time_signature = tuple(
+                self._staff_measure(self._longest_staff, measure_index).time_signature
+            )
+            if time_signature != previous_time_signature:
+                conductor_events.append(
+                    time_signature_event(measure_starts[-1], time_signature)
+                )
+                previous_time_signature = time_signature
+
+            measure_starts.append(
+                measure_starts[-1] + ppq * 4 * time_signature[0] // time_signature[1]
+            )
+
+        tracks = [encode_track(conductor_events)]
+
+        for part_idx, part in enumerate(self._parts):
+            channel = MIDI_CHANNELS[part_idx % len(MIDI_CHANNELS)]
+            part_events = []
+            for staff in part["staves"]:
+                part_events.extend(
+                    self._staff_midi_events(
+                        staff, measure_starts, ppq, channel, velocity
+                    )
+                )
+            tracks.append(encode_track(part_events))
+
+        with open(output_filepath, "wb") as output_file:
+            write_midi_file(output_file, tracks, ppq)
+
+    @staticmethod
+    def _staff_midi_events(
+        staff: Part,
+        measure_starts: List[int],
+        ppq: int,
+        channel: int,
+        velocity: int,
+    ) -> List[MidiEvent]:
+        """Note on and off events for one staff, with ties merged"""
+
+        events = []
+
+        # pitch -> (onset, release) of a note tied into the next one
+        tied_notes = {}
+
+        def release_ties():
+            # a tie that never ended still sounds until its last note ends
+            for pitch, (note_onset, release) in tied_notes.items():
+                events.extend(
+                    note_events(
+                        note_onset, release, channel, _midi_pitch(pitch), velocity
+                    )
+                )
+            tied_notes.clear()
+
+        for measure_index, measure in enumerate(staff.measures):
+
+            measure_start = measure_starts[measure_index]
+
+            # laid out durations are scaled by the measure's factor, and a
+            # unit of duration is one 1/ts[1] note
+            ticks_per_unit = (
+                Decimal(ppq * 4)
+                / measure.time_signature[1]
+                / _as_decimal(measure.measure_factor)
+            )
+            position = Decimal(0)
+
+            for current_beat in measure.beats:
+                for entry in current_beat.notes:
+
+                    onset = measure_start + round(position * ticks_per_unit)
+                    position += _as_decimal(entry.dur)
+                    release = measure_start + round(position * ticks_per_unit)
+
+                    if type(entry) == Rest:
+                        release_ties()
+                        continue
+
+                    if type(entry) == Chord:
+                        flagged = [entry] + entry.notes
+                        pitches = [note.pitch_number for note in entry.notes]
+                    else:
+                        flagged = [entry]
+                        pitches = [entry.pitch_number]
+
+                    # the previous entry's tie_start joins it to this one,
+                    # whatever this one is flagged with. Ties only reach the
+                    # next entry.
+                    tied_from = {
+                        pitch: tied_notes.pop(pitch)
+                        for pitch in pitches
+                        if pitch in tied_notes
+                    }
+                    release_ties()
+
+                    tied_to = any(
+                        getattr(flag, "tie_start", False)
+                        or getattr(flag, "tie_continue", False)
+                        for flag in flagged
+                    )
+
+                    for pitch in pitches:
+                        note_onset = onset
+                        if pitch in tied_from:
+                            note_onset = tied_from.pop(pitch)[0]
+
+                        if tied_to:
+                            tied_notes[pitch] = (note_onset, release)
+                        else:
+                            events.extend(
+                                note_events(
+                                    note_onset,
+                                    release,
+                                    channel,
+                                    _midi_pitch(pitch),
+                                    velocity,
+                                )
+                            )
+
+        release_ties()
+
+        return events
+
+    @staticmethod
+    def _mxl_container(rootfile_name: str) -> bytes:
+        """META-INF/container.xml pointing at the score document"""
+
+        xml_container = etree.Element("container")
+        xml_rootfiles = etree.SubElement(xml_container, "rootfiles")
+        xml_rootfile = etree.SubElement(
+            xml_rootfiles,
+            "rootfile",
+            {"full-path": rootfile_name, "media-type": MXL_ROOTFILE_MEDIA_TYPE},
+        )
+
+        return etree.tostring(
+            xml_container, pretty_print=True, encoding="UTF-8", xml_declaration=True
+        )
+
+    def _format_number(self, value) -> str:
+        """Text of a number in the document, canonical when exporting with
+        canonical=True"""
+        if self._canonical:
+            return _canonical_number(value)
+        return str(value)
 
     def _set_measure_attributes(
         self,
@@ -114,7 +811,7 @@ class Score:
         xml_part_attributes = etree.SubElement(xml_measure, "attributes")
 
         xml_part_divisions = etree.SubElement(xml_part_attributes, "divisions")
-        xml_part_divisions.text = str(divisions)
+        xml_part_divisions.text = self._format_number(divisions)
 
         xml_part_key = etree.SubElement(xml_part_attributes, "key")
         xml_part_fifths = etree.SubElement(xml_part_key, "fifths")
@@ -142,27 +839,29 @@ class Score:
 
         return xml_measure
 
-    def _convert_score_parts_to_xml(self) -> etree.ElementTree:
-        """Convert self.parts (list of NoteLists) to a MusicXML tree"""
+    def _convert_header_to_xml(self) -> List[etree.Element]:
+        """Elements that come before the parts: title, composer and part-list"""
 
-        root = etree.Element("score-partwise", {"version": "4.0"})
+        header = []
 
         if self.title:
-            xml_movement_title = etree.SubElement(root, "movement-title")
+            xml_movement_title = etree.Element("movement-title")
             xml_movement_title.text = self.title
+            header.append(xml_movement_title)
 
         if self.composer:
-            xml_identification = etree.SubElement(root, "identification")
+            xml_identification = etree.Element("identification")
 
             xml_identification_composer = etree.SubElement(
                 xml_identification, "creator", {"type": "composer"}
             )
 
             xml_identification_composer.text = self.composer
+            header.append(xml_identification)
 
         # create part-list
         #   score-part, part-name
-        xml_part_list = etree.SubElement(root, "part-list")
+        xml_part_list = etree.Element("part-list")
 
         for idx, score_part in enumerate(self._parts):
 
@@ -173,259 +872,616 @@ class Score:
             )
             xml_part_name = etree.SubElement(xml_score_part, "part-name")
 
+        header.append(xml_part_list)
+
+        return header
+
+    def _convert_score_parts_to_xml(self) -> etree.ElementTree:
+        """Convert self.parts (list of NoteLists) to a MusicXML tree"""
+
+        root = etree.Element("score-partwise", {"version": "4.0"})
+
+        for xml_header_element in self._convert_header_to_xml():
+            root.append(xml_header_element)
+
         # Write actual part, measures, notes, etc. to xml tree
-        for part_idx, part in enumerate(self._parts):
+        for part_idx in range(len(self._parts)):
+            root.append(self._convert_part_to_xml(part_idx))
+
+        # the doctype is written with the tree, see _write_xml_to_file
+        return etree.ElementTree(root)
+
+    def _convert_part_to_xml(self, part_idx: int) -> etree.Element:
+        """Convert every measure of one part to a <part> element"""
+
+        part = self._parts[part_idx]
+        part_number = part_idx + 1
+        xml_part = etree.Element("part", {"id": "P" + str(part_number)})
+
+        # Iterate through each Measure of the Part.
+        for measure_index in range(self._measure_count):
+            xml_part.append(self._convert_measure_to_xml(part, measure_index))
+
+        return xml_part
+
+    def _render_part_xml(self, part_idx: int, pretty_print: bool = True) -> bytes:
+        """Serialized <part>, indented to sit directly under the root element"""
+        return b"".join(self._iter_part_xml(part_idx, pretty_print))
+
+    def _iter_part_xml(
+        self,
+        part_idx: int,
+        pretty_print: bool,
+        previous_fragments: Optional[dict] = None,
+    ) -> Iterable[bytes]:
+        """Serialized <part> one measure at a time: the start tag, each
+        <measure>, then the end tag"""
+
+        part_number = part_idx + 1
+        indent = b"\n  " if pretty_print else b""
+        start_tag = indent + b'<part id="P%d"' % part_number
+
+        if self._measure_count == 0:
+            yield start_tag + b"/>"
+            return
+
+        yield start_tag + b">"
+
+        for measure_index in range(self._measure_count):
+            yield self._render_measure_xml(
+                part_idx, measure_index, pretty_print, previous_fragments
+            )
+
+        yield indent + b"</part>"
+
+    def _render_measure_xml(
+        self,
+        part_idx: int,
+        measure_index: int,
+        pretty_print: bool,
+        previous_fragments: Optional[dict] = None,
+    ) -> bytes:
+        """Serialized <measure>, indented to sit inside its <part>.
+
+        Produces the same bytes as serializing _convert_measure_to_xml, but
+        notes come from the fragment cache, so only attributes and backups
+        are built as elements.
+
+        previous_fragments holds the staff measures of the last incremental
+        export. When given, unchanged staff measures are reused from it and
+        every staff measure is kept in self._measure_fragments.
+        """
+
+        part = self._parts[part_idx]
+        indent = b"\n    " if pretty_print else b""
+        start_tag = indent + b'<measure number="%d"' % (measure_index + 1)
+
+        if previous_fragments is None:
+            body = b"".join(
+                self._render_staff_measure_xml(
+                    part, staff_idx, measure_index, pretty_print
+                )
+                for staff_idx in range(len(part["staves"]))
+            )
+        else:
+            body = b"".join(
+                self._render_cached_staff_measure_xml(
+                    part_idx, staff_idx, measure_index, pretty_print, previous_fragments
+                )
+                for staff_idx in range(len(part["staves"]))
+            )
+
+        if not body:
+            return start_tag + b"/>"
+
+        return start_tag + b">" + body + indent + b"</measure>"
+
+    def _render_cached_staff_measure_xml(
+        self,
+        part_idx: int,
+        staff_idx: int,
+        measure_index: int,
+        pretty_print: bool,
+        previous_fragments: dict,
+    ) -> bytes:
+        """_render_staff_measure_xml, reusing the last export's bytes when
+        neither the measure nor anything its rendering depends on changed"""
+
+        part = self._parts[part_idx]
+        staff = part["staves"][staff_idx]
+        current_measure = self._staff_measure(staff, measure_index)
+
+        # the rest of what the attributes and backup depend on
+        previous_time_signature = (
+            self._staff_measure(staff, measure_index - 1).time_signature
+            if measure_index > 0
+            else None
+        )
+        context = (
+            measure_index == 0,
+            previous_time_signature,
+            staff.measure_factor,
+            len(part["staves"]),
+            part["multiple_rests"].get(measure_index) if staff_idx == 0 else None,
+            pretty_print,
+            self._canonical,
+        )
+
+        key = (part_idx, staff_idx, id(current_measure))
+        cached = previous_fragments.get(key)
 
-            part_number = part_idx + 1
-            xml_part = etree.SubElement(root, "part", {"id": "P" + str(part_number)})
+        if (
+            cached is not None
+            and cached[0] is current_measure
+            and cached[1] == current_measure.version
+            and cached[2] == context
+        ):
+            fragment = cached[3]
+        else:
+            fragment = self._render_staff_measure_xml(
+                part, staff_idx, measure_index, pretty_print
+            )
+
+        self._measure_fragments[key] = (
+            current_measure,
+            current_measure.version,
+            context,
+            fragment,
+        )
+
+        return fragment
 
-            staff_count = part["staff_count"]
-            staves = part["staves"]
+    def _render_staff_measure_xml(
+        self, part: dict, staff_idx: int, measure_index: int, pretty_print: bool
+    ) -> bytes:
+        """Serialized contents of one staff's measure: its attributes, notes
+        and backup"""
 
-            # Iterate through each Measure of the Part.
-            for measure_index in range(self._measure_count):
+        current_measure = self._staff_measure(part["staves"][staff_idx], measure_index)
 
-                # xml measures are 1 indexed, but Measures are 0 indexed
-                current_measure_count = measure_index + 1
+        fragments = []
 
-                if current_measure_count <= self._measure_count:
-                    xml_measure = etree.SubElement(
-                        xml_part, "measure", {"number": str(current_measure_count)}
+        xml_measure = etree.Element("measure")
+        self._convert_staff_attributes_to_xml(
+            xml_measure, part, staff_idx, measure_index
+        )
+        for xml_child in xml_measure:
+            fragments.append(self._serialize_xml_element(xml_child, 3, pretty_print))
+
+        for current_beat in current_measure.beats:
+            for current_note in current_beat.notes:
+                fragments.append(
+                    self._render_note_xml(
+                        current_note, current_beat, staff_idx, pretty_print
                     )
+                )
 
-                # Iterate through each staff in the Part Measure.
-                for staff_idx, staff in enumerate(staves):
-
-                    current_measure = staff.measures[measure_index]
-
-                    if (measure_index == 0) and (staff_idx == 0):
-                        xml_measure = self._set_measure_attributes(
-                            xml_measure,
-                            current_measure.time_signature,
-                            staff.measure_factor,
-                            staff_count,
-                        )
-
-                        xml_measure_attributes = etree.SubElement(
-                            xml_measure, "attributes"
-                        )
-                        xml_measure_divisions = etree.SubElement(
-                            xml_measure_attributes, "divisions"
-                        )
-                        xml_measure_divisions.text = str(current_measure.measure_factor)
-
-                    standard_subdivisions = []
-                    if current_measure_count != 1:
-                        # xml_measure = etree.SubElement(
-                        #     xml_part, "measure", {"number": str(current_measure_count)}
-                        # )
-                        if measure_index > 0:
-                            xml_measure_attributes = etree.SubElement(
-                                xml_measure, "attributes"
-                            )
-                            xml_measure_divisions = etree.SubElement(
-                                xml_measure_attributes, "divisions"
-                            )
-                            xml_measure_divisions.text = str(current_measure.measure_factor)
-                            # if time signature changes, reset attributes
-                            if (
-                                current_measure.time_signature
-                                != staff.measures[measure_index - 1].time_signature
-                            ):
-                                xml_measure_time_signature = etree.SubElement(
-                                    xml_measure_attributes, "time"
-                                )
-                                xml_measure_time_beats = etree.SubElement(
-                                    xml_measure_time_signature, "beats"
-                                )
-                                xml_measure_time_beat_type = etree.SubElement(
-                                    xml_measure_time_signature, "beat-type"
-                                )
-                                xml_measure_time_beats.text = str(
-                                    current_measure.time_signature[0]
-                                )
-                                xml_measure_time_beat_type.text = str(
-                                    current_measure.time_signature[1]
-                                )
-                            else:
-                                pass
+        xml_measure = etree.Element("measure")
+        self._convert_staff_backup_to_xml(
+            xml_measure, part, staff_idx, measure_index
+        )
+        for xml_child in xml_measure:
+            fragments.append(self._serialize_xml_element(xml_child, 3, pretty_print))
 
-                    # we add the notes
-                    for current_beat in current_measure.beats:
-                        beat_subdivisions = current_beat.subdivisions
+        return b"".join(fragments)
 
-                        for current_note in current_beat.notes:
+    def _render_note_xml(
+        self, current_note, current_beat: Beat, staff_idx: int, pretty_print: bool
+    ) -> bytes:
+        """Serialized <note>, indented to sit inside its <measure>.
 
-                            if type(current_note) == Rest:
-                                xml_note = etree.SubElement(xml_measure, "note")
-                                xml_rest = etree.SubElement(xml_note, "rest")
-                                xml_rest_duration = etree.SubElement(
-                                    xml_note, "duration"
-                                )
-                                xml_rest_duration.text = str(current_note.dur)
+        Notes that render the same are only converted once per score; later
+        ones are looked up by their rendering fields.
+        """
 
-                            elif type(current_note) == Chord:
-                                log.debug("CHORD")
-                                pass
+        key = (
+            _note_fragment_key(current_note, current_beat, staff_idx),
+            pretty_print,
+            self._canonical,
+        )
 
-                            else:
-                                # note
-                                #   -> pitch, duration, accidental, notation ties
-                                xml_note = etree.SubElement(xml_measure, "note")
+        try:
+            return self._note_fragments[key]
+        except KeyError:
+            pass
 
-                                if current_note.is_chord_member:
+        xml_measure = etree.Element("measure")
+        self._convert_note_to_xml(xml_measure, current_note, current_beat, staff_idx)
 
-                                    xml_chord_tag = etree.SubElement(xml_note, "chord")
+        fragment = b"".join(
+            self._serialize_xml_element(xml_child, 3, pretty_print)
+            for xml_child in xml_measure
+        )
+        self._note_fragments[key] = fragment
 
-                                xml_note_pitch = etree.SubElement(xml_note, "pitch")
+        return fragment
 
-                                # pitch step
-                                xml_note_pitch_step = etree.SubElement(
-                                    xml_note_pitch, "step"
-                                )
-                                xml_note_pitch_step.text = current_note.step_name
+    @staticmethod
+    def _serialize_xml_element(
+        xml_element: etree.Element, level: int, pretty_print: bool
+    ) -> bytes:
+        """Serialize an element as lxml's pretty printer would at the given
+        depth of the document"""
 
-                                # pitch alter
-                                xml_note_pitch_alter = etree.SubElement(
-                                    xml_note_pitch, "alter"
-                                )
+        xml_element.tail = None
 
-                                xml_note_pitch_alter.text = (
-                                    current_note.alter
-                                    if xml_note_pitch_alter is not None
-                                    else 0
-                                )
+        if pretty_print:
+            etree.indent(xml_element, level=level)
+            return b"\n" + b"  " * level + etree.tostring(xml_element, encoding="UTF-8")
 
-                                # pitch octave
-                                xml_note_pitch_octave = etree.SubElement(
-                                    xml_note_pitch, "octave"
-                                )
-                                xml_note_pitch_octave.text = str(current_note.octave)
+        return etree.tostring(xml_element, encoding="UTF-8")
 
-                                # duration
-                                xml_note_duration = etree.SubElement(
-                                    xml_note, "duration"
-                                )
-                                xml_note_duration.text = str(current_note.dur)
-
-                                if current_note.tie_start:
-                                    xml_tie = etree.SubElement(
-                                        xml_note, "tie", {"type": "start"}
-                                    )
-
-                                if current_note.tie_continue:
-                                    xml_tie = etree.SubElement(
-                                        xml_note, "tie", {"type": "start"}
-                                    )
-
-                                if current_note.tie_end:
-                                    xml_tie = etree.SubElement(
-                                        xml_note, "tie", {"type": "stop"}
-                                    )
-
-                                # accidental
-                                if current_note.alter:
-                                    xml_note_accidental = etree.SubElement(
-                                        xml_note, "accidental"
-                                    )
-                                    xml_note_accidental.text = current_note.accidental
-
-                                # staff
-                                xml_note_staff = etree.SubElement(xml_note, "staff")
-                                xml_note_staff.text = str(staff_idx + 1)
-
-                                # beam
-                                if current_note.beam_start == True:
-                                    xml_beam = etree.SubElement(xml_note, "beam")
-                                    xml_beam.text = "begin"
-                                elif current_note.beam_continue == True:
-                                    xml_beam = etree.SubElement(xml_note, "beam")
-                                    xml_beam.text = "continue"
-
-                                # time modification
-                                if current_beat.tuplet == True:
-                                    xml_time_modification = etree.SubElement(
-                                        xml_note, "time-modification"
-                                    )
-                                    xml_time_modification_actual = etree.SubElement(
-                                        xml_time_modification, "actual-notes"
-                                    )
-                                    xml_time_modification_actual.text = str(
-                                        current_beat.actual_notes
-                                    )
-                                    xml_time_modification_normal = etree.SubElement(
-                                        xml_time_modification, "normal-notes"
-                                    )
-                                    xml_time_modification_normal.text = str(
-                                        current_beat.subdivisions
-                                    )
-
-                                # notation ties
-                                if current_note.tie_start:
-                                    xml_notations = etree.SubElement(
-                                        xml_note, "notations"
-                                    )
-                                    xml_notations_tied = etree.SubElement(
-                                        xml_notations, "tied", {"type": "start"}
-                                    )
-                                if current_note.tie_continue:
-                                    xml_notations = etree.SubElement(
-                                        xml_note, "notations"
-                                    )
-                                    xml_notations_tied = etree.SubElement(
-                                        xml_notations, "tied", {"type": "continue"}
-                                    )
-                                if current_note.tie_end:
-                                    xml_notations = etree.SubElement(
-                                        xml_note, "notations"
-                                    )
-                                    xml_notations_tied = etree.SubElement(
-                                        xml_notations, "tied", {"type": "stop"}
-                                    )
-
-                                if current_note.articulation:
-                                    if current_note.articulation in ARTICULATIONS:
-                                        xml_notations = etree.SubElement(
-                                            xml_note, "notations"
-                                        )
-                                        xml_notations_articulation = etree.SubElement(
-                                            xml_notations, "articulations"
-                                        )
-                                        xml_articulation = etree.SubElement(
-                                            xml_notations_articulation,
-                                            current_note.articulation,
-                                        )
-                                else:
-                                    pass
-
-                    if (len(staves) > 1) and (staff_idx < len(staves) - 1):
-                        xml_backup = etree.SubElement(xml_measure, "backup")
-                        xml_backup_duration = etree.SubElement(xml_backup, "duration")
-                        xml_backup_duration.text = str(
-                            staff.measure_factor
-                            * current_measure.total_cumulative_beats
-                        )
-
-            serialized = etree.tostring(
-                root,
-                doctype='<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 4.0 Partwise//EN" "http://www.musicxml.org/xsd/musicxml.xsd">',
+    def _convert_measure_to_xml(self, part: dict, measure_index: int) -> etree.Element:
+        """Convert one measure of a part, across all of its staves, to a
+        <measure> element"""
+
+        # xml measures are 1 indexed, but Measures are 0 indexed
+        current_measure_count = measure_index + 1
+
+        xml_measure = etree.Element("measure", {"number": str(current_measure_count)})
+
+        # Iterate through each staff in the Part Measure.
+        for staff_idx, staff in enumerate(part["staves"]):
+
+            current_measure = self._staff_measure(staff, measure_index)
+
+            self._convert_staff_attributes_to_xml(
+                xml_measure, part, staff_idx, measure_index
             )
 
-            new_root = etree.XML(serialized)
-            musicxml_tree = etree.ElementTree(new_root)
+            # we add the notes
+            for current_beat in current_measure.beats:
+                for current_note in current_beat.notes:
+                    self._convert_note_to_xml(
+                        xml_measure, current_note, current_beat, staff_idx
+                    )
 
-            part_number += 1
+            self._convert_staff_backup_to_xml(
+                xml_measure, part, staff_idx, measure_index
+            )
 
-        return musicxml_tree
+        return xml_measure
+
+    def _convert_staff_attributes_to_xml(
+        self, xml_measure: etree.Element, part: dict, staff_idx: int, measure_index: int
+    ) -> None:
+        """Append the <attributes> that come before a staff's notes"""
+
+        staff = part["staves"][staff_idx]
+        current_measure = self._staff_measure(staff, measure_index)
+
+        if (measure_index == 0) and (staff_idx == 0):
+            self._set_measure_attributes(
+                xml_measure,
+                current_measure.time_signature,
+                staff.measure_factor,
+                part["staff_count"],
+            )
+
+            xml_measure_attributes = etree.SubElement(xml_measure, "attributes")
+            xml_measure_divisions = etree.SubElement(
+                xml_measure_attributes, "divisions"
+            )
+            xml_measure_divisions.text = self._format_number(
+                current_measure.measure_factor
+            )
+
+        elif measure_index == 0:
+            # later staves can divide the first measure differently
+            xml_measure_attributes = etree.SubElement(xml_measure, "attributes")
+            xml_measure_divisions = etree.SubElement(
+                xml_measure_attributes, "divisions"
+            )
+            xml_measure_divisions.text = self._format_number(
+                current_measure.measure_factor
+            )
+
+        if measure_index > 0:
+            xml_measure_attributes = etree.SubElement(xml_measure, "attributes")
+            xml_measure_divisions = etree.SubElement(
+                xml_measure_attributes, "divisions"
+            )
+            xml_measure_divisions.text = self._format_number(
+                current_measure.measure_factor
+            )
+            # if time signature changes, reset attributes
+            if (
+                current_measure.time_signature
+                != self._staff_measure(staff, measure_index - 1).time_signature
+            ):
+                xml_measure_time_signature = etree.SubElement(
+                    xml_measure_attributes, "time"
+                )
+                xml_measure_time_beats = etree.SubElement(
+                    xml_measure_time_signature, "beats"
+                )
+                xml_measure_time_beat_type = etree.SubElement(
+                    xml_measure_time_signature, "beat-type"
+                )
+                xml_measure_time_beats.text = str(current_measure.time_signature[0])
+                xml_measure_time_beat_type.text = str(
+                    current_measure.time_signature[1]
+                )
+
+            multiple_rest_count = part["multiple_rests"].get(measure_index)
+            if staff_idx == 0 and multiple_rest_count:
+                xml_measure_style = etree.SubElement(
+                    xml_measure_attributes, "measure-style"
+                )
+                xml_multiple_rest = etree.SubElement(
+                    xml_measure_style, "multiple-rest"
+                )
+                xml_multiple_rest.text = str(multiple_rest_count)
+
+    def _convert_staff_backup_to_xml(
+        self, xml_measure: etree.Element, part: dict, staff_idx: int, measure_index: int
+    ) -> None:
+        """Append the <backup> that moves back to the start of the measure for
+        the next staff"""
+
+        staves = part["staves"]
+
+        if (len(staves) > 1) and (staff_idx < len(staves) - 1):
+            staff = staves[staff_idx]
+            current_measure = self._staff_measure(staff, measure_index)
+
+            xml_backup = etree.SubElement(xml_measure, "backup")
+            xml_backup_duration = etree.SubElement(xml_backup, "duration")
+            # in the divisions of the staff's own measure, which were the
+            # last ones written
+            xml_backup_duration.text = self._format_number(
+                current_measure.measure_factor * current_measure.total_cumulative_beats
+            )
+
+    def _convert_note_to_xml(
+        self,
+        xml_measure: etree.Element,
+        current_note,
+        current_beat: Beat,
+        staff_idx: int,
+    ) -> None:
+        """Append a <note> for a Note or Rest to xml_measure"""
+
+        if type(current_note) == Rest:
+            xml_note = etree.SubElement(xml_measure, "note")
+            if current_note.is_measure:
+                xml_rest = etree.SubElement(xml_note, "rest", {"measure": "yes"})
+            else:
+                xml_rest = etree.SubElement(xml_note, "rest")
+            xml_rest_duration = etree.SubElement(xml_note, "duration")
+            xml_rest_duration.text = self._format_number(current_note.dur)
+
+        elif type(current_note) == Chord:
+            # the members after the lowest carry <chord/>
+            for note in current_note.notes:
+                self._convert_note_to_xml(xml_measure, note, current_beat, staff_idx)
+
+        else:
+            # note
+            #   -> pitch, duration, accidental, notation ties
+            xml_note = etree.SubElement(xml_measure, "note")
+
+            if current_note.is_chord_member:
+
+                xml_chord_tag = etree.SubElement(xml_note, "chord")
+
+            xml_note_pitch = etree.SubElement(xml_note, "pitch")
+
+            # pitch step
+            xml_note_pitch_step = etree.SubElement(xml_note_pitch, "step")
+            xml_note_pitch_step.text = current_note.step_name
+
+            # pitch alter
+            xml_note_pitch_alter = etree.SubElement(xml_note_pitch, "alter")
+
+            xml_note_pitch_alter.text = (
+                current_note.alter if xml_note_pitch_alter is not None else 0
+            )
+
+            # pitch octave
+            xml_note_pitch_octave = etree.SubElement(xml_note_pitch, "octave")
+            xml_note_pitch_octave.text = str(current_note.octave)
+
+            # duration
+            xml_note_duration = etree.SubElement(xml_note, "duration")
+            xml_note_duration.text = self._format_number(current_note.dur)
+
+            if current_note.tie_start:
+                xml_tie = etree.SubElement(xml_note, "tie", {"type": "start"})
+
+            if current_note.tie_continue:
+                xml_tie = etree.SubElement(xml_note, "tie", {"type": "start"})
+
+            if current_note.tie_end:
+                xml_tie = etree.SubElement(xml_note, "tie", {"type": "stop"})
+
+            # accidental
+            if current_note.alter:
+                xml_note_accidental = etree.SubElement(xml_note, "accidental")
+                xml_note_accidental.text = current_note.accidental
+
+            # staff
+            xml_note_staff = etree.SubElement(xml_note, "staff")
+            xml_note_staff.text = str(staff_idx + 1)
+
+            # beam
+            if current_note.beam_start == True:
+                xml_beam = etree.SubElement(xml_note, "beam")
+                xml_beam.text = "begin"
+            elif current_note.beam_continue == True:
+                xml_beam = etree.SubElement(xml_note, "beam")
+                xml_beam.text = "continue"
+
+            # time modification
+            if current_beat.tuplet == True:
+                xml_time_modification = etree.SubElement(
+                    xml_note, "time-modification"
+                )
+                xml_time_modification_actual = etree.SubElement(
+                    xml_time_modification, "actual-notes"
+                )
+                xml_time_modification_actual.text = self._format_number(
+                    current_beat.actual_notes
+                )
+                xml_time_modification_normal = etree.SubElement(
+                    xml_time_modification, "normal-notes"
+                )
+                xml_time_modification_normal.text = self._format_number(
+                    current_beat.subdivisions
+                )
+
+            # notation ties
+            if current_note.tie_start:
+                xml_notations = etree.SubElement(xml_note, "notations")
+                xml_notations_tied = etree.SubElement(
+                    xml_notations, "tied", {"type": "start"}
+                )
+            if current_note.tie_continue:
+                xml_notations = etree.SubElement(xml_note, "notations")
+                xml_notations_tied = etree.SubElement(
+                    xml_notations, "tied", {"type": "continue"}
+                )
+            if current_note.tie_end:
+                xml_notations = etree.SubElement(xml_note, "notations")
+                xml_notations_tied = etree.SubElement(
+                    xml_notations, "tied", {"type": "stop"}
+                )
+
+            if current_note.articulation:
+                if current_note.articulation in ARTICULATIONS:
+                    xml_notations = etree.SubElement(xml_note, "notations")
+                    xml_notations_articulation = etree.SubElement(
+                        xml_notations, "articulations"
+                    )
+                    xml_articulation = etree.SubElement(
+                        xml_notations_articulation,
+                        current_note.articulation,
+                    )
+            else:
+                pass
 
     def _write_xml_to_file(
-        self, output_filepath: str, xml_score: etree.ElementTree
+        self,
+        output_filepath: str,
+        xml_score: etree.ElementTree,
+        pretty_print: bool = True,
     ) -> None:
-        """Write MusicXML tree to output file"""
+        """Write MusicXML tree to output file, with the MusicXML doctype"""
         output_filepath = pathlib.Path(output_filepath)
         xml_score.write(
             str(output_filepath),
-            pretty_print=True,
+            pretty_print=pretty_print,
             encoding="UTF-8",
             xml_declaration=True,
+            doctype=MUSICXML_DOCTYPE,
         )
+
+    def _stream_xml_to_file(
+        self,
+        output_filepath: str,
+        pretty_print: bool = True,
+        processes: Optional[int] = None,
+        incremental: bool = False,
+    ) -> None:
+        """Write the score to output file one <measure> at a time.
+
+        Uses lxml's incremental xmlfile writer for the header, then passes
+        each measure to the file as soon as it is rendered, so only the
+        measure being converted is held in memory. The file is flushed after
+        the header and after each part, not after each measure. Notes are
+        rendered from a cache of serialized fragments. The pretty printed
+        output is byte for byte the same as the tree path.
+        """
+        output_filepath = pathlib.Path(output_filepath)
+
+        with open(output_filepath, "wb") as output_file:
+            self._stream_xml(output_file, pretty_print, processes, incremental)
+
+    def _stream_xml(
+        self,
+        output_file,
+        pretty_print: bool,
+        processes: Optional[int],
+        incremental: bool = False,
+    ) -> None:
+        """Write the score to a binary file object, see _stream_xml_to_file"""
+
+        previous_fragments = None
+
+        if incremental:
+            # only measures that are still in the score are carried over
+            previous_fragments = self._measure_fragments
+            self._measure_fragments = {}
+
+        with etree.xmlfile(output_file, encoding="UTF-8") as xml_file:
+            xml_file.write_declaration()
+            xml_file.write_doctype(MUSICXML_DOCTYPE)
+
+            with xml_file.element("score-partwise", {"version": "4.0"}):
+
+                for xml_header_element in self._convert_header_to_xml():
+                    self._stream_xml_element(
+                        xml_file, xml_header_element, 1, pretty_print
+                    )
+
+                # parts are serialized as bytes, so they go straight to the
+                # file once xmlfile's buffer is out of the way
+                xml_file.flush()
+                output_file.flush()
+
+                if processes and not incremental:
+                    for fragment in self._render_parts_in_pool(
+                        processes, pretty_print
+                    ):
+                        output_file.write(fragment)
+                        output_file.flush()
+                else:
+                    for part_idx in range(len(self._parts)):
+                        for fragment in self._iter_part_xml(
+                            part_idx, pretty_print, previous_fragments
+                        ):
+                            output_file.write(fragment)
+                        output_file.flush()
+
+                self._stream_xml_indent(xml_file, 0, pretty_print)
+
+        # lxml will not write text after the root element is closed
+        if pretty_print:
+            output_file.write(b"\n")
+
+    def _render_parts_in_pool(
+        self, processes: int, pretty_print: bool
+    ) -> Iterable[bytes]:
+        """Serialized <part> fragments in score order, rendered in a process
+        pool. The score is sent to each worker once."""
+
+        part_indices = range(len(self._parts))
+
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_part_worker,
+            initargs=(self,),
+        ) as executor:
+            yield from executor.map(
+                _render_part_worker,
+                part_indices,
+                [pretty_print] * len(part_indices),
+            )
+
+    @staticmethod
+    def _stream_xml_indent(xml_file, level: int, pretty_print: bool) -> None:
+        """Write the newline and indentation lxml's pretty printer would put
+        before an element at the given depth"""
+        if pretty_print:
+            xml_file.write("\n" + "  " * level)
+
+    @staticmethod
+    def _stream_xml_element(
+        xml_file, xml_element: etree.Element, level: int, pretty_print: bool
+    ) -> None:
+        """Write a complete element at the given depth of the document"""
+        Score._stream_xml_indent(xml_file, level, pretty_print)
+        if pretty_print:
+            etree.indent(xml_element, level=level)
+        xml_element.tail = None
+        xml_file.write(xml_element)
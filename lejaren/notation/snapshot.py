@@ -0,0 +1,621 @@
+"""
+Binary snapshots of laid out Scores.
+
+A snapshot stores every staff of every part as it is after layout: measures,
+beats, notes, rests, chords and their flags, along with what a Part needs to
+keep being edited. Loading a snapshot does not run layout again.
+
+Layout of a snapshot file (little endian):
+
+    header      magic, format version, part count
+    metadata    title and composer, length prefixed UTF-8
+    part table  byte offset and staff count of each part
+    parts       per staff, a fixed sequence of packed NumPy structured arrays
+
+Each array is stored as a uint64 count followed by its records, starting on
+an 8 byte boundary, so a file can be memory mapped and each part read on its
+own. Numbers (durations, factors, subdivisions) keep their exact type and
+Decimal representation through a per staff table of 128 bit coefficients and
+exponents.
+"""
+
+import copy
+import mmap
+import struct
+from decimal import Decimal
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .beat import Beat
+from .chord import Chord
+from .measure import Measure
+from .note import ARTICULATIONS, Note
+from .part import Part
+from .rest import Rest
+from .score import Score
+
+SNAPSHOT_MAGIC = b"LEJSNAP\x00"
+SNAPSHOT_VERSION = 1
+
+HEADER = struct.Struct("<8sHHI")
+PART_TABLE_ENTRY = struct.Struct("<QI4x")
+STAFF_HEADER = struct.Struct("<III4x")
+COUNT = struct.Struct("<Q")
+
+NO_STRING = 0xFFFFFFFF
+NO_MEASURE_NUMBER = -1
+NO_MEMBERS = 0xFFFFFFFF
+
+NUMBER_INT, NUMBER_DECIMAL, NUMBER_FLOAT = 0, 1, 2
+
+# what reading a truncated or damaged snapshot can raise. Tables are read
+# with struct and indexed without checks, so damage shows up as any of these
+# rather than as one error.
+SNAPSHOT_READ_ERRORS = (ValueError, struct.error, IndexError, KeyError, ArithmeticError)
+
+ENTRY_NOTE, ENTRY_REST, ENTRY_CHORD = 0, 1, 2
+
+STEPS = "CDEFGAB"
+ACCIDENTALS = ("natural", "sharp", "flat", "double-sharp", "flat-flat")
+
+# entry flags, in bit order
+FLAGS = (
+    "tie_start",
+    "tie_continue",
+    "tie_end",
+    "beam_start",
+    "beam_continue",
+    "beam_end",
+    "is_chord_member",
+    "is_measure",
+)
+
+NUMBER_DTYPE = np.dtype(
+    [
+        ("hi", "<u8"),
+        ("lo", "<u8"),
+        ("exponent", "<i4"),
+        ("sign", "u1"),
+        ("kind", "u1"),
+    ]
+)
+
+TIME_SIGNATURE_DTYPE = np.dtype([("beats", "<u2"), ("beat_type", "<u2")])
+
+MEASURE_DTYPE = np.dtype(
+    [
+        ("beats", "<u2"),
+        ("beat_type", "<u2"),
+        ("measure_factor", "<u4"),
+        ("total_cumulative_beats", "<u4"),
+        ("measure_number", "<i4"),
+        ("beat_start", "<u4"),
+        ("beat_count", "<u4"),
+    ]
+)
+
+BEAT_DTYPE = np.dtype(
+    [
+        ("subdivisions", "<u4"),
+        ("actual_notes", "<u4"),
+        ("tuplet", "u1"),
+        ("multi_beat", "u1"),
+        ("entry_start", "<u4"),
+        ("entry_count", "<u4"),
+    ]
+)
+
+ENTRY_DTYPE = np.dtype(
+    [
+        ("kind", "u1"),
+        ("flags", "u1"),
+        ("dur", "<u4"),
+        ("octave", "<i2"),
+        ("pc", "i1"),
+        ("step", "u1"),
+        ("alter", "i1"),
+        ("accidental", "u1"),
+        ("articulation", "u1"),
+        ("member_start", "<u4"),
+        ("member_count", "<u2"),
+    ]
+)
+
+
+class _NumberTable:
+    """Collects the distinct numbers of a staff as NUMBER_DTYPE records"""
+
+    def __init__(self) -> None:
+        self.records = []
+        self._indices = {}
+
+    def index(self, value) -> int:
+        # keyed on the text as well, so 1, 1.0 and Decimal("1.0") stay apart
+        key = (type(value), repr(value))
+
+        try:
+            return self._indices[key]
+        except KeyError:
+            pass
+
+        self._indices[key] = len(self.records)
+        self.records.append(_encode_number(value))
+        return self._indices[key]
+
+
+def _encode_number(value) -> Tuple[int, int, int, int, int]:
+    if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+        raise TypeError(f"Cannot snapshot {value!r}")
+
+    if isinstance(value, int):
+        kind = NUMBER_INT
+        sign, coefficient, exponent = int(value < 0), abs(value), 0
+    else:
+        kind = NUMBER_FLOAT if isinstance(value, float) else NUMBER_DECIMAL
+        decimal_value = Decimal(repr(value)) if kind == NUMBER_FLOAT else value
+        if not decimal_value.is_finite():
+            raise ValueError(f"Cannot snapshot {value!r}")
+        sign, digits, exponent = decimal_value.as_tuple()
+        coefficient = int("".join(map(str, digits)))
+
+    if coefficient >= 1 << 128:
+        raise ValueError(f"{value!r} has too many digits to snapshot")
+
+    return (coefficient >> 64, coefficient & (2**64 - 1), exponent, sign, kind)
+
+
+def _decode_number(record) -> Union[int, float, Decimal]:
+    hi, lo, exponent, sign, kind = record
+    coefficient = (hi << 64) | lo
+
+    if kind == NUMBER_INT:
+        return -coefficient if sign else coefficient
+
+    value = Decimal((sign, tuple(int(digit) for digit in str(coefficient)), exponent))
+
+    if kind == NUMBER_FLOAT:
+        return float(value)
+
+    return value
+
+
+def _entry_flags(entry) -> int:
+    flags = 0
+    for bit, name in enumerate(FLAGS):
+        if getattr(entry, name, False):
+            flags |= 1 << bit
+    return flags
+
+
+# names of the flags set in every possible flags byte
+FLAG_NAMES = [
+    tuple(name for bit, name in enumerate(FLAGS) if flags & (1 << bit))
+    for flags in range(1 << len(FLAGS))
+]
+
+
+def _set_entry_flags(entry, flags: int) -> None:
+    for name in FLAG_NAMES[flags]:
+        setattr(entry, name, True)
+
+
+class _StaffWriter:
+    """Flattens one staff into record lists"""
+
+    def __init__(self) -> None:
+        self.numbers = _NumberTable()
+        self.measures = []
+        self.beats = []
+        self.entries = []
+        self.members = []
+
+    def add_entry(self, entry, records: list, dur=None) -> None:
+        """Append an entry's record. dur replaces the entry's own duration,
+        for source entries whose objects were scaled by layout."""
+
+        if dur is None:
+            dur = entry.dur
+
+        entry_type = type(entry)
+        dur_index = self.numbers.index(dur)
+
+        if entry_type == Rest:
+            records.append(
+                (ENTRY_REST, _entry_flags(entry), dur_index, 0, 0, 0, 0, 0, 0, NO_MEMBERS, 0)
+            )
+
+        elif entry_type == Chord:
+            member_start = len(self.members)
+            for note in entry.notes:
+                self.add_entry(note, self.members, dur)
+            records.append(
+                (
+                    ENTRY_CHORD,
+                    _entry_flags(entry),
+                    dur_index,
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,
+                    member_start,
+                    len(entry.notes),
+                )
+            )
+
+        elif entry_type == Note:
+            articulation = (
+                ARTICULATIONS.index(entry.articulation) + 1 if entry.articulation else 0
+            )
+            records.append(
+                (
+                    ENTRY_NOTE,
+                    _entry_flags(entry),
+                    dur_index,
+                    entry.octave,
+                    entry.pc,
+                    STEPS.index(entry.step_name),
+                    int(entry.alter),
+                    ACCIDENTALS.index(entry.accidental),
+                    articulation,
+                    NO_MEMBERS,
+                    0,
+                )
+            )
+
+        else:
+            raise TypeError(f"Cannot snapshot {entry_type.__name__} entries")
+
+    def write(self, output_file: BinaryIO, staff: Part) -> None:
+
+        for measure in staff.measures:
+            beat_start = len(self.beats)
+
+            for beat in measure.beats:
+                entry_start = len(self.entries)
+                for entry in beat.notes:
+                    self.add_entry(entry, self.entries)
+
+                self.beats.append(
+                    (
+                        self.numbers.index(beat.subdivisions),
+                        self.numbers.index(beat.actual_notes),
+                        beat.tuplet,
+                        beat.multi_beat,
+                        entry_start,
+                        len(beat.notes),
+                    )
+                )
+
+            measure_number = (
+                NO_MEASURE_NUMBER
+                if measure.measure_number is None
+                else measure.measure_number
+            )
+            self.measures.append(
+                (
+                    measure.time_signature[0],
+                    measure.time_signature[1],
+                    self.numbers.index(measure.measure_factor),
+                    self.numbers.index(measure.total_cumulative_beats),
+                    measure_number,
+                    beat_start,
+                    len(measure.beats),
+                )
+            )
+
+        source_entries = []
+        for entry, dur in zip(staff.current_list, staff._source_durs):
+            self.add_entry(entry, source_entries, dur)
+
+        time_signatures = [tuple(ts) for ts in staff.time_signatures]
+
+        output_file.write(
+            STAFF_HEADER.pack(
+                self.numbers.index(staff.measure_factor),
+                staff.time_signature_index,
+                0,
+            )
+        )
+
+        for records, dtype in (
+            (self.numbers.records, NUMBER_DTYPE),
+            (time_signatures, TIME_SIGNATURE_DTYPE),
+            (self.measures, MEASURE_DTYPE),
+            (self.beats, BEAT_DTYPE),
+            (self.entries, ENTRY_DTYPE),
+            (self.members, ENTRY_DTYPE),
+            (source_entries, ENTRY_DTYPE),
+        ):
+            _write_array(output_file, np.array(records, dtype=dtype))
+
+
+def _write_array(output_file: BinaryIO, array: np.ndarray) -> None:
+    output_file.write(COUNT.pack(len(array)))
+    output_file.write(array.tobytes())
+    _pad(output_file)
+
+
+def _pad(output_file: BinaryIO) -> None:
+    output_file.write(b"\x00" * (-output_file.tell() % 8))
+
+
+def _write_string(output_file: BinaryIO, text: Optional[str]) -> None:
+    if text is None:
+        output_file.write(struct.pack("<I", NO_STRING))
+    else:
+        encoded = text.encode("utf-8")
+        output_file.write(struct.pack("<I", len(encoded)) + encoded)
+
+
+def save_snapshot(score: Score, output_filepath: str) -> None:
+    """
+    Write a laid out Score to a snapshot file.
+
+    Arguments:
+
+    score (Score): the score to save.
+
+    output_filepath: path of the snapshot file.
+
+    Returns:
+
+    None
+    """
+    parts = score._parts
+
+    with open(output_filepath, "wb") as output_file:
+        output_file.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(parts)))
+        _write_string(output_file, score.title)
+        _write_string(output_file, score.composer)
+        _pad(output_file)
+
+        # filled in once the parts have been written
+        part_table_offset = output_file.tell()
+        output_file.write(b"\x00" * PART_TABLE_ENTRY.size * len(parts))
+
+        part_table = []
+        for part in parts:
+            part_table.append((output_file.tell(), part["staff_count"]))
+            for staff in part["staves"]:
+                _StaffWriter().write(output_file, staff)
+
+        output_file.seek(part_table_offset)
+        for offset, staff_count in part_table:
+            output_file.write(PART_TABLE_ENTRY.pack(offset, staff_count))
+
+
+class ScoreSnapshot:
+    """
+    A snapshot file, memory mapped and read one part at a time.
+
+    Attributes:
+
+    title, composer : str or None
+
+    part_count : int
+
+    Methods:
+    --------
+
+    load_part(part_idx)
+    The part's staves as laid out Parts.
+
+    to_score()
+    A Score of every part.
+
+    close()
+    Unmaps the file. Also done when used as a context manager.
+    """
+
+    def __init__(self, input_filepath: str) -> None:
+
+        with open(input_filepath, "rb") as input_file:
+            self._buffer = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.part_count = HEADER.unpack_from(self._buffer, 0)
+
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{input_filepath} is not a lejaren snapshot")
+        if version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(
+                f"Snapshot version {version} is not supported, expected {SNAPSHOT_VERSION}"
+            )
+
+        position = HEADER.size
+        self.title, position = self._read_string(position)
+        self.composer, position = self._read_string(position)
+        position += -position % 8
+
+        self._part_table = [
+            PART_TABLE_ENTRY.unpack_from(
+                self._buffer, position + idx * PART_TABLE_ENTRY.size
+            )
+            for idx in range(self.part_count)
+        ]
+
+    def __enter__(self) -> "ScoreSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def _read_string(self, position: int) -> Tuple[Optional[str], int]:
+        (length,) = struct.unpack_from("<I", self._buffer, position)
+        position += 4
+        if length == NO_STRING:
+            return None, position
+        text = bytes(self._buffer[position : position + length]).decode("utf-8")
+        return text, position + length
+
+    def _read_array(self, dtype: np.dtype, position: int) -> Tuple[list, int]:
+        (count,) = COUNT.unpack_from(self._buffer, position)
+        position += COUNT.size
+        records = np.frombuffer(
+            self._buffer, dtype=dtype, count=count, offset=position
+        ).tolist()
+        position += count * dtype.itemsize
+        return records, position + (-position % 8)
+
+    def load_part(self, part_idx: int) -> Union[Part, List[Part]]:
+        """
+        Read one part from the snapshot.
+
+        Arguments:
+
+        part_idx (int): index of the part in the score.
+
+        Returns:
+
+        A Part, or a list of Parts for a part with several staves.
+        """
+        position, staff_count = self._part_table[part_idx]
+
+        staves = []
+        for _ in range(staff_count):
+            staff, position = self._load_staff(position)
+            staves.append(staff)
+
+        return staves[0] if staff_count == 1 else staves
+
+    def to_score(self) -> Score:
+        """Every part of the snapshot as a Score"""
+        return Score(
+            [self.load_part(part_idx) for part_idx in range(self.part_count)],
+            title=self.title,
+            composer=self.composer,
+        )
+
+    def _load_staff(self, position: int) -> Tuple[Part, int]:
+
+        measure_factor_index, time_signature_index, _ = STAFF_HEADER.unpack_from(
+            self._buffer, position
+        )
+        position += STAFF_HEADER.size
+
+        number_records, position = self._read_array(NUMBER_DTYPE, position)
+        time_signatures, position = self._read_array(TIME_SIGNATURE_DTYPE, position)
+        measure_records, position = self._read_array(MEASURE_DTYPE, position)
+        beat_records, position = self._read_array(BEAT_DTYPE, position)
+        entry_records, position = self._read_array(ENTRY_DTYPE, position)
+        member_records, position = self._read_array(ENTRY_DTYPE, position)
+        source_records, position = self._read_array(ENTRY_DTYPE, position)
+
+        numbers = [_decode_number(record) for record in number_records]
+
+        def make_entry(record):
+            (
+                kind,
+                flags,
+                dur_index,
+                octave,
+                pc,
+                step,
+                alter,
+                accidental,
+                articulation,
+                member_start,
+                member_count,
+            ) = record
+
+            if kind == ENTRY_REST:
+                entry = Rest.__new__(Rest)
+                entry.dur = numbers[dur_index]
+                entry.is_measure = False
+
+            elif kind == ENTRY_CHORD:
+                entry = Chord.__new__(Chord)
+                entry.notes = [
+                    make_entry(member)
+                    for member in member_records[member_start : member_start + member_count]
+                ]
+                entry.dur = numbers[dur_index]
+
+            else:
+                entry = Note.__new__(Note)
+                entry.dur = numbers[dur_index]
+                entry.dur_key = entry.dur.as_integer_ratio()
+                entry.octave = octave
+                entry.pc = pc
+                entry.pitch_number = octave * 12 + pc
+                entry.step_name = STEPS[step]
+                entry.alter = str(alter)
+                entry.accidental = ACCIDENTALS[accidental]
+                entry.articulation = ARTICULATIONS[articulation - 1] if articulation else None
+
+            _set_entry_flags(entry, flags)
+            return entry
+
+        entries = [make_entry(record) for record in entry_records]
+
+        beats = []
+        for subdivisions, actual_notes, tuplet, multi_beat, entry_start, entry_count in beat_records:
+            beat = Beat(numbers[subdivisions])
+            beat.notes = entries[entry_start : entry_start + entry_count]
+            beat.tuplet = bool(tuplet)
+            beat.multi_beat = bool(multi_beat)
+            beat.actual_notes = numbers[actual_notes]
+            beats.append(beat)
+
+        # measures start from a fresh Measure for their time signature
+        templates = {}
+
+        measures = []
+        for (
+            ts_beats,
+            ts_beat_type,
+            measure_factor,
+            total_cumulative_beats,
+            measure_number,
+            beat_start,
+            beat_count,
+        ) in measure_records:
+            time_signature = (ts_beats, ts_beat_type)
+            if time_signature not in templates:
+                templates[time_signature] = Measure(time_signature, 1)
+            measure = copy.copy(templates[time_signature])
+            measure.measure_map = list(measure.measure_map)
+            measure.cumulative_beats = list(measure.cumulative_beats)
+            measure.beats = beats[beat_start : beat_start + beat_count]
+            measure.notes = [entry for beat in measure.beats for entry in beat.notes]
+            measure.measure_factor = numbers[measure_factor]
+            measure.total_cumulative_beats = numbers[total_cumulative_beats]
+            measure.measure_number = (
+                None if measure_number == NO_MEASURE_NUMBER else measure_number
+            )
+            measure.version = 0
+            measures.append(measure)
+
+        staff = Part._from_layout(
+            measures,
+            [tuple(ts) for ts in time_signatures],
+            [make_entry(record) for record in source_records],
+            numbers[measure_factor_index],
+            time_signature_index,
+        )
+
+        return staff, position
+
+
+def load_snapshot(input_filepath: str) -> Score:
+    """
+    Read a whole snapshot file.
+
+    Arguments:
+
+    input_filepath: path of the snapshot file.
+
+    Returns:
+
+    A Score of every part in the snapshot. A truncated or damaged file
+    raises one of SNAPSHOT_READ_ERRORS.
+    """
+    with ScoreSnapshot(input_filepath) as snapshot:
+        return snapshot.to_score()
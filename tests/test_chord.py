@@ -87,3 +87,50 @@ def test_split():
 
     assert old_chord.dur == 5
     assert new_chord.dur == 3
+
+
+def test_sort_leaves_input_alone():
+
+    g = Note(4, 4, 7)
+    c = Note(4, 4, 0)
+    high_c = Note(4, 5, 0)
+
+    note_list = [high_c, g, c]
+    chord = Chord(note_list)
+
+    assert note_list == [high_c, g, c]
+    assert note_list[0] is high_c
+    assert [note.pc for note in chord.notes] == [0, 7, 0]
+    assert [note.octave for note in chord.notes] == [4, 4, 5]
+
+
+def test_unison_notes_keep_order():
+
+    first = Note(2, 4, 4)
+    second = Note(2, 4, 4)
+    low = Note(2, 3, 11)
+
+    chord = Chord([first, second, low])
+
+    assert chord.notes[0] is low
+    assert chord.notes[1] is first
+    assert chord.notes[2] is second
+
+
+def test_from_pitch_array():
+
+    pitches = [[55, 48, 52], [60, 53, 57], [59, 55, 50]]
+    durations = [2, 1, 1]
+
+    chords = Chord.from_pitch_array(pitches, durations)
+
+    assert len(chords) == 3
+    assert [(note.octave, note.pc) for note in chords[0].notes] == [(4, 0), (4, 4), (4, 7)]
+    assert [(note.octave, note.pc) for note in chords[1].notes] == [(4, 5), (4, 9), (5, 0)]
+    assert [chord.dur for chord in chords] == durations
+    for chord in chords:
+        assert chord.notes[0].is_chord_member == False
+        assert all(note.is_chord_member for note in chord.notes[1:])
+
+    with pytest.raises(ValueError):
+        Chord.from_pitch_array(pitches, [1, 1])
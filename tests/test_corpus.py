@@ -0,0 +1,116 @@
+import os
+import shutil
+
+import pytest
+
+import lejaren.intake.corpus as corpus
+from lejaren.intake.corpus import find_corpus_files, import_summary, load_corpus
+from lejaren.notation import load_snapshot
+
+
+@pytest.fixture
+def corpus_dir(tmp_path):
+    corpus = tmp_path / "corpus"
+    (corpus / "nested").mkdir(parents=True)
+
+    shutil.copy("tests/test_files/test_treble_middle_c.musicxml", corpus)
+    shutil.copy("tests/test_files/test_treble_middle_c_full_score.mxl", corpus / "nested")
+    (corpus / "broken.musicxml").write_text("<score-partwise><part id='P1'>")
+    (corpus / "notes.txt").write_text("not a score")
+
+    return corpus
+
+
+def test_find_corpus_files(corpus_dir):
+
+    names = [path.name for path in find_corpus_files(corpus_dir)]
+    assert names == [
+        "broken.musicxml",
+        "test_treble_middle_c_full_score.mxl",
+        "test_treble_middle_c.musicxml",
+    ]
+
+    assert [path.name for path in find_corpus_files(corpus_dir / "**" / "*.mxl")] == [
+        "test_treble_middle_c_full_score.mxl"
+    ]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_load_corpus(corpus_dir, tmp_path, processes):
+
+    progress = []
+    snapshot_dir = tmp_path / f"snapshots-{processes}"
+
+    summaries = load_corpus(
+        corpus_dir,
+        processes=processes,
+        snapshot_dir=snapshot_dir,
+        progress=lambda done, total, summary: progress.append((done, total)),
+    )
+
+    assert [done for done, total in progress] == [1, 2, 3]
+    assert {total for done, total in progress} == {3}
+
+    broken, mxl, xml = summaries
+
+    # one bad file does not stop the others
+    assert broken.error.startswith("ValueError: Document is truncated")
+    assert broken.snapshot is None
+
+    for summary in (mxl, xml):
+        assert summary.error is None
+        assert summary.title == "Flow 1"
+        assert (summary.parts, summary.staves, summary.measures, summary.notes) == (1, 1, 1, 1)
+
+        score = load_snapshot(summary.snapshot)
+        assert score.title == "Flow 1"
+
+
+def _crash_on_broken(path, snapshot_dir=None):
+    """import_summary, with the worker dying on the broken file"""
+    if "broken" in str(path):
+        os._exit(1)
+    return import_summary(path, snapshot_dir)
+
+
+def test_load_corpus_worker_dies(corpus_dir, monkeypatch):
+
+    monkeypatch.setattr(corpus, "import_summary", _crash_on_broken)
+
+    progress = []
+    summaries = load_corpus(
+        corpus_dir,
+        processes=2,
+        progress=lambda done, total, summary: progress.append(done),
+    )
+
+    assert progress == [1, 2, 3]
+
+    broken, mxl, xml = summaries
+
+    assert broken.error.startswith("BrokenProcessPool")
+    assert mxl.error is None and mxl.title == "Flow 1"
+    assert xml.error is None and xml.title == "Flow 1"
+
+
+def test_load_corpus_full_pool_after_crash(corpus_dir, monkeypatch):
+
+    calls = []
+
+    def run_pool(paths, indices, processes, snapshot_dir, finish):
+        calls.append((processes, list(indices)))
+        if len(calls) < 3:
+            # the pool dies before any file finishes
+            return list(indices)
+        for index in indices:
+            finish(index, import_summary(paths[index], snapshot_dir))
+        return []
+
+    monkeypatch.setattr(corpus, "_run_pool", run_pool)
+
+    broken, mxl, xml = load_corpus(corpus_dir, processes=2)
+
+    # once the crashing file is found, the rest go back to a full-size pool
+    assert calls == [(2, [0, 1, 2]), (1, [0, 1, 2]), (2, [1, 2])]
+    assert broken.error.startswith("BrokenProcessPool")
+    assert mxl.error is None and xml.error is None
@@ -1,8 +1,17 @@
 from collections import namedtuple
+from decimal import Decimal
+from io import BytesIO
 
 import pytest
+from lxml import etree
 
-from lejaren.intake.import_musicxml import inputParser
+from lejaren.intake.import_musicxml import (
+    PartReader,
+    import_musicxml,
+    inputParser,
+    validate_musicxml,
+)
+from lejaren.notation import Note, Part, Rest, Score
 
 passing_files = [
                   "test.musicxml", 
@@ -29,4 +38,377 @@ def test_file_open_fail():
         get_file_open(test_file)
 
 def test_file_conversion():
-    pass
\ No newline at end of file
+    pass
+
+PIANO_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="4.0">
+  <movement-title>Imported</movement-title>
+  <identification><creator type="composer">Someone</creator></identification>
+  <part-list><score-part id="P1"><part-name>Piano</part-name></score-part></part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes>
+        <divisions>2</divisions>
+        <time><beats>4</beats><beat-type>4</beat-type></time>
+        <staves>2</staves>
+      </attributes>
+      <note><pitch><step>C</step><octave>4</octave></pitch><duration>2</duration><staff>1</staff></note>
+      <note><chord/><pitch><step>E</step><octave>4</octave></pitch><duration>2</duration><staff>1</staff></note>
+      <note><pitch><step>F</step><alter>1</alter><octave>4</octave></pitch><duration>1</duration><staff>1</staff></note>
+      <note><rest/><duration>1</duration><staff>1</staff></note>
+      <note><pitch><step>G</step><octave>4</octave></pitch><duration>4</duration><tie type="start"/><staff>1</staff></note>
+      <backup><duration>8</duration></backup>
+      <forward><duration>4</duration></forward>
+      <note><pitch><step>C</step><octave>3</octave></pitch><duration>4</duration><staff>2</staff></note>
+    </measure>
+    <measure number="2">
+      <attributes><time><beats>3</beats><beat-type>4</beat-type></time></attributes>
+      <note><pitch><step>G</step><octave>4</octave></pitch><duration>2</duration><tie type="stop"/><staff>1</staff></note>
+      <note><grace/><pitch><step>A</step><octave>4</octave></pitch><staff>1</staff></note>
+      <note><pitch><step>B</step><alter>-1</alter><octave>4</octave></pitch><duration>4</duration><staff>1</staff></note>
+      <backup><duration>6</duration></backup>
+      <note><rest measure="yes"/><duration>6</duration><staff>2</staff></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
+def read_entries(xml: bytes):
+    """(type, duration, pitches) of each entry of each staff, before layout"""
+
+    reader = PartReader()
+    for xml_measure in etree.fromstring(xml).iterfind("part/measure"):
+        reader.read_measure(xml_measure)
+
+    return [
+        [
+            (
+                type(entry).__name__,
+                entry.dur,
+                [note.pitch_number for note in getattr(entry, "notes", [entry])]
+                if not isinstance(entry, Rest)
+                else [],
+            )
+            for entry in entries
+        ]
+        for entries in reader.staff_entries()
+    ]
+
+
+def test_import_musicxml(tmp_path):
+
+    upper, lower = read_entries(PIANO_XML)
+
+    assert upper == [
+        ("Chord", 1, [48, 52]),
+        ("Note", Decimal("0.5"), [54]),
+        ("Rest", Decimal("0.5"), []),
+        # tied across the barline
+        ("Note", 3, [55]),
+        ("Note", 2, [58]),
+    ]
+    assert lower == [
+        ("Rest", 2, []),
+        ("Note", 2, [36]),
+        ("Rest", 3, []),
+    ]
+
+    xml_path = tmp_path / "piano.musicxml"
+    xml_path.write_bytes(PIANO_XML)
+
+    score = inputParser(str(xml_path)).create_tree()
+
+    assert score.title == "Imported"
+    assert score.composer == "Someone"
+
+    [part] = score._parts
+    assert part["staff_count"] == 2
+
+    for staff in part["staves"]:
+        assert [measure.time_signature for measure in staff.measures] == [(4, 4), (3, 4)]
+
+
+def test_import_matches_parsed_tree():
+
+    streamed = import_musicxml(BytesIO(PIANO_XML))
+    parsed = Score(etree.ElementTree(etree.fromstring(PIANO_XML)))
+
+    assert (parsed.title, parsed.composer) == (streamed.title, streamed.composer)
+    assert len(parsed._parts[0]["staves"]) == 2
+
+    for streamed_staff, parsed_staff in zip(
+        streamed._parts[0]["staves"], parsed._parts[0]["staves"]
+    ):
+        assert [
+            [(type(note), note.dur) for beat in measure.beats for note in beat.notes]
+            for measure in streamed_staff.measures
+        ] == [
+            [(type(note), note.dur) for beat in measure.beats for note in beat.notes]
+            for measure in parsed_staff.measures
+        ]
+
+
+def test_import_exported_score(tmp_path):
+
+    time_sig = [(4, 4), (3, 4)]
+    notes = [Note(1, 4, 0), Note(2.5, 4, 2), Note(0.5, 4, 4), Rest(1), Note(3, 4, 5)]
+
+    xml_path = tmp_path / "exported.musicxml"
+    Score([Part(notes, time_sig)], title="Round trip").convert_to_xml(xml_path)
+
+    [staff] = read_entries(xml_path.read_bytes())
+
+    assert staff[:5] == [
+        ("Note", 1, [48]),
+        ("Note", Decimal("2.5"), [50]),
+        ("Note", Decimal("0.5"), [52]),
+        ("Rest", 1, []),
+        ("Note", 3, [53]),
+    ]
+
+    assert import_musicxml(
+        "tests/test_files/test_treble_middle_c_full_score.musicxml"
+    ).title == "Flow 1"
+
+
+@pytest.mark.parametrize(
+    "mxl_name, xml_name",
+    [
+        ("test_treble_middle_c.mxl", "test_treble_middle_c.musicxml"),
+        (
+            "test_treble_middle_c_full_score.mxl",
+            "test_treble_middle_c_full_score.musicxml",
+        ),
+    ],
+)
+def test_import_mxl(mxl_name, xml_name):
+
+    def entries(score):
+        return [
+            [
+                (type(note), note.dur)
+                for measure in staff.measures
+                for beat in measure.beats
+                for note in beat.notes
+            ]
+            for part in score._parts
+            for staff in part["staves"]
+        ]
+
+    from_mxl = inputParser("tests/test_files/" + mxl_name).create_tree()
+    from_xml = import_musicxml("tests/test_files/" + xml_name)
+
+    assert from_mxl.title == from_xml.title
+    assert entries(from_mxl) == entries(from_xml)
+
+    with open("tests/test_files/" + mxl_name, "rb") as mxl_file:
+        assert entries(import_musicxml(mxl_file)) == entries(from_xml)
+
+
+def test_import_exported_mxl(tmp_path):
+
+    mxl_path = tmp_path / "exported.mxl"
+    part = Part([Note(2, 4, 0), Note(2, 4, 7)], [(4, 4)])
+    Score([part], title="Zipped").convert_to_mxl(mxl_path)
+
+    score = import_musicxml(mxl_path)
+
+    assert score.title == "Zipped"
+    [part] = score._parts
+    assert [note.pc for beat in part["staves"][0].measures[0].beats for note in beat.notes] == [0, 7]
+
+
+def test_validate_musicxml(tmp_path):
+
+    parser = inputParser("tests/test_files/test_treble_middle_c.musicxml")
+    assert parser.validate() == "score-partwise"
+    assert validate_musicxml("tests/test_files/test_treble_middle_c.mxl") == "score-partwise"
+
+    # file objects are read from where they are, and left there
+    document = BytesIO(b"skipped" + PIANO_XML)
+    document.seek(7)
+    assert validate_musicxml(document) == "score-partwise"
+    assert document.tell() == 7
+
+    rejected = {
+        "truncated.musicxml": PIANO_XML[: len(PIANO_XML) // 2],
+        "opus.xml": b'<?xml version="1.0"?>\n<opus><title>Works</title></opus>\n',
+        "empty.xml": b"",
+        "text.xml": b"not xml at all",
+    }
+
+    for name, content in rejected.items():
+        path = tmp_path / name
+        path.write_bytes(content)
+        with pytest.raises(ValueError):
+            validate_musicxml(str(path))
+        with pytest.raises(ValueError):
+            import_musicxml(str(path))
+
+
+def test_import_timewise():
+
+    # PIANO_XML, with the part and measure elements swapped
+    partwise = etree.fromstring(PIANO_XML)
+    timewise = etree.Element("score-timewise", version="4.0")
+
+    for xml_element in partwise:
+        if xml_element.tag != "part":
+            timewise.append(xml_element)
+
+    for xml_part in partwise.iterfind("part"):
+        for measure_idx, xml_measure in enumerate(xml_part.iterfind("measure")):
+            xml_timewise_measure = timewise.find(f"measure[@number='{measure_idx + 1}']")
+            if xml_timewise_measure is None:
+                xml_timewise_measure = etree.SubElement(
+                    timewise, "measure", number=str(measure_idx + 1)
+                )
+            xml_timewise_part = etree.SubElement(
+                xml_timewise_measure, "part", id=xml_part.get("id")
+            )
+            xml_timewise_part.extend(list(xml_measure))
+
+    timewise_xml = etree.tostring(timewise, xml_declaration=True, encoding="UTF-8")
+
+    assert validate_musicxml(BytesIO(timewise_xml)) == "score-timewise"
+
+    for score in (
+        import_musicxml(BytesIO(timewise_xml)),
+        Score(etree.ElementTree(etree.fromstring(timewise_xml))),
+    ):
+        assert score.title == "Imported"
+        [part] = score._parts
+        upper, lower = part["staves"]
+        assert [measure.time_signature for measure in upper.measures] == [(4, 4), (3, 4)]
+        assert [measure.time_signature for measure in lower.measures] == [(4, 4), (3, 4)]
+
+
+def test_import_from_pipe():
+
+    import os
+    import threading
+
+    def piped(path):
+        """A read end of a pipe that path's content is written into"""
+        read_fd, write_fd = os.pipe()
+
+        def write():
+            with open(path, "rb") as document, os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(document.read())
+
+        threading.Thread(target=write, daemon=True).start()
+        return os.fdopen(read_fd, "rb")
+
+    from_file = import_musicxml("tests/test_files/test_treble_middle_c.musicxml")
+
+    for name in ("test_treble_middle_c.musicxml", "test_treble_middle_c.mxl"):
+        with piped("tests/test_files/" + name) as pipe:
+            assert not pipe.seekable()
+            score = import_musicxml(pipe)
+
+        assert score.title == from_file.title
+        assert [
+            (type(note), note.dur)
+            for beat in score._parts[0]["staves"][0].measures[0].beats
+            for note in beat.notes
+        ] == [
+            (type(note), note.dur)
+            for beat in from_file._parts[0]["staves"][0].measures[0].beats
+            for note in beat.notes
+        ]
+
+
+PICKUP_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="4.0">
+  <part-list><score-part id="P1"><part-name>Voice</part-name></score-part></part-list>
+  <part id="P1">
+    <measure number="0" implicit="yes">
+      <attributes>
+        <divisions>2</divisions>
+        <time><beats>3</beats><beat-type>4</beat-type></time>
+      </attributes>
+      <note><pitch><step>G</step><octave>4</octave></pitch><duration>1</duration></note>
+      <note><pitch><step>A</step><octave>4</octave></pitch><duration>1</duration></note>
+    </measure>
+    <measure number="1">
+      <note><pitch><step>C</step><octave>5</octave></pitch><duration>4</duration></note>
+      <note><pitch><step>B</step><octave>4</octave></pitch><duration>2</duration></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
+def test_import_pickup_measure():
+
+    from lejaren.intake.import_notes import extract_note_arrays
+
+    [staff] = read_entries(PICKUP_XML)
+
+    # the pickup ends on the barline
+    assert staff == [
+        ("Rest", 2, []),
+        ("Note", Decimal("0.5"), [55]),
+        ("Note", Decimal("0.5"), [57]),
+        ("Note", 2, [60]),
+        ("Note", 1, [59]),
+    ]
+
+    score = import_musicxml(BytesIO(PICKUP_XML))
+    [part] = score._parts
+    first, second = part["staves"][0].measures
+
+    assert isinstance(first.beats[0].notes[0], Rest)
+    assert [note.pitch_number for beat in second.beats for note in beat.notes] == [60, 59]
+
+    # the note arrays keep the pickup's own length, so their onsets are the
+    # Score's less the lead in rest
+    notes = extract_note_arrays(BytesIO(PICKUP_XML))
+    assert notes.onset.tolist() == [0, 0.5, 1, 3]
+
+
+TWO_VOICE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="4.0">
+  <part-list><score-part id="P1"><part-name>Piano</part-name></score-part></part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes>
+        <divisions>1</divisions>
+        <time><beats>2</beats><beat-type>4</beat-type></time>
+      </attributes>
+      <note><pitch><step>E</step><octave>5</octave></pitch><duration>1</duration><voice>1</voice></note>
+      <note><pitch><step>D</step><octave>5</octave></pitch><duration>1</duration><voice>1</voice></note>
+      <backup><duration>2</duration></backup>
+      <note><pitch><step>C</step><octave>4</octave></pitch><duration>2</duration><voice>2</voice></note>
+      <note><chord/><pitch><step>G</step><octave>4</octave></pitch><duration>2</duration><voice>2</voice></note>
+      <backup><duration>2</duration></backup>
+      <note><rest/><duration>2</duration><voice>3</voice></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
+def test_import_second_voice(caplog):
+
+    from lejaren.intake.roundtrip import skipped_notes
+
+    reader = PartReader()
+    reader.read_measure(etree.fromstring(TWO_VOICE_XML).find("part/measure"))
+
+    # the first voice is kept whole, and the chord of the second is not
+    # added to it
+    [staff] = reader.staff_entries()
+    assert [(type(entry), entry.pitch_number) for entry in staff] == [
+        (Note, 64),
+        (Note, 62),
+    ]
+    assert reader.skipped_notes == 2
+
+    with caplog.at_level("WARNING", logger="default"):
+        import_musicxml(BytesIO(TWO_VOICE_XML))
+    assert "Left out 2 notes" in caplog.text
+
+    assert skipped_notes(BytesIO(TWO_VOICE_XML)) == 2
+    assert skipped_notes("tests/test_files/test_treble_middle_c.mxl") == 0
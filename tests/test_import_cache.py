@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+import lejaren.intake.cache as import_cache
+from lejaren.intake.cache import ImportCache, source_key
+from lejaren.intake.import_musicxml import inputParser
+from lejaren.intake.import_notes import noteIntake
+
+
+def test_import_cache(tmp_path, monkeypatch):
+
+    cache = ImportCache(tmp_path / "cache")
+    xml_path = "tests/test_files/test_treble_middle_c.musicxml"
+    mxl_path = "tests/test_files/test_treble_middle_c.mxl"
+
+    imported = inputParser(xml_path, cache=cache).create_tree()
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    def no_import(*args):
+        raise AssertionError("cache hit parsed the file")
+
+    monkeypatch.setattr(import_cache, "import_musicxml", no_import)
+
+    cached = inputParser(xml_path, cache=cache).create_tree()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    imported.convert_to_xml(tmp_path / "imported.musicxml")
+    cached.convert_to_xml(tmp_path / "cached.musicxml")
+    assert (tmp_path / "imported.musicxml").read_bytes() == (
+        tmp_path / "cached.musicxml"
+    ).read_bytes()
+
+    # other content is another key
+    assert source_key(mxl_path) != source_key(xml_path)
+    with pytest.raises(AssertionError):
+        noteIntake(import_file=mxl_path, cache=cache).parser.create_tree()
+
+
+def test_import_cache_versions(tmp_path, monkeypatch):
+
+    cache = ImportCache(tmp_path / "cache")
+    xml_path = "tests/test_files/test_treble_middle_c.musicxml"
+
+    cache.import_score(xml_path)
+    monkeypatch.setattr(
+        import_cache, "IMPORTER_VERSION", import_cache.IMPORTER_VERSION + 1
+    )
+    cache.import_score(xml_path)
+
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert len(list(cache.cache_dir.glob("*.snap"))) == 2
+
+
+def test_import_cache_eviction(tmp_path):
+
+    cache = ImportCache(tmp_path / "cache")
+    paths = [
+        "tests/test_files/test_treble_middle_c.musicxml",
+        "tests/test_files/test_treble_middle_c.mxl",
+        "tests/test_files/test_treble_middle_c_full_score.musicxml",
+    ]
+
+    for age, path in enumerate(paths):
+        cache.import_score(path)
+        entry = cache._entry_path(source_key(path))
+        os.utime(entry, (age, age))
+
+    # using the oldest entry makes the second one least recently used
+    assert cache.get(source_key(paths[0])) is not None
+
+    entry_size = cache._entry_path(source_key(paths[0])).stat().st_size
+    cache.max_bytes = entry_size * 2 + entry_size // 2
+    cache.evict()
+
+    assert cache.get(source_key(paths[1])) is None
+    assert cache.get(source_key(paths[0])) is not None
+    assert cache.get(source_key(paths[2])) is not None
+
+    cache.clear()
+    assert not list(cache.cache_dir.iterdir())
+
+
+@pytest.mark.parametrize("damage", ["empty", "header", "part table", "records"])
+def test_import_cache_damaged_entry(tmp_path, damage):
+
+    cache = ImportCache(tmp_path / "cache")
+    xml_path = "tests/test_files/test_treble_middle_c.musicxml"
+    key = source_key(xml_path)
+
+    cache.import_score(xml_path)
+    entry = cache._entry_path(key)
+    data = bytearray(entry.read_bytes())
+
+    if damage == "empty":
+        data = b""
+    elif damage == "header":
+        data = data[:10]
+    elif damage == "part table":
+        data = data[:40]
+    else:
+        # the staff records past the header and part table
+        data[60:] = b"\xff" * (len(data) - 60)
+    entry.write_bytes(data)
+
+    # a damaged entry is a miss, not an error, and is read again
+    assert cache.get(key) is None
+    assert not entry.exists()
+    assert cache.import_score(xml_path) is not None
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert cache.get(key) is not None
@@ -1,6 +1,9 @@
+from io import BytesIO
+
+import numpy as np
 import pytest
 
-from lejaren.intake.import_notes import noteIntake
+from lejaren.intake.import_notes import extract_note_arrays, noteIntake
 
 def test_note_create(sample_files):
     for file in sample_files:
@@ -14,4 +17,156 @@ def test_note_pitch():
     pass
 
 def test_set_ticks():
-    pass
\ No newline at end of file
+    pass
+
+NOTES_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="4.0">
+  <part-list><score-part id="P1"/><score-part id="P2"/></part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes><divisions>2</divisions><staves>2</staves></attributes>
+      <note><pitch><step>C</step><octave>4</octave></pitch><duration>2</duration><staff>1</staff></note>
+      <note><chord/><pitch><step>E</step><alter>-1</alter><octave>4</octave></pitch><duration>2</duration><staff>1</staff></note>
+      <note><rest/><duration>2</duration><staff>1</staff></note>
+      <note><pitch><step>G</step><octave>4</octave></pitch><duration>4</duration><tie type="start"/><staff>1</staff></note>
+      <backup><duration>8</duration></backup>
+      <forward><duration>4</duration></forward>
+      <note><grace/><pitch><step>D</step><octave>3</octave></pitch><staff>2</staff></note>
+      <note><pitch><step>C</step><octave>3</octave></pitch><duration>4</duration><staff>2</staff></note>
+    </measure>
+    <measure number="2">
+      <attributes><divisions>4</divisions></attributes>
+      <note><pitch><step>G</step><octave>4</octave></pitch><duration>2</duration><tie type="stop"/><staff>1</staff></note>
+      <note><pitch><step>F</step><alter>1</alter><octave>4</octave></pitch><duration>6</duration><staff>1</staff></note>
+    </measure>
+  </part>
+  <part id="P2">
+    <measure number="1">
+      <note><unpitched><display-step>E</display-step><display-octave>4</display-octave></unpitched><duration>1</duration></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
+def test_extract_notes():
+
+    notes = extract_note_arrays(BytesIO(NOTES_XML))
+
+    assert notes.onset.tolist() == [0, 0, 2, 2, 4, 4.5, 0]
+    assert notes.duration.tolist() == [1, 1, 2, 2, 0.5, 1.5, 1]
+    assert notes.pitch.tolist() == [60, 63, 67, 48, 67, 66, 64]
+    assert notes.part.tolist() == [0, 0, 0, 0, 0, 0, 1]
+    assert notes.staff.tolist() == [1, 1, 1, 2, 1, 1, 1]
+    assert notes.measure.tolist() == [0, 0, 0, 0, 1, 1, 0]
+    assert notes.pitch.dtype == np.int16
+
+    merged = extract_note_arrays(BytesIO(NOTES_XML), merge_ties=True)
+
+    assert merged.onset.tolist() == [0, 0, 2, 2, 4.5, 0]
+    assert merged.duration.tolist() == [1, 1, 2.5, 2, 1.5, 1]
+
+
+
+def _timewise(partwise: bytes) -> bytes:
+    """The partwise document regrouped by measure, parts in the same order"""
+
+    from lxml import etree
+
+    root = etree.fromstring(partwise)
+    timewise = etree.Element("score-timewise", version=root.get("version"))
+    timewise.append(root.find("part-list"))
+
+    xml_measures = {}
+    for xml_part in root.findall("part"):
+        for xml_measure in xml_part.findall("measure"):
+            number = xml_measure.get("number")
+            if number not in xml_measures:
+                xml_measures[number] = etree.SubElement(
+                    timewise, "measure", number=number
+                )
+            xml_timewise_part = etree.SubElement(
+                xml_measures[number], "part", id=xml_part.get("id")
+            )
+            xml_timewise_part.extend(list(xml_measure))
+
+    return etree.tostring(timewise, xml_declaration=True, encoding="UTF-8")
+
+
+def test_extract_notes_timewise():
+
+    partwise = extract_note_arrays(BytesIO(NOTES_XML), merge_ties=True)
+    timewise = extract_note_arrays(BytesIO(_timewise(NOTES_XML)), merge_ties=True)
+
+    # the same notes, in measure order rather than part order
+    order = np.lexsort((partwise.part, partwise.measure))
+
+    for field in partwise._fields:
+        assert getattr(timewise, field).tolist() == getattr(partwise, field)[order].tolist()
+
+
+def test_extract_notes_validates():
+
+    with pytest.raises(ValueError):
+        extract_note_arrays(BytesIO(NOTES_XML[:-40]))
+
+    with pytest.raises(ValueError):
+        extract_note_arrays(BytesIO(b"<?xml version='1.0'?><opus/>"))
+
+
+def test_extract_notes_from_file():
+
+    for name in ("test_treble_middle_c.musicxml", "test_treble_middle_c.mxl"):
+        notes = noteIntake(import_file="tests/test_files/" + name).extract_notes()
+        assert notes.onset.tolist() == [0]
+        assert notes.duration.tolist() == [4]
+        assert notes.pitch.tolist() == [60]
+
+
+def test_extract_notes_from_pipe():
+
+    import os
+    import threading
+
+    for name in ("test_treble_middle_c.musicxml", "test_treble_middle_c.mxl"):
+        read_fd, write_fd = os.pipe()
+
+        def write(path=f"tests/test_files/{name}", write_fd=write_fd):
+            with open(path, "rb") as document, os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(document.read())
+
+        threading.Thread(target=write, daemon=True).start()
+
+        with os.fdopen(read_fd, "rb") as pipe:
+            notes = extract_note_arrays(pipe)
+
+        assert notes.pitch.tolist() == [60]
+        assert notes.duration.tolist() == [4]
+
+
+def test_extract_notes_timewise_missing_part():
+
+    def measure(number, *parts):
+        return f'<measure number="{number}">' + "".join(
+            f'<part id="{part_id}"><note><pitch><step>{step}</step><octave>4</octave>'
+            f"</pitch><duration>4</duration></note></part>"
+            for part_id, step in parts
+        ) + "</measure>"
+
+    # P2 is missing from measure 2, and P3 starts in measure 3
+    timewise = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<score-timewise version="4.0">'
+        "<part-list>"
+        + "".join(f'<score-part id="P{idx}"/>' for idx in (1, 2, 3))
+        + "</part-list>"
+        + measure(1, ("P1", "C"), ("P2", "E"))
+        + measure(2, ("P1", "D"))
+        + measure(3, ("P1", "E"), ("P2", "G"), ("P3", "B"))
+        + "</score-timewise>"
+    ).encode()
+
+    notes = extract_note_arrays(BytesIO(timewise))
+
+    assert notes.part.tolist() == [0, 1, 0, 0, 1, 2]
+    assert notes.onset.tolist() == [0, 0, 4, 8, 8, 8]
+    assert notes.measure.tolist() == [0, 0, 1, 2, 2, 2]
@@ -0,0 +1,112 @@
+from lejaren.intake.import_musicxml import import_musicxml, inputParser
+from lejaren.intake.lazy_score import LazyScore
+from lejaren.notation import Note, Part, Score
+
+
+def measure_contents(staff):
+    return [
+        [(type(note).__name__, note.dur) for beat in measure.beats for note in beat.notes]
+        for measure in staff.measures
+    ]
+
+
+def make_score():
+    return Score(
+        [
+            Part([Note(1, 4, x % 12) for x in range(20)], [(4, 4), (3, 4)]),
+            [
+                Part([Note(2, 5, 0), Note(2, 5, 4)] * 4, [(4, 4), (3, 4)]),
+                Part([Note(4, 2, 0)] * 4, [(4, 4), (3, 4)]),
+            ],
+        ],
+        title="Lazy",
+        composer="Someone",
+    )
+
+
+def test_lazy_score_index(tmp_path):
+
+    xml_path = tmp_path / "lazy.musicxml"
+    make_score().convert_to_xml(xml_path)
+
+    full = import_musicxml(str(xml_path))
+
+    with LazyScore(str(xml_path)) as lazy:
+        assert (lazy.title, lazy.composer) == ("Lazy", "Someone")
+        assert lazy.part_ids == ["P1", "P2"]
+        assert lazy.part_count == 2
+        assert lazy.measure_count(0) == full._measure_count
+
+        # a whole part parses the same as a full import
+        assert measure_contents(lazy.load_part(0)) == measure_contents(
+            full._parts[0]["staves"][0]
+        )
+
+        upper, lower = lazy.load_part(1)
+        assert measure_contents(upper) == measure_contents(full._parts[1]["staves"][0])
+        assert measure_contents(lower) == measure_contents(full._parts[1]["staves"][1])
+
+        # a range starts with the time signature of its first measure
+        excerpt = lazy.load_part(0, 1, 3)
+        assert [measure.time_signature for measure in excerpt.measures] == [(3, 4), (4, 4)]
+        assert measure_contents(excerpt) == measure_contents(full._parts[0]["staves"][0])[1:3]
+
+        score = lazy.to_score([1], stop=2)
+        assert score.title == "Lazy"
+        assert score._measure_count == 2
+        assert score._parts[0]["staff_count"] == 2
+
+
+def test_lazy_score_mxl():
+
+    lazy = inputParser("tests/test_files/test_treble_middle_c.mxl").create_lazy_score()
+    full = import_musicxml("tests/test_files/test_treble_middle_c.musicxml")
+
+    assert lazy.title == full.title
+    assert measure_contents(lazy.load_part(0)) == measure_contents(
+        full._parts[0]["staves"][0]
+    )
+
+
+SHORT_MEASURE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="4.0">
+  <part-list><score-part id="P1"><part-name>Flute</part-name></score-part></part-list>
+  <!-- <part id="P9"><measure number="1"/></part> -->
+  <part id="P1">
+    <measure number="1">
+      <attributes>
+        <divisions>1</divisions>
+        <time><beats>2</beats><beat-type>4</beat-type></time>
+      </attributes>
+      <note><pitch><step>C</step><octave>5</octave></pitch><duration>2</duration></note>
+    </measure>
+    <!-- <measure number="2a"><note><rest/><duration>2</duration></note></measure> -->
+    <measure number="2">
+      <note><pitch><step>D</step><octave>5</octave></pitch><duration>1</duration></note>
+    </measure>
+    <measure number="3">
+      <direction><direction-type><words><![CDATA[<measure number="4">]]></words></direction-type></direction>
+      <note><pitch><step>E</step><octave>5</octave></pitch><duration>2</duration></note>
+    </measure>
+  </part>
+</score-partwise>
+"""
+
+
+def test_lazy_score_short_measure(tmp_path):
+
+    xml_path = tmp_path / "short.musicxml"
+    xml_path.write_bytes(SHORT_MEASURE_XML)
+
+    with LazyScore(str(xml_path)) as lazy:
+        # tags inside comments and CDATA are not indexed
+        assert lazy.part_ids == ["P1"]
+        assert lazy.measure_count(0) == 3
+
+        # a short measure later in the score is not a pickup, so it is
+        # filled out after its notes, as in a full import
+        excerpt = lazy.load_part(0, 1)
+        assert measure_contents(excerpt)[0] == [("Note", 1), ("Rest", 1)]
+        assert measure_contents(excerpt) == measure_contents(
+            import_musicxml(str(xml_path))._parts[0]["staves"][0]
+        )[1:]
@@ -1,6 +1,7 @@
+from decimal import Decimal
 import pytest
 
-from lejaren.notation import Note
+from lejaren.notation import Note, Rest
 
 TEST_DURATION, TEST_OCTAVE, TEST_PITCH_CLASS = 10, 8, 2
 
@@ -137,4 +138,81 @@ def test_convert_to_rest():
 
     note_to_convert = Note(4,4,0)
 
-    rest = note_to_convert.make_rest()
\ No newline at end of file
+    rest = note_to_convert.make_rest()
+
+def test_pitch_number():
+
+    note = Note(1, 4, 0)
+    assert note.pitch_number == 48
+
+    note.change_pitch(5, 0)
+    assert note.pitch_number == 60
+
+    note.change_pitch(5, 11)
+    assert (note.octave, note.pc, note.pitch_number) == (5, 11, 71)
+
+    # pitch classes past 11 move up an octave, as on init
+    note.change_pitch(5, 13)
+    assert (note.octave, note.pc, note.pitch_number) == (6, 1, 73)
+    assert note.step_name == "C"
+
+    note.change_duration(1.5)
+    assert note.dur_key == (3, 2)
+
+    assert Note(1, 4, 13).pitch_number == Note(1, 5, 1).pitch_number
+
+
+def test_note_hashing():
+
+    note_a = Note(1, 4, 0)
+    note_b = Note(1.0, 4, 0)
+    note_c = Note(2, 4, 0)
+
+    assert note_a == note_b
+    assert hash(note_a) == hash(note_b)
+    assert len({note_a, note_b, note_c}) == 2
+
+    counts = {note_a: 1}
+    assert counts[note_b] == 1
+
+    assert note_a != Rest(1)
+
+
+def test_rich_comparisons():
+
+    low_long = Note(4, 3, 11)
+    high_short = Note(1, 4, 0)
+
+    # pitch
+    assert high_short > low_long
+    assert low_long < high_short
+    assert sorted([high_short, low_long]) == [low_long, high_short]
+
+    assert high_short >= low_long
+    assert low_long <= high_short
+    assert not (low_long >= high_short)
+
+    # the same pitch is ordered by duration
+    long_c = Note(4, 4, 0)
+    assert high_short < long_c
+    assert high_short <= long_c
+    assert long_c >= high_short
+    assert sorted([long_c, low_long, high_short]) == [low_long, high_short, long_c]
+
+    # durations compare by value, not by their integer ratios
+    assert Note(1.5, 4, 0) < Note(2, 4, 0)
+    assert Note(0.5, 4, 0) > Note(0.25, 4, 0)
+
+
+def test_comparisons_are_reflexive():
+
+    note = Note(1.5, 4, 7)
+
+    assert note <= note
+    assert note >= note
+    assert not (note < note)
+    assert not (note > note)
+
+    # equal notes compare the same way, however their durations are written
+    assert note <= Note(Decimal("1.50"), 4, 7)
+    assert note >= Note(Decimal("1.50"), 4, 7)
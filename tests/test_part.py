@@ -580,3 +580,153 @@ def test_chord_split_simple():
 
     assert len(test_chord_part.measures[0].beats) == 1
     assert len(test_chord_part.measures[1].beats) == 1
+
+
+def _layout(part):
+    layout = []
+    for measure in part.measures:
+        beats = []
+        for beat in measure.beats:
+            for note in beat.notes:
+                beats.append(
+                    (
+                        type(note).__name__,
+                        note.dur,
+                        getattr(note, "octave", None),
+                        getattr(note, "pc", None),
+                        getattr(note, "tie_start", False),
+                        getattr(note, "tie_end", False),
+                        getattr(note, "beam_start", False),
+                        getattr(note, "beam_continue", False),
+                    )
+                )
+        layout.append((tuple(measure.time_signature), measure.measure_factor, beats))
+    return layout
+
+
+def _fj_notes(durs=fj_durs):
+    return [Note(dur, 4, pitch) for dur, pitch in zip(durs, fj_pitches)]
+
+
+def test_replace_note_keeps_untouched_measures():
+
+    fj_part = Part(_fj_notes(), [(4, 4)])
+    old_measures = list(fj_part.measures)
+
+    fj_part.replace_notes(16, [Note(1, 4, 9), Note(1, 4, 11)])
+
+    expected_durs = list(fj_durs)
+    expected_durs[8:9] = [1, 1]
+    expected_pitches = list(fj_pitches)
+    expected_pitches[8:9] = [9, 11]
+    expected = Part(
+        [Note(dur, 4, pitch) for dur, pitch in zip(expected_durs, expected_pitches)],
+        [(4, 4)],
+    )
+
+    assert _layout(fj_part) == _layout(expected)
+    assert fj_part.measure_offsets == [4 * x for x in range(len(old_measures) + 1)]
+
+    for idx, measure in enumerate(fj_part.measures):
+        if idx == 4:
+            assert measure is not old_measures[idx]
+        else:
+            assert measure is old_measures[idx]
+
+
+def test_insert_and_delete_ripple():
+
+    time_sig = [(4, 4), (3, 4)]
+
+    fj_part = Part(_fj_notes(), time_sig)
+    fj_part.insert_notes(6, [Note(3, 5, 0)])
+    fj_part.delete_notes(21, 2)
+
+    edited = _fj_notes()
+    edited.insert(3, Note(3, 5, 0))
+    del edited[10:12]
+    expected = Part(edited, time_sig)
+
+    assert _layout(fj_part) == _layout(expected)
+    assert fj_part.measure_offsets == expected.measure_offsets
+
+
+def test_edit_at_part_end():
+
+    test_part = Part([Note(4, 4, 0), Note(2, 4, 2)], [(4, 4)])
+
+    test_part.insert_notes(6, [Note(4, 4, 4)])
+    assert _layout(test_part) == _layout(
+        Part([Note(4, 4, 0), Note(2, 4, 2), Note(4, 4, 4)], [(4, 4)])
+    )
+
+    test_part.delete_notes(4, 2)
+    assert _layout(test_part) == _layout(Part([Note(4, 4, 0)], [(4, 4)]))
+    assert test_part.measure_offsets == [0, 4]
+
+
+def test_edit_subdivided_notes():
+
+    fj_halved = [dur * 0.5 for dur in fj_durs]
+
+    fj_part = Part(_fj_notes(fj_halved), [(4, 4)])
+    fj_part.replace_notes(16, [Note(0.25, 4, 1), Note(0.25, 4, 3)])
+
+    edited = _fj_notes(fj_halved)
+    edited[14:15] = [Note(0.25, 4, 1), Note(0.25, 4, 3)]
+
+    assert _layout(fj_part) == _layout(Part(edited, [(4, 4)]))
+
+
+def test_edit_offset_must_start_a_note():
+
+    fj_part = Part(_fj_notes(), [(4, 4)])
+
+    with pytest.raises(ValueError):
+        fj_part.insert_notes(1, [Note(1, 4, 0)])
+
+
+def test_events_at_and_between():
+
+    fj_halved = [dur * 0.5 for dur in fj_durs]
+    fj_part = Part(_fj_notes(fj_halved), [(4, 4)])
+
+    # fj_halved[14:18] are the four eighth notes starting measure 5
+    sounding = fj_part.events_at(16.7)
+    assert len(sounding) == 1
+    assert sounding[0].offset == 16.5
+    assert sounding[0].dur == 0.5
+    assert sounding[0].measure_index == 4
+    assert sounding[0].entry.pc == fj_pitches[15]
+
+    # offsets on a note boundary belong to the note starting there
+    assert fj_part.events_at(16.5)[0].entry.pc == fj_pitches[15]
+
+    window = fj_part.events_between(15.5, 17)
+    assert [event.offset for event in window] == [14, 16, 16.5]
+    assert [event.entry.pc for event in window] == fj_pitches[13:16]
+
+    assert fj_part.events_between(100, 110) == []
+
+
+def test_measure_queries():
+
+    fj_part = Part(_fj_notes(), [(4, 4), (3, 4)])
+
+    assert fj_part.measure_offsets[:4] == [0, 4, 7, 11]
+    assert fj_part.measure_at(0) == 0
+    assert fj_part.measure_at(6.5) == 1
+    assert fj_part.measure_at(7) == 2
+    assert fj_part.measures_between(5, 11) == fj_part.measures[1:3]
+
+    with pytest.raises(IndexError):
+        fj_part.measure_at(fj_part.measure_offsets[-1])
+
+
+def test_offset_index_follows_edits():
+
+    fj_part = Part(_fj_notes(), [(4, 4)])
+    assert fj_part.events_at(0)[0].entry.pc == 0
+
+    fj_part.replace_notes(0, [Note(2, 5, 11)])
+    assert fj_part.events_at(0)[0].entry.pc == 11
@@ -1,6 +1,7 @@
 import pytest
 
 from lejaren.analysis import PitchClassSet
+from lejaren.analysis.PitchClassSet import FORTE_PRIME_FORMS
 
 
 def test_object_init():
@@ -153,3 +154,74 @@ def test_compliment():
 
     assert compliment_pcs.ordered_list == [2, 3, 4, 5, 6, 8, 9, 10, 11]
     assert compliment_pcs.normal_order == [0, 1, 2, 3, 4, 6, 7, 8, 9]
+
+
+def test_normal_form():
+
+    assert PitchClassSet([7, 0, 4]).normal_form == [0, 4, 7]
+    assert PitchClassSet([2, 7, 11]).normal_form == [7, 11, 2]
+
+    # equal spans fall back to the smaller intervals from the left
+    assert PitchClassSet([0, 4, 7, 11]).normal_form == [11, 0, 4, 7]
+
+
+def test_prime_form_dense_sets():
+
+    # sets whose smallest span starts on the highest pitch class
+    test_pcs = PitchClassSet([1, 3, 4, 6, 7, 8, 9, 10, 11])
+
+    assert test_pcs.normal_order == [0, 1, 2, 3, 4, 5, 7, 8, 10]
+    assert test_pcs.prime_form == test_pcs.normal_order
+
+
+def test_forte_name_and_interval_vector():
+
+    major_triad = PitchClassSet([0, 4, 7])
+
+    assert major_triad.forte_name == "3-11"
+    assert major_triad.interval_vector == (0, 0, 1, 1, 1, 0)
+
+    assert PitchClassSet([0, 2, 4, 5, 7, 9, 11]).forte_name == "7-35"
+
+    # Z-related sets share an interval vector
+    all_interval = PitchClassSet([0, 1, 4, 6])
+    other_all_interval = PitchClassSet([0, 1, 3, 7])
+
+    assert all_interval.forte_name == "4-Z15"
+    assert other_all_interval.forte_name == "4-Z29"
+    assert all_interval.interval_vector == other_all_interval.interval_vector
+
+
+def test_empty_and_full_sets():
+
+    empty_pcs = PitchClassSet([])
+
+    assert empty_pcs.cardinality == 0
+    assert empty_pcs.normal_order == []
+    assert empty_pcs.forte_name == "0-1"
+
+    full_pcs = empty_pcs.get_compliment()
+
+    assert full_pcs.cardinality == 12
+    assert full_pcs.forte_name == "12-1"
+
+
+def test_from_mask():
+
+    test_pcs = PitchClassSet.from_mask(0b10010001)
+
+    assert test_pcs.ordered_list == [0, 4, 7]
+    assert test_pcs.mask == PitchClassSet([7, 4, 0, 12]).mask
+
+
+def test_forte_prime_forms_are_prime():
+
+    # the table and the prime form algorithm use the same tie-breaks
+    for name, prime_form in FORTE_PRIME_FORMS.items():
+        pitch_class_set = PitchClassSet(prime_form)
+        assert tuple(pitch_class_set.prime_form) == prime_form, name
+        assert pitch_class_set.forte_name == name
+
+    # Forte's 5-20, where Rahn's rule gives (0, 1, 5, 6, 8)
+    assert PitchClassSet([0, 1, 5, 6, 8]).prime_form == [0, 1, 3, 7, 8]
+    assert PitchClassSet([0, 1, 5, 6, 8]).forte_name == "5-20"
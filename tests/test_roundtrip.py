@@ -0,0 +1,120 @@
+import re
+from decimal import Decimal
+
+import pytest
+
+from lejaren.intake.import_musicxml import import_musicxml
+from lejaren.intake.roundtrip import (
+    SoundingNote,
+    note_sequences,
+    sequence_differences,
+)
+from lejaren.notation import Chord, Note, Part, Rest, Score
+
+seed_files = [
+    "test_score_fj.musicxml",
+    "test_score_fj_34.musicxml",
+    "test_score_fj_subdiv.xml",
+    "test_score_long.xml",
+]
+
+
+def make_round_trip_score():
+    """Chords, ties across beats and barlines, dotted durations and a two
+    staff part whose staves divide measures differently"""
+
+    melody = Part(
+        [
+            Note(2.25, 4, 9),
+            Note(0.5, 4, 2),
+            Note(0.25, 4, 7),
+            Chord([Note(1.5, 4, 0), Note(1.5, 4, 0), Note(1.5, 4, 7)]),
+            Note(0.75, 4, 4),
+            Rest(0.75),
+            Note(2, 5, 0),
+        ],
+        [(3, 4), (4, 4)],
+    )
+    upper = Part(
+        [
+            Note(0.75, 4, 2),
+            Note(0.25, 4, 4),
+            Chord([Note(1.5, 4, 0), Note(1.5, 4, 4), Note(1.5, 4, 7)]),
+            Note(1.5, 4, 11),
+            Note(4, 5, 0),
+        ],
+        [(4, 4)],
+    )
+    lower = Part([Note(0.5, 3, pc) for pc in range(8)] + [Note(4, 2, 0)], [(4, 4)])
+
+    return Score([melody, [upper, lower]], title="Round trip")
+
+
+def test_round_trip(tmp_path):
+    score = make_round_trip_score()
+    expected = note_sequences(score)
+
+    output_filepath = tmp_path / "roundtrip.musicxml"
+    score.convert_to_xml(output_filepath)
+    imported = import_musicxml(str(output_filepath))
+
+    assert sequence_differences(expected, note_sequences(imported)) == []
+
+    # tied pieces are joined, and every chord member sounds
+    melody = expected[0][0]
+    assert melody[0] == SoundingNote(0, Decimal("2.25"), 57)
+    assert [note.pitch for note in melody if note.onset == 3] == [48, 48, 55]
+    assert len(expected[1][1]) == 9
+
+    # exporting the import again changes nothing
+    imported.convert_to_xml(output_filepath)
+    assert note_sequences(import_musicxml(str(output_filepath))) == expected
+
+
+def test_round_trip_triplets(tmp_path):
+    # a third is not exact in binary or as a Decimal, so the layout has to
+    # add triplets up to whole beats itself
+    melody = Part(
+        [Note(1 / 3, 4, pc) for pc in range(12)]
+        + [Note(2 / 3, 4, 1), Note(1 / 3, 4, 2), Note(1, 4, 4), Note(4 / 3, 4, 6)],
+        [(4, 4)],
+    )
+    bass = Part([Note(1.5, 3, 0), Note(0.5, 3, 7), Note(1, 3, 4), Rest(1)], [(4, 4)])
+    score = Score([melody, bass])
+
+    output_filepath = tmp_path / "triplets.musicxml"
+    score.convert_to_xml(output_filepath)
+
+    durations = re.findall(r"<duration>([^<]*)</duration>", output_filepath.read_text())
+    assert all(duration.isdigit() for duration in durations)
+
+    imported = import_musicxml(str(output_filepath))
+    assert sequence_differences(note_sequences(score), note_sequences(imported)) == []
+    assert len(note_sequences(imported)[0][0]) == 16
+
+
+@pytest.mark.parametrize("file_name", seed_files)
+def test_round_trip_seed_files(tmp_path, file_name):
+    score = import_musicxml("tests/output/" + file_name)
+
+    output_filepath = tmp_path / file_name
+    score.convert_to_xml(output_filepath)
+    imported = import_musicxml(str(output_filepath))
+
+    assert sequence_differences(note_sequences(score), note_sequences(imported)) == []
+
+
+def test_sequence_differences():
+    expected = [[[SoundingNote(0, 1, 60), SoundingNote(1, 1, 62)]]]
+
+    assert sequence_differences(expected, expected) == []
+    assert sequence_differences(expected, [[[SoundingNote(0, 1, 60)]]]) == [
+        "part 1 staff 1: 2 notes became 1"
+    ]
+    assert sequence_differences(
+        expected, [[[SoundingNote(0, 1, 60), SoundingNote(1, 2, 62)]]]
+    ) == ["part 1 staff 1: note 1 was (1, 1, 62), read back as (1, 2, 62)"]
+    assert sequence_differences(expected, [[[], []]]) == [
+        "part 1: 1 staves became 2"
+    ]
+    assert sequence_differences(expected, []) == ["1 parts became 0"]
@@ -1,8 +1,10 @@
+from io import BytesIO
+
 import pytest
 
 from lxml import etree
 
-from lejaren.notation import Note, Part, Score, Chord
+from lejaren.notation import Note, Part, Score, Chord, Rest
 
 @pytest.mark.skip
 def test_xml_valid():
@@ -46,4 +48,497 @@ def test_whole_note_chord_in_XML():
         assert isinstance(part, Part)
 
     test_score = Score(part_list)
-    assert isinstance(test_score, Score)
\ No newline at end of file
+    assert isinstance(test_score, Score)
+
+def test_score_slices():
+
+    time_sig = [(4, 4)]
+
+    melody = Part([Note(2, 4, x) for x in range(8)], time_sig)
+    bass = Part([Note(4, 3, 0), Note(4, 3, 7)], time_sig)
+    piano = [Part([Note(8, 5, 0)], time_sig), Part([Note(1, 2, 0)], time_sig)]
+
+    score = Score([melody, bass, piano])
+
+    sounding = score.events_at(5)
+    assert [event.entry.pc for event in sounding[0][0]] == [2]
+    assert [event.entry.pc for event in sounding[1][0]] == [7]
+    assert [event.entry.octave for event in sounding[2][0]] == [5]
+    # the Score pads short staves without adding measures to their Parts
+    assert sounding[2][1] == []
+
+    window = score.events_between(3, 6)
+    assert [event.entry.pc for event in window[0][0]] == [1, 2]
+    assert [event.entry.pc for event in window[1][0]] == [0, 7]
+
+    excerpt = score.excerpt(2, 2)
+    assert excerpt[0][0] == [melody.measures[1]]
+    assert len(piano[1].measures) == 1
+    assert excerpt[2][1][0].beats[0].notes[0].is_measure
+
+def test_streaming_xml_matches_tree(tmp_path):
+
+    time_sig = [(4, 4), (3, 4)]
+
+    melody = Part([Note(1, 4, x % 12) for x in range(21)], time_sig)
+    piano = [
+        Part([Note(3, 5, 0), Note(2, 5, 4)], time_sig),
+        Part([Note(6, 2, 0), Note(1, 2, 7)], time_sig),
+    ]
+
+    tree_path = tmp_path / "tree.musicxml"
+    stream_path = tmp_path / "stream.musicxml"
+
+    Score([melody, piano], title="Stream").convert_to_xml(tree_path)
+
+    melody = Part([Note(1, 4, x % 12) for x in range(21)], time_sig)
+    piano = [
+        Part([Note(3, 5, 0), Note(2, 5, 4)], time_sig),
+        Part([Note(6, 2, 0), Note(1, 2, 7)], time_sig),
+    ]
+
+    Score([melody, piano], title="Stream").convert_to_xml(stream_path, streaming=True)
+
+    assert tree_path.read_bytes() == stream_path.read_bytes()
+
+
+def test_tree_xml_is_not_reparsed(tmp_path, monkeypatch):
+
+    def reparse(*args, **kwargs):
+        raise AssertionError("the tree was serialized and parsed again")
+
+    monkeypatch.setattr(etree, "XML", reparse)
+    monkeypatch.setattr(etree, "fromstring", reparse)
+
+    xml_path = tmp_path / "tree.musicxml"
+    Score([Part([Note(4, 4, 0)], [(4, 4)])]).convert_to_xml(xml_path)
+
+    assert b"<!DOCTYPE score-partwise PUBLIC" in xml_path.read_bytes()
+
+
+def test_streaming_xml_flushes_each_part(monkeypatch):
+
+    class FlushRecorder(BytesIO):
+        flushed = []
+
+        def flush(self):
+            FlushRecorder.flushed.append(self.getvalue())
+            super().flush()
+
+    monkeypatch.setattr(
+        "lejaren.notation.score.open",
+        lambda *args, **kwargs: FlushRecorder(),
+        raising=False,
+    )
+
+    time_sig = [(4, 4)]
+    melody = Part([Note(1, 4, x % 12) for x in range(12)], time_sig)
+    bass = Part([Note(4, 2, 0) for _ in range(3)], time_sig)
+
+    Score([melody, bass]).convert_to_xml("stream.musicxml", streaming=True)
+
+    # the header, then each part as it is finished
+    header, *parts = FlushRecorder.flushed
+    assert header.endswith(b"</part-list>")
+    assert [flushed.endswith(b"</part>") for flushed in parts] == [True, True]
+    assert parts[0].count(b"</part>") == 1
+
+def test_parallel_xml_matches_tree(tmp_path):
+
+    time_sig = [(3, 4)]
+
+    def parts():
+        return [
+            Part([Note(1, 4, x % 12) for x in range(12)], time_sig),
+            Part([Note(0.5, 3, x % 12) for x in range(15)], time_sig),
+            [
+                Part([Note(3, 5, 0), Note(3, 5, 4)], time_sig),
+                Part([Note(1.5, 2, 0), Note(1.5, 2, 7)], time_sig),
+            ],
+        ]
+
+    tree_path = tmp_path / "tree.musicxml"
+    parallel_path = tmp_path / "parallel.musicxml"
+
+    Score(parts(), composer="Pool").convert_to_xml(tree_path)
+    Score(parts(), composer="Pool").convert_to_xml(parallel_path, processes=2)
+
+    assert tree_path.read_bytes() == parallel_path.read_bytes()
+
+def test_mxl_export(tmp_path):
+
+    import zipfile
+
+    time_sig = [(4, 4)]
+
+    def parts():
+        return [
+            Part([Note(1, 4, x % 12) for x in range(10)], time_sig),
+            Part([Note(2, 3, 0), Note(2, 3, 7)], time_sig),
+        ]
+
+    xml_path = tmp_path / "score.musicxml"
+    compact_path = tmp_path / "compact.musicxml"
+    mxl_path = tmp_path / "score.mxl"
+
+    Score(parts(), title="Zipped").convert_to_xml(xml_path)
+    Score(parts(), title="Zipped").convert_to_xml(compact_path, pretty_print=False)
+    Score(parts(), title="Zipped").convert_to_mxl(mxl_path)
+
+    with zipfile.ZipFile(mxl_path) as mxl:
+        entries = mxl.infolist()
+        assert entries[0].filename == "mimetype"
+        assert entries[0].compress_type == zipfile.ZIP_STORED
+        assert mxl.read("mimetype") == b"application/vnd.recordare.musicxml"
+
+        container = etree.fromstring(mxl.read("META-INF/container.xml"))
+        rootfile = container.find("rootfiles/rootfile").get("full-path")
+        assert rootfile == "score.musicxml"
+
+        document = mxl.read(rootfile)
+
+    assert document == compact_path.read_bytes()
+    assert b"\n  <" not in document
+
+    parser = etree.XMLParser(remove_blank_text=True)
+    assert etree.tostring(etree.fromstring(document, parser)) == etree.tostring(
+        etree.parse(str(xml_path), parser).getroot()
+    )
+
+def test_canonical_export(tmp_path):
+
+    import hashlib
+    import zipfile
+
+    time_sig = [(4, 4)]
+
+    def parts(duration):
+        return [
+            Part([Note(duration, 4, x % 12) for x in range(10)], time_sig),
+            [
+                Part([Note(duration * 2, 5, 0), Note(duration * 2, 5, 4)], time_sig),
+                Part([Note(duration * 4, 2, 0)], time_sig),
+            ],
+        ]
+
+    int_path = tmp_path / "int.musicxml"
+    float_path = tmp_path / "float.musicxml"
+
+    # str(Decimal) keeps the trailing zero of 1.0
+    Score(parts(1)).convert_to_xml(int_path)
+    Score(parts(1.0)).convert_to_xml(float_path)
+    assert int_path.read_bytes() != float_path.read_bytes()
+
+    int_hash = Score(parts(1)).convert_to_xml(int_path, canonical=True)
+    float_hash = Score(parts(1.0)).convert_to_xml(float_path, canonical=True)
+
+    assert int_path.read_bytes() == float_path.read_bytes()
+    assert b"<duration>1.0</duration>" not in float_path.read_bytes()
+    assert int_hash == float_hash
+    assert int_hash == hashlib.sha256(int_path.read_bytes()).hexdigest()
+
+    score = Score(parts(1.0))
+    assert score.content_hash(pretty_print=True) == int_hash
+    assert score.content_hash() == score.content_hash()
+    assert score.content_hash() != Score(parts(0.5)).content_hash()
+
+    # canonical .mxl files do not depend on when they were written
+    first_path = tmp_path / "first" / "score.mxl"
+    second_path = tmp_path / "second" / "score.mxl"
+    first_path.parent.mkdir()
+    second_path.parent.mkdir()
+
+    mxl_hash = Score(parts(1)).convert_to_mxl(first_path, canonical=True)
+    Score(parts(1.0)).convert_to_mxl(second_path, canonical=True)
+
+    assert first_path.read_bytes() == second_path.read_bytes()
+    assert mxl_hash == score.content_hash()
+    with zipfile.ZipFile(first_path) as mxl:
+        assert {entry.date_time for entry in mxl.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+
+def test_streaming_note_fragments(tmp_path):
+
+    time_sig = [(4, 4)]
+
+    def parts():
+        eighths = [Note(0.5, 4, x % 12) for x in range(6)]
+        tied = [Note(3, 4, 0), Note(3, 4, 2)]
+        accented = Note(1, 5, 1)
+        accented.add_articulation("accent")
+        repeated = [Note(1, 5, 1), Note(1, 5, 1)]
+        return [Part(eighths + tied + [accented] + repeated, time_sig)]
+
+    tree_path = tmp_path / "tree.musicxml"
+    stream_path = tmp_path / "stream.musicxml"
+
+    Score(parts()).convert_to_xml(tree_path)
+
+    streamed = Score(parts())
+    streamed.convert_to_xml(stream_path, streaming=True)
+
+    assert tree_path.read_bytes() == stream_path.read_bytes()
+
+    assert b"<accent/>" in stream_path.read_bytes()
+    assert b"<beam>begin</beam>" in stream_path.read_bytes()
+    assert b'<tied type="stop"/>' in stream_path.read_bytes()
+
+    # the repeated C#s share a fragment
+    assert len(streamed._note_fragments) < sum(
+        len(beat.notes)
+        for measure in streamed._parts[0]["staves"][0].measures
+        for beat in measure.beats
+    )
+
+def test_tie_across_beat_in_XML(tmp_path):
+
+    time_sig = [(4, 4)]
+
+    # the dotted quarter C is split at beat 2 and tied
+    melody = Part([Note(1.5, 4, 0), Note(0.5, 4, 2), Note(2, 4, 4)], time_sig)
+    chords = Part(
+        [Chord([Note(1.5, 4, 0), Note(1.5, 4, 4)]), Note(0.5, 4, 2), Note(2, 4, 4)],
+        time_sig,
+    )
+
+    xml_path = tmp_path / "tied.musicxml"
+    Score([melody, chords]).convert_to_xml(xml_path)
+
+    def ties(xml_part):
+        return [
+            (
+                xml_note.find("pitch/step").text,
+                [tie.get("type") for tie in xml_note.iter("tie")],
+            )
+            for xml_note in xml_part.iter("note")
+        ]
+
+    xml_melody, xml_chords = etree.parse(str(xml_path)).getroot().iter("part")
+
+    assert ties(xml_melody) == [
+        ("C", ["start"]),
+        ("C", ["stop"]),
+        ("D", []),
+        ("E", []),
+    ]
+    assert ties(xml_chords) == [
+        ("C", ["start"]),
+        ("E", ["start"]),
+        ("C", ["stop"]),
+        ("E", ["stop"]),
+        ("D", []),
+        ("E", []),
+    ]
+
+def test_incremental_export(tmp_path, monkeypatch):
+
+    time_sig = [(4, 4)]
+
+    def melody_notes():
+        return [Note(1, 4, x % 12) for x in range(32)]
+
+    melody = Part(melody_notes(), time_sig)
+    bass = Part([Note(4, 2, x % 12) for x in range(8)], time_sig)
+    score = Score([melody, bass])
+
+    rendered = []
+    render = Score._render_staff_measure_xml
+
+    def counting_render(self, part, staff_idx, measure_index, pretty_print):
+        rendered.append(measure_index)
+        return render(self, part, staff_idx, measure_index, pretty_print)
+
+    monkeypatch.setattr(Score, "_render_staff_measure_xml", counting_render)
+
+    score.convert_to_xml(tmp_path / "first.musicxml", incremental=True)
+    assert len(rendered) == 16
+
+    rendered.clear()
+    melody.replace_notes(13, [Note(1, 5, 0)])
+    score.convert_to_xml(tmp_path / "second.musicxml", incremental=True)
+    assert rendered == [3]
+
+    edited_notes = melody_notes()
+    edited_notes[13] = Note(1, 5, 0)
+    expected = Score(
+        [Part(edited_notes, time_sig), Part([Note(4, 2, x % 12) for x in range(8)], time_sig)]
+    )
+    expected.convert_to_xml(tmp_path / "expected.musicxml")
+    assert (tmp_path / "second.musicxml").read_bytes() == (
+        tmp_path / "expected.musicxml"
+    ).read_bytes()
+
+    rendered.clear()
+    melody.measures[6].beats[0].notes[0].add_articulation("staccato")
+    melody.measures[6].touch()
+    score.convert_to_xml(tmp_path / "third.musicxml", incremental=True)
+    assert rendered == [6]
+    assert b"<staccato/>" in (tmp_path / "third.musicxml").read_bytes()
+
+def test_padding_measure_rests(tmp_path):
+
+    time_sig = [(4, 4)]
+
+    melody = Part([Note(4, 4, x % 12) for x in range(6)], time_sig)
+    piano = [
+        Part([Note(4, 5, 0), Note(4, 5, 2)], time_sig),
+        Part([Note(4, 2, 0)], time_sig),
+    ]
+
+    score = Score([melody, piano])
+
+    # short staves are padded with one shared measure, not extended
+    assert len(piano[0].measures) == 2
+    assert score._staff_measure(piano[0], 3) is score._staff_measure(piano[1], 5)
+
+    plain_path = tmp_path / "plain.musicxml"
+    collapsed_path = tmp_path / "collapsed.musicxml"
+
+    score.convert_to_xml(plain_path)
+    score.convert_to_xml(collapsed_path, multiple_rests=True, streaming=True)
+
+    plain = etree.parse(str(plain_path))
+    assert len(plain.findall(".//part[@id='P2']/measure/note/rest[@measure='yes']")) == 9
+    assert plain.find(".//multiple-rest") is None
+
+    collapsed = etree.parse(str(collapsed_path))
+    multiple_rests = collapsed.findall(".//part[@id='P2']/measure")[2].findall(
+        "attributes/measure-style/multiple-rest"
+    )
+    assert [element.text for element in multiple_rests] == ["4"]
+    assert len(collapsed.findall(".//multiple-rest")) == 1
+
+def _read_midi_tracks(path):
+    """(format, ppq, tracks), each track a list of (absolute tick, message)"""
+
+    import struct
+
+    data = path.read_bytes()
+    assert data[:4] == b"MThd"
+    midi_format, track_count, ppq = struct.unpack(">HHH", data[8:14])
+
+    tracks = []
+    position = 14
+
+    for _ in range(track_count):
+        assert data[position : position + 4] == b"MTrk"
+        (length,) = struct.unpack(">I", data[position + 4 : position + 8])
+        chunk = data[position + 8 : position + 8 + length]
+        position += 8 + length
+
+        events = []
+        tick = 0
+        index = 0
+        while index < len(chunk):
+            delta = 0
+            while True:
+                byte = chunk[index]
+                index += 1
+                delta = (delta << 7) | (byte & 0x7F)
+                if byte < 0x80:
+                    break
+            tick += delta
+
+            if chunk[index] == 0xFF:
+                size = chunk[index + 2]
+                message = chunk[index : index + 3 + size]
+            else:
+                message = chunk[index : index + 3]
+            index += len(message)
+            events.append((tick, message))
+
+        tracks.append(events)
+
+    return midi_format, ppq, tracks
+
+
+def test_to_midi(tmp_path):
+
+    from lejaren.notation import Tempo
+    from lejaren.notation.midi import encode_variable_length
+
+    assert encode_variable_length(0) == b"\x00"
+    assert encode_variable_length(127) == b"\x7f"
+    assert encode_variable_length(128) == b"\x81\x00"
+    assert encode_variable_length(0x0FFFFFFF) == b"\xff\xff\xff\x7f"
+
+    time_sig = [(3, 4)]
+
+    # the 4 beat D is tied over the barline
+    melody = Part([Note(1, 4, 0), Note(0.5, 4, 2), Note(0.5, 4, 4), Note(4, 4, 2)], time_sig)
+    bass = Part([Note(3, 2, 0), Chord([Note(3, 2, 7), Note(3, 3, 0)])], time_sig)
+
+    midi_path = tmp_path / "score.mid"
+    Score([melody, bass]).to_midi(midi_path, tempo=Tempo(60, 1))
+
+    midi_format, ppq, tracks = _read_midi_tracks(midi_path)
+
+    assert midi_format == 1
+    assert ppq == 480
+    assert len(tracks) == 3
+
+    conductor = tracks[0]
+    assert conductor[0] == (0, b"\xff\x51\x03" + (1_000_000).to_bytes(3, "big"))
+    assert conductor[1] == (0, b"\xff\x58\x04\x03\x02\x18\x08")
+
+    def notes(track):
+        onsets = {}
+        found = []
+        for tick, message in track:
+            if message[0] & 0xF0 == 0x90:
+                onsets[message[1]] = tick
+            elif message[0] & 0xF0 == 0x80:
+                found.append((onsets.pop(message[1]), tick, message[1]))
+        return sorted(found)
+
+    assert notes(tracks[1]) == [
+        (0, 480, 60),
+        (480, 720, 62),
+        (720, 960, 64),
+        (960, 2880, 62),
+    ]
+    assert notes(tracks[2]) == [
+        (0, 1440, 36),
+        (1440, 2880, 43),
+        (1440, 2880, 48),
+    ]
+    assert tracks[2][0][1][0] & 0x0F != tracks[1][0][1][0] & 0x0F
+
+
+def test_to_midi_tie_across_beat(tmp_path):
+
+    time_sig = [(4, 4)]
+
+    # the dotted quarters are split at beat 2 and tied, and the G is tied
+    # through a whole measure
+    melody = Part(
+        [Note(1.5, 4, 0), Note(0.5, 4, 2), Note(2, 4, 0), Note(12, 4, 7)], time_sig
+    )
+    bass = Part(
+        [Chord([Note(1.5, 3, 0), Note(1.5, 3, 7)]), Rest(0.5), Note(2, 3, 0)],
+        time_sig,
+    )
+
+    midi_path = tmp_path / "tied.mid"
+    Score([melody, bass]).to_midi(midi_path)
+
+    _, ppq, tracks = _read_midi_tracks(midi_path)
+
+    def notes(track):
+        onsets = {}
+        found = []
+        for tick, message in track:
+            if message[0] & 0xF0 == 0x90:
+                assert message[1] not in onsets
+                onsets[message[1]] = tick
+            elif message[0] & 0xF0 == 0x80:
+                found.append((onsets.pop(message[1]), tick, message[1]))
+        return sorted(found)
+
+    assert ppq == 480
+    assert notes(tracks[1]) == [
+        (0, 720, 60),
+        (720, 960, 62),
+        (960, 1920, 60),
+        (1920, 7680, 67),
+    ]
+    assert notes(tracks[2]) == [(0, 720, 48), (0, 720, 55), (960, 1920, 48)]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from lejaren.analysis import PitchClassSet, classify_set_classes, pitch_class_masks
+from lejaren.analysis.set_classes import SET_CLASS_COUNT, SET_CLASS_NAMES
+
+
+def test_matches_pitch_class_set():
+    masks = np.arange(4096)
+    arrays = classify_set_classes(masks)
+
+    for mask in range(4096):
+        pcs = PitchClassSet.from_mask(mask)
+        cardinality = pcs.cardinality
+
+        assert arrays.cardinality[mask] == cardinality
+        assert list(arrays.normal_order[mask, :cardinality]) == pcs.normal_form
+        assert list(arrays.prime_form[mask, :cardinality]) == pcs.prime_form
+        assert arrays.forte_name[mask] == pcs.forte_name
+        assert tuple(arrays.interval_vector[mask]) == pcs.interval_vector
+
+    assert (arrays.normal_order[0] == -1).all()
+
+
+def test_boolean_rows():
+    rows = np.zeros((3, 12), dtype=bool)
+    rows[0, [0, 4, 7]] = True
+    rows[1, [2, 5, 9]] = True
+
+    arrays = classify_set_classes(rows)
+
+    assert list(arrays.mask) == [0b10010001, 0b1000100100, 0]
+    assert list(arrays.forte_name) == ["3-11", "3-11", "0-1"]
+    assert arrays.set_class[0] == arrays.set_class[1]
+    assert arrays.normal_order[1, :3].tolist() == [2, 5, 9]
+    assert arrays.prime_form[1].tolist() == [0, 3, 7] + [-1] * 9
+
+
+def test_set_classes_in_forte_order():
+    assert SET_CLASS_COUNT == 224
+    assert SET_CLASS_NAMES[0] == "0-1"
+    assert SET_CLASS_NAMES[-1] == "12-1"
+    assert list(SET_CLASS_NAMES[2:4]) == ["2-1", "2-2"]
+    assert "4-Z29" in SET_CLASS_NAMES
+
+
+def test_bad_input():
+    with pytest.raises(ValueError):
+        pitch_class_masks(np.zeros((2, 11), dtype=bool))
+    with pytest.raises(ValueError):
+        pitch_class_masks([4096])
+    with pytest.raises(ValueError):
+        pitch_class_masks([[[0]]])
+    with pytest.raises(ValueError):
+        pitch_class_masks(np.array([True, False]))
+
+    assert len(classify_set_classes([]).mask) == 0
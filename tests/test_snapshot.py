@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+import pytest
+
+from lejaren.notation import (
+    Chord,
+    Note,
+    Part,
+    Rest,
+    Score,
+    ScoreSnapshot,
+    load_snapshot,
+    save_snapshot,
+)
+
+
+def _notes():
+    accented = Note(1, 4, 1)
+    accented.add_articulation("accent")
+    return [
+        Note(0.5, 4, 0),
+        Note(0.5, 4, 2),
+        accented,
+        Note(3, 4, 4),
+        Chord([Note(1, 4, 0), Note(1, 4, 7)]),
+        Rest(1),
+        Note(0.25, 5, 3),
+        Note(0.75, 5, 10),
+    ]
+
+
+def _score():
+    time_sig = [(3, 4)]
+    melody = Part(_notes(), time_sig)
+    piano = [
+        Part([Note(3, 3, 0), Note(6, 3, 7)], [(3, 4)]),
+        Part([Note(1.5, 2, 0), Note(1.5, 2, 7)], [(3, 4)]),
+    ]
+    return Score([melody, piano], title="Snap", composer="Shot")
+
+
+def test_snapshot_round_trip(tmp_path):
+
+    snapshot_path = tmp_path / "score.snap"
+    save_snapshot(_score(), snapshot_path)
+
+    loaded = load_snapshot(snapshot_path)
+    assert loaded.title == "Snap"
+    assert loaded.composer == "Shot"
+
+    _score().convert_to_xml(tmp_path / "original.musicxml")
+    loaded.convert_to_xml(tmp_path / "loaded.musicxml")
+
+    assert (tmp_path / "original.musicxml").read_bytes() == (
+        tmp_path / "loaded.musicxml"
+    ).read_bytes()
+
+    melody = loaded._parts[0]["staves"][0]
+    original = _score()._parts[0]["staves"][0]
+
+    assert [type(entry.dur) for entry in melody.current_list] == [Decimal] * 8
+    assert melody._source_durs == original._source_durs
+    assert melody.measure_factor == original.measure_factor
+    assert melody.measures[0].measure_factor == original.measures[0].measure_factor
+
+
+def test_snapshot_parts_are_lazy_and_editable(tmp_path):
+
+    snapshot_path = tmp_path / "score.snap"
+    save_snapshot(_score(), snapshot_path)
+
+    with ScoreSnapshot(snapshot_path) as snapshot:
+        assert snapshot.part_count == 2
+        piano = snapshot.load_part(1)
+        melody = snapshot.load_part(0)
+
+    assert len(piano) == 2
+    assert isinstance(melody, Part)
+
+    # a loaded part keeps working with the edit API
+    melody.replace_notes(1, [Note(1, 5, 5)])
+
+    edited = _notes()
+    edited[2] = Note(1, 5, 5)
+    expected = Part(edited, [(3, 4)])
+
+    Score([melody]).convert_to_xml(tmp_path / "loaded.musicxml")
+    Score([expected]).convert_to_xml(tmp_path / "expected.musicxml")
+
+    assert (tmp_path / "loaded.musicxml").read_bytes() == (
+        tmp_path / "expected.musicxml"
+    ).read_bytes()
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+
+    not_a_snapshot = tmp_path / "score.snap"
+    not_a_snapshot.write_bytes(b"\x00" * 64)
+
+    with pytest.raises(ValueError):
+        ScoreSnapshot(not_a_snapshot)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from lejaren.analysis.set_classes import SET_CLASS_COUNT, SET_CLASS_NAMES
+from lejaren.analysis.sonorities import iter_sonorities, score_sonorities
+from lejaren.notation import Chord, Note, Part, Rest, Score
+
+
+def test_slices_across_staves():
+    score = Score(
+        [
+            # a C tied over the barline
+            Part([Note(6, 4, 0), Note(2, 4, 4)], [(4, 4)]),
+            Part([Note(4, 3, 7), Note(4, 3, 7)], [(4, 4)]),
+            Part(
+                [Rest(1), Chord([Note(1, 4, 2), Note(1, 4, 5)]), Rest(2), Note(4, 4, 11)],
+                [(4, 4)],
+            ),
+        ]
+    )
+
+    sonorities, histogram = score_sonorities(score)
+
+    assert sonorities.onset.tolist() == [0, 1, 2, 4, 6]
+    assert sonorities.duration.tolist() == [1, 1, 2, 2, 2]
+    assert sonorities.mask.tolist() == [
+        0b10000001,
+        0b10100101,
+        0b10000001,
+        0b100010000001,
+        0b100010010000,
+    ]
+    assert list(SET_CLASS_NAMES[sonorities.set_class]) == [
+        "2-5",
+        "4-23",
+        "2-5",
+        "3-4",
+        "3-11",
+    ]
+
+    assert len(histogram) == SET_CLASS_COUNT
+    assert histogram.sum() == 5
+    assert histogram[list(SET_CLASS_NAMES).index("2-5")] == 2
+
+
+def test_ties_hold_one_slice():
+    # split at the beat and at the barline, and tied back together
+    score = Score(
+        [
+            Part([Note(0.5, 4, 0), Note(1.5, 4, 2), Note(2, 4, 4)], [(4, 4)]),
+            Part([Chord([Note(5, 3, 0), Note(5, 3, 7)]), Rest(3)], [(4, 4)]),
+        ]
+    )
+
+    sonorities, _ = score_sonorities(score)
+
+    assert sonorities.onset.tolist() == [0, 0.5, 2, 4]
+    assert sonorities.duration.tolist() == [0.5, 1.5, 2, 1]
+    assert sonorities.mask[-1] == 0b10000001
+
+
+def test_silence_and_repeated_notes():
+    score = Score([Part([Note(1, 4, 0), Note(1, 4, 0), Rest(1), Note(1, 4, 9)], [(4, 4)])])
+
+    sonorities, _ = score_sonorities(score)
+
+    # a repeated note is a new slice, and the rest is left out
+    assert sonorities.onset.tolist() == [0, 1, 3]
+    assert sonorities.duration.tolist() == [1, 1, 1]
+
+
+def test_stream_by_measure():
+    parts = [Part([Note(1, 4, pc % 12) for pc in range(12)], [(4, 4)]) for _ in range(3)]
+    score = Score(parts)
+
+    chunks = list(iter_sonorities(score))
+
+    # one per measure, then the last slice
+    assert len(chunks) == 4
+    assert [len(chunk.onset) for chunk in chunks] == [3, 4, 4, 1]
+
+    sonorities, _ = score_sonorities(score)
+    assert np.array_equal(
+        sonorities.onset, np.concatenate([chunk.onset for chunk in chunks])
+    )